@@ -0,0 +1,125 @@
+"""
+Chunking comparison for the Ramayan corpus.
+
+Splits data/ramayan.txt with prepare_data's character splitter (1000 chars,
+200 overlap) and with the structure-aware chunker, and reports chunk counts,
+stored and duplicated tokens, index size, the prompt tokens retrieval adds at
+each k, and how many chunks cross a heading or stop mid-sentence.
+
+Usage:
+    python benchmarks/chunking_report.py
+    python benchmarks/chunking_report.py --target-tokens 160 --k 3 5 7
+"""
+
+import sys
+import json
+import argparse
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from config.settings import EmbeddingsConfig, DATA_DIR
+from api.chunking import chunk_text, chunk_stats, is_heading
+from api.ingest import load_text
+from utils.helpers import estimate_tokens
+from run import load_corpus_chunks, git_commit, RESULTS_DIR
+
+SENTENCE_END = re.compile(r"([.!?।॥\"')\]]|\|\||\d)\s*$")
+
+
+def boundary_stats(texts: List[str]) -> Dict[str, int]:
+    """
+    Count chunks that break the text's structure.
+
+    Args:
+        texts (List[str]): Chunk texts
+
+    Returns:
+        Dict[str, int]: Chunks holding a heading after their first line, and chunks ending mid-sentence
+    """
+    spanning = sum(
+        any(is_heading(line.strip()) and len(line.strip()) > 2 for line in text.splitlines()[1:])
+        for text in texts
+    )
+    cut = sum(not SENTENCE_END.search(text.strip()) for text in texts)
+    return {"chunks_spanning_headings": spanning, "chunks_ending_mid_sentence": cut}
+
+
+def reduction(before: float, after: float) -> float:
+    """Relative saving in percent"""
+    return round(100.0 * (before - after) / before, 1) if before else 0.0
+
+
+def main():
+    """Chunk the corpus both ways and write the comparison"""
+    parser = argparse.ArgumentParser(description="Compare character and structure-aware chunking")
+    parser.add_argument("--file", type=Path, default=DATA_DIR / "ramayan.txt")
+    parser.add_argument("--target-tokens", type=int, default=EmbeddingsConfig.CHUNK_TOKENS)
+    parser.add_argument("--max-tokens", type=int, default=EmbeddingsConfig.CHUNK_MAX_TOKENS)
+    parser.add_argument("--min-tokens", type=int, default=EmbeddingsConfig.CHUNK_MIN_TOKENS)
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, EmbeddingsConfig.DEFAULT_K])
+    parser.add_argument("--dimension", type=int, default=384, help="embedding dimension")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    text = load_text(str(args.file))
+    source_tokens = estimate_tokens(text)
+    chunkings = {
+        "chars": load_corpus_chunks(),
+        "structure": [chunk.text for chunk in chunk_text(text, args.target_tokens, args.max_tokens,
+                                                         args.min_tokens)]
+    }
+
+    results = {}
+    for name, texts in chunkings.items():
+        stats = chunk_stats(texts, max(args.k), args.dimension, source_tokens)
+        stats["prompt_tokens_by_k"] = {
+            str(k): chunk_stats(texts, k, args.dimension)["prompt_tokens_at_k"] for k in args.k
+        }
+        stats.update(boundary_stats(texts))
+        results[name] = stats
+
+    before, after = results["chars"], results["structure"]
+    savings = {
+        "index_bytes_pct": reduction(before["index_bytes"], after["index_bytes"]),
+        "stored_tokens_pct": reduction(before["stored_tokens"], after["stored_tokens"]),
+        "prompt_tokens_pct": {
+            k: reduction(before["prompt_tokens_by_k"][k], after["prompt_tokens_by_k"][k])
+            for k in before["prompt_tokens_by_k"]
+        }
+    }
+
+    print(f"Source: {args.file.name}, {source_tokens} tokens")
+    print(f"{'chunker':<10} {'chunks':>7} {'mean':>7} {'max':>5} {'dup':>6} {'index KB':>9} "
+          f"{'spanning':>9} {'mid-sent':>9}  prompt tokens by k")
+    for name, stats in results.items():
+        by_k = " ".join(f"k={k}:{v:.0f}" for k, v in stats["prompt_tokens_by_k"].items())
+        print(f"{name:<10} {stats['chunks']:>7} {stats['mean_tokens']:>7.1f} {stats['max_tokens']:>5} "
+              f"{stats['duplication_ratio']:>6.3f} {stats['index_bytes'] / 1024:>9.1f} "
+              f"{stats['chunks_spanning_headings']:>9} {stats['chunks_ending_mid_sentence']:>9}  {by_k}")
+    print(f"\nIndex size: -{savings['index_bytes_pct']}%, stored tokens: -{savings['stored_tokens_pct']}%, "
+          "prompt tokens: " + ", ".join(f"k={k} -{v}%" for k, v in savings["prompt_tokens_pct"].items()))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "source_tokens": source_tokens,
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+        },
+        "results": results,
+        "reduction": savings
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = args.output / f"chunking_{stamp}_{report['meta']['commit']}.json"
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"✅ Report written to {path}")
+
+
+if __name__ == "__main__":
+    main()
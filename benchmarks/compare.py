@@ -0,0 +1,78 @@
+"""
+Compare two benchmark reports and flag regressions.
+
+Latency statistics (mean, p50, p95, p99) regress when they grow, and
+throughput figures (*_per_second) regress when they shrink, by more than
+the threshold.
+
+Usage:
+    python benchmarks/compare.py OLD.json NEW.json [--threshold 0.10]
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, Any
+
+LATENCY_KEYS = ("mean", "p50", "p95", "p99")
+
+
+def flatten(node: Any, prefix: str = "") -> Dict[str, float]:
+    """
+    Flatten nested results into dotted metric paths.
+    
+    Args:
+        node (Any): Results subtree
+        prefix (str): Path so far
+        
+    Returns:
+        Dict[str, float]: Comparable numeric leaves
+    """
+    flat = {}
+    if isinstance(node, dict):
+        for key, value in node.items():
+            flat.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        leaf = prefix.rsplit(".", 1)[-1]
+        if leaf in LATENCY_KEYS or leaf.endswith("_per_second"):
+            flat[prefix] = float(node)
+    return flat
+
+
+def main():
+    """Print a comparison table; exit 1 if anything regressed"""
+    parser = argparse.ArgumentParser(description="Compare benchmark reports")
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative change counted as a regression")
+    args = parser.parse_args()
+    
+    old_report = json.loads(args.old.read_text(encoding="utf-8"))
+    new_report = json.loads(args.new.read_text(encoding="utf-8"))
+    old, new = flatten(old_report["results"]), flatten(new_report["results"])
+    
+    print(f"{old_report['meta']['commit']} -> {new_report['meta']['commit']}")
+    regressions = 0
+    for path in sorted(set(old) & set(new)):
+        before, after = old[path], new[path]
+        if before == 0:
+            continue
+        change = (after - before) / before
+        higher_is_better = path.endswith("_per_second")
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  ❌ regression"
+            regressions += 1
+        elif worse < -args.threshold:
+            flag = "  ✅ improvement"
+        print(f"{path:70} {before:12.4f} {after:12.4f} {change:+8.1%}{flag}")
+        
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Offline stand-in for the Groq chat-completions API.
+
+Speaks the OpenAI-compatible /openai/v1/chat/completions protocol, both
+plain JSON and SSE streaming, with configurable time-to-first-token,
+per-token delay, jitter and error rate. Benchmarks and load tests point
+APIConfig.GROQ_API_URL at it so they never touch the real service.
+
+Given a directory of cassettes recorded with RAAVAN_GROQ_RECORD, it
+replays real Groq answers instead: each request gets the cassette with the
+same prompt, or the one with the most similar question, streamed with the
+recorded per-token timing (or timing drawn from all recordings), scaled
+by --latency-scale.
+
+Usage:
+    python benchmarks/groq_stub.py --port 9090 --ttft 0.3 --token-delay 0.01
+    python benchmarks/groq_stub.py --cassettes data/cassettes --latency-scale 0.5
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config.settings import CassetteConfig
+from api.cassettes import CassetteLibrary, cassette_key, load_cassettes
+
+TIMINGS = ("recorded", "pooled")
+
+CHAT_PATH = "/openai/v1/chat/completions"
+
+ANSWER_WORDS = (
+    "I am Raavan, king of Lanka, and I shall tell you what the texts say. "
+    "Listen well, for the tale of Rama, Sita and Lakshmana is long and my memory is longer. "
+    "The ten heads of Lanka have seen every battle and every exile of this epic."
+).split()
+
+
+class StubSettings:
+    """Latency and failure profile of the stand-in"""
+    
+    def __init__(self, ttft: float = 0.3, token_delay: float = 0.01, tokens: int = 200,
+                 jitter: float = 0.1, error_rate: float = 0.0, seed: Optional[int] = 42,
+                 cassettes: Optional[str] = None, latency_scale: float = CassetteConfig.LATENCY_SCALE,
+                 timing: str = "recorded", min_score: float = CassetteConfig.MIN_MATCH_SCORE):
+        """
+        Initialize the profile.
+        
+        Args:
+            ttft (float): Seconds before the first token
+            token_delay (float): Seconds between streamed tokens
+            tokens (int): Tokens per answer (capped by the request's max_tokens)
+            jitter (float): Relative random variation applied to delays
+            error_rate (float): Fraction of requests answered with HTTP 500
+            seed (Optional[int]): Random seed for reproducible runs
+            cassettes (Optional[str]): Directory of recorded Groq traffic to replay instead
+            latency_scale (float): Multiplier on replayed latencies
+            timing (str): "recorded" for each cassette's own timing, "pooled" to sample all recordings
+            min_score (float): Question similarity below which a synthetic answer is sent
+            
+        Raises:
+            ValueError: If timing is unknown or the directory holds no cassettes
+        """
+        if timing not in TIMINGS:
+            raise ValueError(f"timing must be one of {', '.join(TIMINGS)}")
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.library = CassetteLibrary(load_cassettes(cassettes), seed) if cassettes else None
+        self.latency_scale = latency_scale
+        self.timing = timing
+        self.min_score = min_score
+        self.replays = {"exact": 0, "fuzzy": 0, "synthetic": 0}
+    
+    def delay(self, base: float) -> float:
+        """Apply jitter to a base delay"""
+        with self.lock:
+            return max(0.0, base * (1 + self.random.uniform(-self.jitter, self.jitter)))
+    
+    def fails(self) -> bool:
+        """Decide whether this request should fail"""
+        with self.lock:
+            return self.random.random() < self.error_rate
+    
+    def replay(self, request: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], float, List[str], List[float]]]:
+        """
+        Pick the recorded answer to a request.
+        
+        Args:
+            request (Dict[str, Any]): Chat-completions request body
+            
+        Returns:
+            Optional[Tuple[Dict[str, Any], float, List[str], List[float]]]: Cassette, match
+                score, deltas and their scaled offsets in seconds; None for a synthetic answer
+        """
+        if self.library is None:
+            return None
+        cassette, score = self.library.match(request)
+        kind = "exact" if cassette["key"] == cassette_key(request) else "fuzzy"
+        if score < self.min_score:
+            kind, cassette = "synthetic", None
+        with self.lock:
+            self.replays[kind] += 1
+        if cassette is None:
+            return None
+            
+        deltas = cassette["deltas"] or [cassette["content"]]
+        offsets = cassette["offsets"] or [cassette["duration"]]
+        # Cut the answer short like Groq would for a smaller max_tokens
+        completion = (cassette.get("usage") or {}).get("completion_tokens")
+        limit = request.get("max_tokens")
+        if completion and limit and limit < completion:
+            keep = max(1, math.ceil(len(deltas) * limit / completion))
+            deltas, offsets = deltas[:keep], offsets[:keep]
+        if self.timing == "pooled" and self.library.gaps:
+            offsets = self.library.sample_timing(len(deltas))
+        return cassette, score, deltas, [offset * self.latency_scale for offset in offsets]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Replay counts and the active profile, for benchmark reports"""
+        if self.library is None:
+            return {"ttft": self.ttft, "token_delay": self.token_delay, "tokens": self.tokens}
+        with self.lock:
+            return {"cassettes": len(self.library.cassettes), "latency_scale": self.latency_scale,
+                    "timing": self.timing, "replays": dict(self.replays)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; the server instance carries the settings"""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+    
+    def _send_json(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _replay(self, request: Dict[str, Any], cassette: Dict[str, Any], score: float,
+                deltas: List[str], offsets: List[float]):
+        started = time.perf_counter()
+        model = request.get("model", "stub")
+        usage = cassette.get("usage")
+        headers = {"X-Cassette": cassette["key"][:12], "X-Cassette-Score": str(score)}
+        if not request.get("stream"):
+            # The whole answer is sent when its last delta would have arrived
+            time.sleep(max(0.0, offsets[-1] - (time.perf_counter() - started)))
+            self._send_json(200, {
+                "id": f"cassette-{cassette['key'][:12]}", "object": "chat.completion", "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(deltas)},
+                             "finish_reason": "stop"}],
+                "usage": usage
+            }, headers)
+            return
+            
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            for delta, offset in zip(deltas, offsets):
+                time.sleep(max(0.0, offset - (time.perf_counter() - started)))
+                chunk = {"id": "cassette", "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            final = {"id": "cassette", "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            if usage:
+                final["x_groq"] = {"usage": usage}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client cancelled the stream
+        self.close_connection = True
+    
+    def do_POST(self):
+        settings: StubSettings = self.server.settings
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+            
+        if self.path != CHAT_PATH:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        if settings.fails():
+            time.sleep(settings.delay(settings.ttft))
+            self._send_json(500, {"error": {"message": "stub failure"}})
+            return
+            
+        replay = settings.replay(request)
+        if replay is not None:
+            self._replay(request, *replay)
+            return
+            
+        count = min(settings.tokens, int(request.get("max_tokens") or settings.tokens))
+        words = [ANSWER_WORDS[i % len(ANSWER_WORDS)] + " " for i in range(count)]
+        prompt_chars = sum(len(m.get("content", "")) for m in request.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_chars // 4 + 1,
+            "completion_tokens": count,
+            "total_tokens": prompt_chars // 4 + 1 + count
+        }
+        model = request.get("model", "stub")
+        
+        time.sleep(settings.delay(settings.ttft))
+        
+        if not request.get("stream"):
+            time.sleep(settings.delay(settings.token_delay) * count)
+            self._send_json(200, {
+                "id": "stub", "object": "chat.completion", "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(words)},
+                             "finish_reason": "stop"}],
+                "usage": usage
+            })
+            return
+            
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(settings.delay(settings.token_delay))
+                chunk = {"id": "stub", "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            final = {"id": "stub", "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                     "x_groq": {"usage": usage}}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client cancelled the stream
+        self.close_connection = True
+
+
+class GroqStubServer:
+    """Runs the stand-in on a background thread"""
+    
+    def __init__(self, settings: Optional[StubSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Bind the server; port 0 picks a free port.
+        
+        Args:
+            settings (Optional[StubSettings]): Latency profile
+            host (str): Interface to bind
+            port (int): Port to bind
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.settings = settings or StubSettings()
+        self.thread = None
+    
+    @property
+    def url(self) -> str:
+        """Chat-completions URL to use as APIConfig.GROQ_API_URL"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{CHAT_PATH}"
+    
+    def start(self) -> "GroqStubServer":
+        """Start serving in the background"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self) -> "GroqStubServer":
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Run the stand-in in the foreground"""
+    parser = argparse.ArgumentParser(description="Offline Groq chat-completions stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--ttft", type=float, default=0.3, help="seconds to first token")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between tokens")
+    parser.add_argument("--tokens", type=int, default=200, help="tokens per answer")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cassettes", help="replay Groq traffic recorded with RAAVAN_GROQ_RECORD")
+    parser.add_argument("--latency-scale", type=float, default=CassetteConfig.LATENCY_SCALE,
+                        help="multiplier on replayed latencies")
+    parser.add_argument("--timing", choices=TIMINGS, default="recorded",
+                        help="each cassette's own timing, or timing sampled from all of them")
+    parser.add_argument("--min-score", type=float, default=CassetteConfig.MIN_MATCH_SCORE,
+                        help="question similarity below which a synthetic answer is sent")
+    args = parser.parse_args()
+    
+    settings = StubSettings(args.ttft, args.token_delay, args.tokens, args.jitter, args.error_rate, args.seed,
+                            args.cassettes, args.latency_scale, args.timing, args.min_score)
+    server = GroqStubServer(settings, args.host, args.port)
+    if settings.library is not None:
+        print(f"Replaying {len(settings.library.cassettes)} cassettes from {args.cassettes}")
+    print(f"Groq stand-in listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Concurrent-session load generator for Raavan AI.
+
+Simulates N users that alternate between chat questions and horoscope
+requests with randomized think times. It drives the service layer
+directly: GroqAPIService against the offline stand-in,
+VectorDatabaseService and AstrologyCalculator. Each user-count stage
+reports throughput, p50/p95/p99, error rate and resident memory over time,
+so the knee of the latency curve is visible.
+
+Usage:
+    python benchmarks/loadgen.py --users 1 5 10 25 50 --duration 60
+    python benchmarks/loadgen.py --users 20 --groq-url http://127.0.0.1:9090/openai/v1/chat/completions
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import resource
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+# Measure the node, not the production quota
+os.environ.setdefault("GROQ_API_KEY", "loadtest")
+os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "1000000")
+os.environ.setdefault("GROQ_TOKENS_PER_MINUTE", "1000000000")
+
+from config.settings import APIConfig, EmbeddingsConfig
+from groq_stub import GroqStubServer, StubSettings
+from run import load_questions, summarize, git_commit, QUESTIONS_FILE, RESULTS_DIR
+
+
+def resident_memory_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class QuestionMix:
+    """Draws questions with a Zipf-like popularity skew"""
+    
+    def __init__(self, questions: List[str], skew: float):
+        """
+        Initialize the mix.
+        
+        Args:
+            questions (List[str]): Candidate questions, most popular first
+            skew (float): Zipf exponent; 0 means uniform
+        """
+        self.questions = questions
+        self.weights = [1 / (rank + 1) ** skew for rank in range(len(questions))]
+    
+    def draw(self, rng: random.Random) -> str:
+        """Pick one question"""
+        return rng.choices(self.questions, weights=self.weights)[0]
+
+
+class LoadStage:
+    """One fixed-concurrency run and its measurements"""
+    
+    def __init__(self, users: int, duration: float, services: Dict[str, Any], mix: QuestionMix,
+                 chat_ratio: float, think_time: float, seed: int):
+        self.users = users
+        self.duration = duration
+        self.services = services
+        self.mix = mix
+        self.chat_ratio = chat_ratio
+        self.think_time = think_time
+        self.seed = seed
+        
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {"chat": [], "horoscope": []}
+        self.errors: Dict[str, int] = {"chat": 0, "horoscope": 0}
+        self.memory: List[Dict[str, float]] = []
+        self.stop = threading.Event()
+    
+    def chat(self, question: str) -> bool:
+        """One chat turn; returns False if the user saw an error"""
+        vector_service = self.services["vector"]
+        context = ""
+        if vector_service is not None:
+            context = vector_service.retrieve_context(question, k=EmbeddingsConfig.DEFAULT_K)
+        answer = self.services["groq"].query_llama(question, context)
+        return not answer.startswith(("⚠", "⏳"))
+    
+    def horoscope(self, rng: random.Random) -> bool:
+        """One horoscope request; returns False if the calculation failed"""
+        calculator = self.services["astrology"]
+        moment = datetime(1950, 1, 1) + timedelta(minutes=rng.randrange(0, 70 * 365 * 24 * 60))
+        return bool(calculator.get_planetary_positions(calculator.calculate_julian_day(moment)))
+    
+    def user(self, index: int):
+        """Session loop: think, act, record"""
+        rng = random.Random(self.seed * 1000 + index)
+        # Stagger arrivals so sessions do not start in lockstep
+        if self.stop.wait(rng.uniform(0, self.think_time)):
+            return
+        while not self.stop.is_set():
+            kind = "chat" if rng.random() < self.chat_ratio else "horoscope"
+            start = time.perf_counter()
+            try:
+                ok = self.chat(self.mix.draw(rng)) if kind == "chat" else self.horoscope(rng)
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latencies[kind].append(elapsed)
+                if not ok:
+                    self.errors[kind] += 1
+            if self.stop.wait(rng.expovariate(1 / self.think_time) if self.think_time > 0 else 0):
+                return
+    
+    def sample_memory(self, started: float, interval: float):
+        """Record RSS periodically while the stage runs"""
+        while True:
+            self.memory.append({"t": round(time.perf_counter() - started, 2), "rss_mb": resident_memory_mb()})
+            if self.stop.wait(interval):
+                return
+    
+    def run(self, memory_interval: float) -> Dict[str, Any]:
+        """
+        Run the stage to completion.
+        
+        Args:
+            memory_interval (float): Seconds between RSS samples
+            
+        Returns:
+            Dict[str, Any]: Stage report
+        """
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self.user, args=(i,), daemon=True) for i in range(self.users)]
+        sampler = threading.Thread(target=self.sample_memory, args=(started, memory_interval), daemon=True)
+        sampler.start()
+        for thread in threads:
+            thread.start()
+            
+        time.sleep(self.duration)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        sampler.join()
+        elapsed = time.perf_counter() - started
+        
+        report: Dict[str, Any] = {"users": self.users, "seconds": elapsed}
+        total = 0
+        for kind, samples in self.latencies.items():
+            total += len(samples)
+            report[kind] = {
+                **summarize(samples),
+                "throughput_per_second": len(samples) / elapsed,
+                "error_rate": self.errors[kind] / len(samples) if samples else 0.0
+            }
+        report["throughput_per_second"] = total / elapsed
+        report["error_rate"] = sum(self.errors.values()) / total if total else 0.0
+        report["memory"] = {
+            "start_mb": self.memory[0]["rss_mb"],
+            "end_mb": self.memory[-1]["rss_mb"],
+            "growth_mb": self.memory[-1]["rss_mb"] - self.memory[0]["rss_mb"],
+            "samples": self.memory
+        }
+        return report
+
+
+def build_services(use_vector_db: bool) -> Dict[str, Any]:
+    """Create the same services the app uses"""
+    from api.services import GroqAPIService, VectorDatabaseService, create_embeddings, create_vectordb
+    from utils.helpers import AstrologyCalculator
+    
+    vector_service = None
+    if use_vector_db:
+        vector_service = VectorDatabaseService(create_vectordb(create_embeddings()))
+    return {
+        "groq": GroqAPIService(),
+        "vector": vector_service,
+        "astrology": AstrologyCalculator()
+    }
+
+
+def print_stage(report: Dict[str, Any]):
+    """One summary line per stage"""
+    chat = report["chat"]
+    print(
+        f"users={report['users']:4d}  rps={report['throughput_per_second']:7.2f}  "
+        f"chat p50={chat.get('p50', 0) * 1000:7.0f}ms p95={chat.get('p95', 0) * 1000:7.0f}ms "
+        f"p99={chat.get('p99', 0) * 1000:7.0f}ms  errors={report['error_rate']:.1%}  "
+        f"rss {report['memory']['start_mb']:.0f}->{report['memory']['end_mb']:.0f}MB"
+    )
+
+
+def main():
+    """Run each concurrency stage and write a JSON report"""
+    parser = argparse.ArgumentParser(description="Raavan AI load generator")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10, 25, 50],
+                        help="concurrent sessions per stage")
+    parser.add_argument("--duration", type=float, default=60, help="seconds per stage")
+    parser.add_argument("--think-time", type=float, default=5.0, help="mean seconds between actions")
+    parser.add_argument("--chat-ratio", type=float, default=0.8, help="share of chat vs horoscope actions")
+    parser.add_argument("--questions", type=Path, default=QUESTIONS_FILE)
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of question popularity")
+    parser.add_argument("--no-vector-db", action="store_true", help="skip retrieval")
+    parser.add_argument("--groq-url", help="use an already running stand-in instead of starting one")
+    parser.add_argument("--stub-ttft", type=float, default=0.3)
+    parser.add_argument("--stub-token-delay", type=float, default=0.01)
+    parser.add_argument("--stub-tokens", type=int, default=200)
+    parser.add_argument("--cassettes", help="replay recorded Groq traffic instead of the synthetic profile")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on replayed latencies")
+    parser.add_argument("--timing", choices=("recorded", "pooled"), default="recorded")
+    parser.add_argument("--memory-interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args()
+    
+    stub: Optional[GroqStubServer] = None
+    if args.groq_url:
+        APIConfig.GROQ_API_URL = args.groq_url
+    else:
+        stub = GroqStubServer(StubSettings(args.stub_ttft, args.stub_token_delay, args.stub_tokens,
+                                           seed=args.seed, cassettes=args.cassettes,
+                                           latency_scale=args.latency_scale, timing=args.timing)).start()
+        APIConfig.GROQ_API_URL = stub.url
+        
+    try:
+        services = build_services(not args.no_vector_db)
+        mix = QuestionMix(load_questions(args.questions), args.skew)
+        stages = []
+        for users in args.users:
+            stage = LoadStage(users, args.duration, services, mix, args.chat_ratio, args.think_time, args.seed)
+            report = stage.run(args.memory_interval)
+            print_stage(report)
+            stages.append(report)
+    finally:
+        if stub is not None:
+            stub.stop()
+            
+    document = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+        },
+        "stages": stages,
+        "stub": stub.httpd.settings.get_stats() if stub is not None else None
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = args.output / f"loadtest_{stamp}_{document['meta']['commit']}.json"
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    print(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Reproducible performance benchmarks for Raavan AI.
+
+Measures embedding throughput, retrieval latency by k, astrology charts per
+second, cold start of RaavanAIApp and end-to-end chat latency against an
+offline Groq stand-in, on data/ramayan.txt and synthetic scaled-up corpora.
+Results are written as JSON so runs can be compared across commits with
+benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run.py
+    python benchmarks/run.py --suites retrieve,e2e --scales 1 10 --repeat 50
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+# Benchmarks measure our pipeline, not the production quota
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "1000000")
+os.environ.setdefault("GROQ_TOKENS_PER_MINUTE", "1000000000")
+
+from config.settings import APIConfig, EmbeddingsConfig, DATA_DIR
+from groq_stub import GroqStubServer, StubSettings
+
+SUITES = ("embed", "retrieve", "astrology", "cold_start", "e2e")
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+QUESTIONS_FILE = ROOT / "benchmarks" / "questions.txt"
+
+
+# ========== HELPERS ==========
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarize latency samples in seconds.
+    
+    Args:
+        samples (List[float]): Measurements
+        
+    Returns:
+        Dict[str, float]: count, mean, min, max and p50/p95/p99
+    """
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "min": ordered[0],
+        "p50": pick(0.5),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1]
+    }
+
+
+def time_calls(fn: Callable[[], Any], repeat: int) -> List[float]:
+    """Run fn repeat times and return each duration"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def clear_retrieval_caches():
+    """Empty the query-embedding and retrieval caches, so the next call encodes and searches"""
+    from api.cache import query_cache, retrieval_cache
+    query_cache.clear()
+    retrieval_cache.clear()
+
+
+def load_questions(path: Path = QUESTIONS_FILE) -> List[str]:
+    """
+    Load benchmark questions, one per line.
+    
+    Args:
+        path (Path): Question file
+        
+    Returns:
+        List[str]: Questions
+    """
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def load_corpus_chunks() -> List[str]:
+    """Split data/ramayan.txt exactly like prepare_data does"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    
+    path = DATA_DIR / "ramayan.txt"
+    try:
+        text = path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        text = path.read_text(encoding="latin-1")
+        
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        separators=["\n\n", "\n", ".", "!", "?", " "]
+    )
+    return splitter.split_text(text)
+
+
+def scale_corpus(chunks: List[str], factor: int, seed: int) -> List[str]:
+    """
+    Build a synthetic corpus factor times larger.
+    
+    Each extra copy shuffles the sentences of every chunk, so vectors are
+    distinct but the text keeps realistic vocabulary and length.
+    
+    Args:
+        chunks (List[str]): Original chunks
+        factor (int): Size multiplier
+        seed (int): Random seed
+        
+    Returns:
+        List[str]: Scaled corpus
+    """
+    rng = random.Random(seed)
+    scaled = list(chunks)
+    for copy in range(1, factor):
+        for chunk in chunks:
+            sentences = [s for s in chunk.split(". ") if s]
+            rng.shuffle(sentences)
+            scaled.append(". ".join(sentences) + f" [variant {copy}]")
+    return scaled
+
+
+def git_commit() -> str:
+    """Current commit hash, or 'unknown' outside a checkout"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ========== SUITES ==========
+
+def bench_embed(embedding, corpora: Dict[int, List[str]], questions: List[str]) -> Dict[str, Any]:
+    """Document embedding throughput and single-query encode latency"""
+    results = {}
+    for scale, texts in corpora.items():
+        start = time.perf_counter()
+        embedding.embed_documents(texts)
+        elapsed = time.perf_counter() - start
+        results[f"scale_{scale}"] = {
+            "documents": len(texts),
+            "seconds": elapsed,
+            "documents_per_second": len(texts) / elapsed,
+            "chars_per_second": sum(len(t) for t in texts) / elapsed
+        }
+        
+    samples = []
+    for question in questions:
+        samples.extend(time_calls(lambda: embedding.embed_query(question), 1))
+    results["query_encode"] = summarize(samples)
+    return results
+
+
+def bench_retrieve(stores: Dict[int, Any], questions: List[str], ks: List[int], repeat: int) -> Dict[str, Any]:
+    """retrieve_context latency for each corpus scale and k, with the result caches empty"""
+    from api.services import VectorDatabaseService
+    
+    results = {}
+    for scale, vectordb in stores.items():
+        service = VectorDatabaseService(vectordb)
+        service.retrieve_context(questions[0], k=ks[0])  # Warm lazy loads
+        per_k = {}
+        for k in ks:
+            samples = []
+            for i in range(repeat):
+                question = questions[i % len(questions)]
+                clear_retrieval_caches()  # Repeated questions would otherwise time cache hits
+                samples.extend(time_calls(lambda: service.retrieve_context(question, k=k), 1))
+            per_k[f"k_{k}"] = summarize(samples)
+        results[f"scale_{scale}"] = per_k
+    return results
+
+
+def bench_astrology(charts: int, seed: int) -> Dict[str, Any]:
+    """Natal charts per second with AstrologyCalculator, tropical and batched sidereal with dashas"""
+    from utils import vedic
+    from utils.helpers import AstrologyCalculator
+    
+    calculator = AstrologyCalculator()
+    rng = random.Random(seed)
+    base = datetime(1950, 1, 1)
+    moments = [base + timedelta(minutes=rng.randrange(0, 70 * 365 * 24 * 60)) for _ in range(charts)]
+    
+    start = time.perf_counter()
+    for moment in moments:
+        calculator.get_planetary_positions(calculator.calculate_julian_day(moment))
+    elapsed = time.perf_counter() - start
+    
+    # Sidereal positions, nakshatras, dasha timelines and the current period, all in one batch
+    now = datetime.now()
+    start = time.perf_counter()
+    batch = vedic.sidereal_charts([calculator.calculate_julian_day(moment) for moment in moments])
+    vedic.current_periods(batch["dasha_starts"], [(now - moment).total_seconds() / 86400 for moment in moments])
+    sidereal = time.perf_counter() - start
+    return {
+        "charts": charts, "seconds": elapsed, "charts_per_second": charts / elapsed,
+        "sidereal_seconds": sidereal, "sidereal_charts_per_second": charts / sidereal
+    }
+
+
+COLD_START_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+from app.main import create_app
+imported = time.perf_counter()
+create_app()
+ready = time.perf_counter()
+print(json.dumps({{"import": imported - start, "init": ready - imported, "total": ready - start}}))
+"""
+
+
+def bench_cold_start(runs: int) -> Dict[str, Any]:
+    """Fresh-process import and construction time of RaavanAIApp"""
+    samples: Dict[str, List[float]] = {"import": [], "init": [], "total": []}
+    snippet = COLD_START_SNIPPET.format(src=str(ROOT / "src"))
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", snippet], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        for key, value in timings.items():
+            samples[key].append(value)
+    return {key: summarize(values) for key, values in samples.items()}
+
+
+def bench_e2e(vectordb, questions: List[str], repeat: int, stub: StubSettings) -> Dict[str, Any]:
+    """Retrieval plus Groq call, plain and streaming, against the stand-in, with the result caches empty"""
+    from api.services import GroqAPIService, VectorDatabaseService
+    from utils.metrics import metrics
+    
+    results = {}
+    with GroqStubServer(stub) as server:
+        APIConfig.GROQ_API_URL = server.url
+        groq = GroqAPIService()
+        vector_service = VectorDatabaseService(vectordb) if vectordb is not None else None
+        
+        def context_for(question):
+            if vector_service is None:
+                return ""
+            return vector_service.retrieve_context(question, k=EmbeddingsConfig.DEFAULT_K)
+            
+        totals = []
+        for i in range(repeat):
+            question = questions[i % len(questions)]
+            clear_retrieval_caches()
+            start = time.perf_counter()
+            groq.query_llama(question, context_for(question))
+            totals.append(time.perf_counter() - start)
+        results["blocking"] = summarize(totals)
+        
+        first_tokens, totals = [], []
+        for i in range(repeat):
+            question = questions[i % len(questions)]
+            clear_retrieval_caches()
+            start = time.perf_counter()
+            first = None
+            for _ in groq.stream_llama(question, context_for(question)):
+                if first is None:
+                    first = time.perf_counter() - start
+            totals.append(time.perf_counter() - start)
+            first_tokens.append(first or totals[-1])
+        results["streaming"] = {"first_token": summarize(first_tokens), "total": summarize(totals)}
+        
+    results["stages"] = metrics.summary()
+    results["stub"] = stub.get_stats()
+    return results
+
+
+# ========== RUNNER ==========
+
+def main():
+    """Run the selected suites and write a JSON report"""
+    parser = argparse.ArgumentParser(description="Raavan AI benchmarks")
+    parser.add_argument("--suites", default=",".join(SUITES),
+                        help=f"comma-separated subset of {', '.join(SUITES)}")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10],
+                        help="corpus size multipliers (1 = data/ramayan.txt)")
+    parser.add_argument("--ks", type=int, nargs="+", default=[1, 3, 5, 7, 10, 20])
+    parser.add_argument("--repeat", type=int, default=30, help="samples per measurement")
+    parser.add_argument("--charts", type=int, default=2000)
+    parser.add_argument("--cold-start-runs", type=int, default=3)
+    parser.add_argument("--stub-ttft", type=float, default=0.3)
+    parser.add_argument("--stub-token-delay", type=float, default=0.01)
+    parser.add_argument("--stub-tokens", type=int, default=200)
+    parser.add_argument("--cassettes", help="replay recorded Groq traffic instead of the synthetic profile")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on replayed latencies")
+    parser.add_argument("--timing", choices=("recorded", "pooled"), default="recorded")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args()
+    
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+        
+    random.seed(args.seed)
+    questions = load_questions()
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+        },
+        "results": {}
+    }
+    
+    embedding = None
+    stores: Dict[int, Any] = {}
+    corpora: Dict[int, List[str]] = {}
+    workdir = tempfile.TemporaryDirectory(prefix="raavan-bench-")
+    
+    if {"embed", "retrieve", "e2e"} & set(suites):
+        from api.services import create_embeddings
+        from langchain_community.vectorstores import Chroma
+        
+        embedding = create_embeddings()
+        chunks = load_corpus_chunks()
+        corpora = {scale: scale_corpus(chunks, scale, args.seed) for scale in args.scales}
+        
+        if {"retrieve", "e2e"} & set(suites):
+            for scale, texts in corpora.items():
+                print(f"Indexing scale {scale} ({len(texts)} chunks)...")
+                stores[scale] = Chroma.from_texts(
+                    texts=texts,
+                    embedding=embedding,
+                    persist_directory=os.path.join(workdir.name, f"scale_{scale}")
+                )
+                
+    try:
+        for suite in suites:
+            print(f"Running {suite}...")
+            if suite == "embed":
+                result = bench_embed(embedding, corpora, questions)
+            elif suite == "retrieve":
+                result = bench_retrieve(stores, questions, args.ks, args.repeat)
+            elif suite == "astrology":
+                result = bench_astrology(args.charts, args.seed)
+            elif suite == "cold_start":
+                result = bench_cold_start(args.cold_start_runs)
+            else:
+                stub = StubSettings(args.stub_ttft, args.stub_token_delay, args.stub_tokens, seed=args.seed,
+                                    cassettes=args.cassettes, latency_scale=args.latency_scale,
+                                    timing=args.timing)
+                result = bench_e2e(stores.get(min(args.scales)), questions, args.repeat, stub)
+            report["results"][suite] = result
+    finally:
+        workdir.cleanup()
+        
+    args.output.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = args.output / f"{stamp}_{report['meta']['commit']}.json"
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
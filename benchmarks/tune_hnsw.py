@@ -0,0 +1,222 @@
+"""
+HNSW parameter sweep for the Chroma collection.
+
+Builds an hnswlib index (the library Chroma uses) over the stored vectors for
+every M / construction_ef combination, queries it at each search_ef, and
+measures recall@k against exact brute-force neighbours plus query latency.
+The fastest setting that reaches the recall target is recommended, and can
+be written to the HNSW config file and applied by rebuilding the collection.
+
+Usage:
+    python benchmarks/tune_hnsw.py
+    python benchmarks/tune_hnsw.py --scale 20 --m 8 16 32 --search-ef 10 25 50 100
+    python benchmarks/tune_hnsw.py --write-config --rebuild
+"""
+
+import os
+import sys
+import json
+import argparse
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from config.settings import EmbeddingsConfig
+from api.hnsw import load_hnsw_params, save_hnsw_params, rebuild_collection
+from api.shared_index import read_collection
+from run import load_questions, summarize, git_commit, QUESTIONS_FILE, RESULTS_DIR
+
+
+def scale_vectors(vectors: np.ndarray, factor: int, noise: float, seed: int) -> np.ndarray:
+    """
+    Grow the corpus with perturbed copies of the stored vectors.
+
+    Args:
+        vectors (np.ndarray): Original vectors (N x D)
+        factor (int): Size multiplier
+        noise (float): Standard deviation of the Gaussian perturbation
+        seed (int): Random seed
+
+    Returns:
+        np.ndarray: (N * factor) x D vectors, normalized like the originals
+    """
+    if factor <= 1:
+        return vectors
+    rng = np.random.default_rng(seed)
+    copies = [vectors]
+    for _ in range(1, factor):
+        copy = vectors + rng.normal(0.0, noise, vectors.shape).astype(np.float32)
+        copies.append(copy / np.linalg.norm(copy, axis=1, keepdims=True))
+    return np.vstack(copies).astype(np.float32)
+
+
+def query_vectors(args, vectors: np.ndarray) -> np.ndarray:
+    """Encode the question set, or sample perturbed corpus vectors"""
+    if args.queries == "questions":
+        from api.services import create_embeddings
+        embedding = create_embeddings()
+        return np.asarray(embedding.embed_documents(load_questions(args.questions)), dtype=np.float32)
+    rng = np.random.default_rng(args.seed + 1)
+    picked = vectors[rng.choice(len(vectors), size=min(args.sample_queries, len(vectors)), replace=False)]
+    noisy = picked + rng.normal(0.0, args.noise, picked.shape).astype(np.float32)
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Brute-force squared-L2 top-k, the ground truth for recall"""
+    distances = (
+        np.einsum("ij,ij->i", vectors, vectors)[None, :]
+        - 2.0 * queries @ vectors.T
+        + np.einsum("ij,ij->i", queries, queries)[:, None]
+    )
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    return top
+
+
+def sweep(vectors: np.ndarray, queries: np.ndarray, args) -> List[Dict[str, Any]]:
+    """
+    Measure every parameter combination.
+
+    Returns:
+        List[Dict[str, Any]]: One row per (M, construction_ef, search_ef)
+    """
+    import hnswlib
+
+    k = min(args.k, len(vectors))
+    truth = [set(row) for row in exact_neighbors(vectors, queries, k)]
+    rows = []
+    for m in args.m:
+        for construction_ef in args.construction_ef:
+            index = hnswlib.Index(space=args.space, dim=vectors.shape[1])
+            start = time.perf_counter()
+            index.init_index(max_elements=len(vectors), ef_construction=construction_ef, M=m,
+                             random_seed=args.seed)
+            index.set_num_threads(args.threads)
+            index.add_items(vectors, np.arange(len(vectors)))
+            build_seconds = time.perf_counter() - start
+            index.set_num_threads(1)  # Serving answers one query per call
+
+            for search_ef in args.search_ef:
+                index.set_ef(max(search_ef, k))
+                latencies, hits = [], 0
+                for _ in range(args.repeat):
+                    for query, expected in zip(queries, truth):
+                        start = time.perf_counter()
+                        labels, _ = index.knn_query(query, k=k)
+                        latencies.append(time.perf_counter() - start)
+                        hits += len(expected.intersection(labels[0].tolist()))
+                recall = hits / (len(truth) * k * args.repeat)
+                rows.append({
+                    "M": m,
+                    "construction_ef": construction_ef,
+                    "search_ef": search_ef,
+                    "recall_at_k": recall,
+                    "build_seconds": build_seconds,
+                    "latency": summarize(latencies)
+                })
+                print(
+                    f"M={m:3d} ef_c={construction_ef:4d} ef_s={search_ef:4d}  "
+                    f"recall@{k}={recall:.3f}  p50={rows[-1]['latency']['p50'] * 1e6:7.1f}us  "
+                    f"p95={rows[-1]['latency']['p95'] * 1e6:7.1f}us  build={build_seconds:.2f}s"
+                )
+    return rows
+
+
+def recommend(rows: List[Dict[str, Any]], target: float) -> Dict[str, Any]:
+    """
+    Pick the fastest setting meeting the recall target.
+
+    Ties on latency prefer the smaller graph. If no setting reaches the
+    target, the one with the best recall wins.
+
+    Args:
+        rows (List[Dict[str, Any]]): Sweep results
+        target (float): Minimum recall@k
+
+    Returns:
+        Dict[str, Any]: The chosen row
+    """
+    good = [row for row in rows if row["recall_at_k"] >= target]
+    if not good:
+        return max(rows, key=lambda row: (row["recall_at_k"], -row["latency"]["p95"]))
+    return min(good, key=lambda row: (row["latency"]["p95"], row["M"], row["construction_ef"]))
+
+
+def main():
+    """Run the sweep, write the report and optionally apply the result"""
+    parser = argparse.ArgumentParser(description="HNSW recall/latency sweep")
+    parser.add_argument("--source", default=EmbeddingsConfig.PERSIST_DIRECTORY)
+    parser.add_argument("--collection", default="langchain")
+    parser.add_argument("--k", type=int, default=EmbeddingsConfig.DEFAULT_K)
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32, 48])
+    parser.add_argument("--construction-ef", type=int, nargs="+", default=[64, 100, 200])
+    parser.add_argument("--search-ef", type=int, nargs="+", default=[10, 20, 40, 80, 160])
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--scale", type=int, default=1, help="grow the corpus with perturbed copies")
+    parser.add_argument("--noise", type=float, default=0.02)
+    parser.add_argument("--queries", choices=("questions", "sample"), default="questions",
+                        help="encode the question file, or sample perturbed corpus vectors")
+    parser.add_argument("--questions", type=Path, default=QUESTIONS_FILE)
+    parser.add_argument("--sample-queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--write-config", action="store_true", help="save the recommendation to HNSW_PARAMS_FILE")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the collection with the recommendation")
+    args = parser.parse_args()
+
+    _, vectors, _, _, space = read_collection(args.source, args.collection)
+    args.space = space
+    vectors = scale_vectors(vectors, args.scale, args.noise, args.seed)
+    queries = query_vectors(args, vectors)
+    print(f"Corpus: {len(vectors)} vectors ({vectors.shape[1]}-d, {space}), {len(queries)} queries")
+
+    rows = sweep(vectors, queries, args)
+    best = recommend(rows, args.target_recall)
+    params = {
+        "space": space,
+        "M": best["M"],
+        "construction_ef": best["construction_ef"],
+        "search_ef": max(best["search_ef"], args.k)
+    }
+    print(
+        f"\nRecommended: M={params['M']} construction_ef={params['construction_ef']} "
+        f"search_ef={params['search_ef']} (recall@{args.k}={best['recall_at_k']:.3f}, "
+        f"p95={best['latency']['p95'] * 1e6:.1f}us); current: {load_hnsw_params()}"
+    )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "corpus_size": len(vectors),
+            "queries": len(queries),
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+        },
+        "results": rows,
+        "recommended": params
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = args.output / f"hnsw_{stamp}_{report['meta']['commit']}.json"
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"✅ Report written to {path}")
+
+    if args.write_config:
+        save_hnsw_params(params, recall_at_k=best["recall_at_k"], k=args.k,
+                         corpus_size=len(vectors), report=path.name)
+        print(f"✅ Parameters written to {EmbeddingsConfig.HNSW_PARAMS_FILE}")
+    if args.rebuild:
+        count = rebuild_collection(args.source, params, args.collection)
+        print(f"✅ Rebuilt collection '{args.collection}' with {count} vectors")
+
+
+if __name__ == "__main__":
+    main()
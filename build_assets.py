@@ -0,0 +1,43 @@
+"""
+Build step for the static assets of the Streamlit app.
+
+Minifies and content-hashes the stylesheet and bundles the Inter font
+files locally, under static/, which Streamlit serves when static serving
+is enabled. Once
+static/assets.json exists the app links the built stylesheet instead of
+inlining it, and no font is fetched from an external host at runtime.
+
+Usage:
+    python build_assets.py
+    python build_assets.py --font-css vendor/inter/inter.css   # air-gapped build
+    python build_assets.py --no-fonts
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src directory to Python path for imports
+current_dir = Path(__file__).parent
+src_path = current_dir / "src"
+sys.path.insert(0, str(src_path))
+
+from config.settings import AssetConfig
+from styles.assets import build_assets
+
+
+def main():
+    """Parse arguments and build the assets"""
+    parser = argparse.ArgumentParser(description="Build minified CSS and local fonts")
+    parser.add_argument("--output", default=AssetConfig.STATIC_DIR)
+    parser.add_argument("--font-css", default=AssetConfig.FONT_CSS, help="URL or file with @font-face rules")
+    parser.add_argument("--no-fonts", action="store_true", help="fall back to system fonts")
+    args = parser.parse_args()
+    
+    manifest = build_assets(args.output, font_css=None if args.no_fonts else args.font_css)
+    print(f"✅ Stylesheet {manifest['css']}: {manifest['source_css_bytes']} -> {manifest['css_bytes']} bytes")
+    print(f"✅ Bundled {len(manifest['fonts'])} font files")
+
+
+if __name__ == "__main__":
+    main()
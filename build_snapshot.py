@@ -0,0 +1,43 @@
+"""
+Build step for the single-file serving snapshot.
+
+Packs the sentence-transformers weights and vocabulary, plus the vectors
+and chunk texts of the Chroma collection, into one versioned file. Workers
+started with RAAVAN_SNAPSHOT pointing at it map the file instead of
+importing torch and opening Chroma. Needs torch and sentence-transformers;
+serving from the snapshot does not.
+
+Usage:
+    python build_snapshot.py [--source chroma_db] [--output raavan.snapshot] [--model NAME]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src directory to Python path for imports
+current_dir = Path(__file__).parent
+src_path = current_dir / "src"
+sys.path.insert(0, str(src_path))
+
+from config.settings import EmbeddingsConfig
+from api.snapshot import write_snapshot
+
+
+def main():
+    """Parse arguments and write the snapshot"""
+    parser = argparse.ArgumentParser(description="Build the Raavan AI serving snapshot")
+    parser.add_argument("--source", default=EmbeddingsConfig.PERSIST_DIRECTORY)
+    parser.add_argument("--output", default=EmbeddingsConfig.SNAPSHOT_FILE or EmbeddingsConfig.DEFAULT_SNAPSHOT_FILE)
+    parser.add_argument("--model", default=EmbeddingsConfig.MODEL_NAME)
+    parser.add_argument("--collection", default="langchain")
+    args = parser.parse_args()
+    
+    meta = write_snapshot(args.output, args.source, args.model, args.collection)
+    size_mb = Path(args.output).stat().st_size / (1024 * 1024)
+    print(f"✅ Snapshot with {meta['index']['count']} chunks and {meta['model']['name']} "
+          f"written to {args.output} ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Entry point for the shared embedding server.
+
+Loads the sentence-transformers model once and serves encode requests from
+every Streamlit and API worker on the node over a Unix socket. Start it
+before the workers and set RAAVAN_EMBEDDING_SOCKET to the same path.
+
+Usage:
+    python embedding_server.py [--socket /tmp/raavan-embeddings.sock] [--window-ms 5] [--max-batch 64]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src directory to Python path for imports
+current_dir = Path(__file__).parent
+src_path = current_dir / "src"
+sys.path.insert(0, str(src_path))
+
+from config.settings import EmbeddingsConfig
+from api.services import create_local_embeddings
+from api.embedding_server import EmbeddingServer
+
+
+def main():
+    """Parse arguments, load the model and serve until interrupted"""
+    parser = argparse.ArgumentParser(description="Raavan AI shared embedding server")
+    parser.add_argument("--socket", default=EmbeddingsConfig.SERVER_SOCKET or EmbeddingsConfig.DEFAULT_SERVER_SOCKET)
+    parser.add_argument("--model", default=EmbeddingsConfig.MODEL_NAME)
+    parser.add_argument("--window-ms", type=float, default=EmbeddingsConfig.BATCH_WINDOW_MS,
+                        help="Milliseconds to wait for more requests to join a batch")
+    parser.add_argument("--max-batch", type=int, default=EmbeddingsConfig.MAX_BATCH_SIZE)
+    args = parser.parse_args()
+    
+    embeddings = create_local_embeddings(args.model)
+    server = EmbeddingServer(args.socket, embeddings, args.max_batch, args.window_ms / 1000)
+    print(f"✅ Embedding server listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Ingestion tool for the read-only shared vector index.
+
+Exports the Chroma collection in chroma_db into flat, memory-mappable files
+that every Streamlit and API worker maps read-only when
+RAAVAN_READ_ONLY_INDEX=1 is set. Re-run after prepare_data rebuilds chroma_db.
+
+Usage:
+    python export_index.py [--source chroma_db] [--output shared_index] [--collection langchain]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src directory to Python path for imports
+current_dir = Path(__file__).parent
+src_path = current_dir / "src"
+sys.path.insert(0, str(src_path))
+
+from config.settings import EmbeddingsConfig
+from api.shared_index import export_shared_index
+
+
+def main():
+    """Parse arguments and export the index"""
+    parser = argparse.ArgumentParser(description="Export chroma_db into the shared read-only index")
+    parser.add_argument("--source", default=EmbeddingsConfig.PERSIST_DIRECTORY)
+    parser.add_argument("--output", default=EmbeddingsConfig.SHARED_INDEX_DIR)
+    parser.add_argument("--collection", default="langchain")
+    args = parser.parse_args()
+    
+    manifest = export_shared_index(args.source, args.output, args.collection)
+    print(f"✅ Exported {manifest['count']} vectors ({manifest['dimension']}-d, {manifest['space']}) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
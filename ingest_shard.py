@@ -0,0 +1,52 @@
+"""
+Ingestion tool for one shard of the corpus.
+
+Chunks a text file, embeds it into a new version of the named shard and
+publishes it in the shard manifest. Running servers switch to it on their
+next manifest check without a restart; other shards are untouched.
+
+Usage:
+    python ingest_shard.py --name sundara-kanda --file data/sundara_kanda.txt --language en \
+        --metadata kind=text kanda=sundara --keywords sundara hanuman ashoka
+    python ingest_shard.py --name ramcharitmanas-hi --file data/manas.txt --language hi --metadata kind=translation
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src directory to Python path for imports
+current_dir = Path(__file__).parent
+src_path = current_dir / "src"
+sys.path.insert(0, str(src_path))
+
+from config.settings import ShardConfig
+from api.services import create_embeddings
+from api.shards import build_shard
+from api.ingest import load_text, chunk_documents
+
+
+def main():
+    """Parse arguments, chunk, embed and publish the shard"""
+    parser = argparse.ArgumentParser(description="Build or rebuild one corpus shard")
+    parser.add_argument("--name", required=True)
+    parser.add_argument("--file", type=Path, required=True)
+    parser.add_argument("--language", choices=("en", "hi"), help="omit to search it for every query")
+    parser.add_argument("--metadata", nargs="*", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--keywords", nargs="*", default=[], help="words in a question that point at this shard")
+    parser.add_argument("--manifest", default=ShardConfig.MANIFEST_FILE)
+    parser.add_argument("--chunker", choices=("structure", "chars"), default="structure")
+    args = parser.parse_args()
+    
+    metadata = dict(item.split("=", 1) for item in args.metadata)
+    
+    chunks, chunk_metadata = chunk_documents(load_text(args.file), args.chunker)
+    print(f"✅ Total Chunks Created: {len(chunks)}")
+    
+    entry = build_shard(args.name, chunks, create_embeddings(), args.language, metadata,
+                        args.keywords, args.manifest, chunk_metadata)
+    print(f"✅ Shard '{entry['name']}' published as {entry['path']} in {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Publishing tool for blue/green vector index versions.
+
+Builds a complete new index version under indexes/ and flips the atomic
+CURRENT pointer to it. Running Streamlit and API workers notice the flip,
+warm the new version in the background and swap it in without a restart;
+in-flight queries finish on the old one. Old versions are kept for rollback
+and collected beyond --keep.
+
+Usage:
+    python publish_index.py --build data/ramayan.txt [--format shared]
+    python publish_index.py --copy chroma_db
+    python publish_index.py --list
+    python publish_index.py --activate v20240101T120000
+"""
+
+import sys
+import shutil
+import argparse
+from pathlib import Path
+
+# Add src directory to Python path for imports
+current_dir = Path(__file__).parent
+src_path = current_dir / "src"
+sys.path.insert(0, str(src_path))
+
+from config.settings import IndexVersionConfig
+from api.index_versions import current_version, set_current, list_versions, publish_version, gc_versions
+
+
+def build_from_text(file_path: Path, index_format: str, chunker: str):
+    """Return a builder that chunks and embeds a text file into a version"""
+    def build(staging: Path):
+        from langchain_community.vectorstores import Chroma
+        from api.services import create_embeddings
+        from api.hnsw import collection_metadata
+        from api.ingest import load_text, chunk_documents
+        
+        chunks, metadatas = chunk_documents(load_text(file_path), chunker)
+        print(f"✅ Total Chunks Created: {len(chunks)}")
+        
+        chroma_dir = staging if index_format == "chroma" else staging.with_name(staging.name + ".chroma")
+        Chroma.from_texts(
+            texts=chunks,
+            embedding=create_embeddings(),
+            metadatas=metadatas,
+            persist_directory=str(chroma_dir),
+            collection_metadata=collection_metadata()
+        )
+        if index_format == "shared":
+            export_shared(chroma_dir, staging)
+            shutil.rmtree(chroma_dir, ignore_errors=True)
+    return build
+
+
+def copy_existing(source: Path, index_format: str):
+    """Return a builder that copies (or exports) an existing Chroma directory"""
+    def build(staging: Path):
+        if index_format == "shared":
+            export_shared(source, staging)
+        else:
+            shutil.copytree(source, staging)
+    return build
+
+
+def export_shared(chroma_dir: Path, staging: Path):
+    """Export a Chroma directory into the memory-mapped format"""
+    from api.shared_index import export_shared_index
+    manifest = export_shared_index(str(chroma_dir), str(staging))
+    print(f"✅ Exported {manifest['count']} vectors ({manifest['dimension']}-d, {manifest['space']})")
+
+
+def main():
+    """Parse arguments and publish, list or activate versions"""
+    parser = argparse.ArgumentParser(description="Publish and switch vector index versions")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--build", type=Path, metavar="FILE", help="chunk and embed a text file")
+    action.add_argument("--copy", type=Path, metavar="DIR", help="publish an existing Chroma directory")
+    action.add_argument("--activate", metavar="VERSION", help="point CURRENT at an existing version (rollback)")
+    action.add_argument("--list", action="store_true", help="list versions")
+    parser.add_argument("--format", choices=("chroma", "shared"), default="chroma",
+                        help="store the version as Chroma or as the memory-mapped shared index")
+    parser.add_argument("--chunker", choices=("structure", "chars"), default="structure",
+                        help="chunking used by --build")
+    parser.add_argument("--no-activate", action="store_true", help="publish without flipping CURRENT")
+    parser.add_argument("--keep", type=int, default=IndexVersionConfig.KEEP_VERSIONS)
+    parser.add_argument("--versions-dir", default=IndexVersionConfig.VERSIONS_DIR)
+    args = parser.parse_args()
+    
+    if args.list:
+        current = current_version(args.versions_dir)
+        for version in list_versions(args.versions_dir):
+            print(f"{'*' if version == current else ' '} {version}")
+        return
+        
+    if args.activate:
+        set_current(args.activate, args.versions_dir)
+        print(f"✅ CURRENT now points at {args.activate}")
+        return
+        
+    if args.build:
+        builder = build_from_text(args.build, args.format, args.chunker)
+    else:
+        builder = copy_existing(args.copy, args.format)
+    version = publish_version(builder, args.versions_dir, activate=False)
+    print(f"✅ Published {version} in {args.versions_dir}")
+    
+    if not args.no_activate:
+        set_current(version, args.versions_dir)
+        print(f"✅ CURRENT now points at {version}")
+        removed = gc_versions(args.versions_dir, args.keep)
+        if removed:
+            print(f"✅ Removed old versions: {', '.join(removed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Entry point for the headless Raavan AI HTTP API.
+
+Serves /chat (JSON or SSE streaming), /retrieve and /horoscope, plus
+/healthz and /readyz probes for load balancers and orchestrators.
+
+Usage:
+    python server.py [--host 0.0.0.0] [--port 8080] [--processes 1]
+"""
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+from dotenv import load_dotenv
+load_dotenv()
+
+# Add src directory to Python path for imports
+current_dir = Path(__file__).parent
+src_path = current_dir / "src"
+sys.path.insert(0, str(src_path))
+
+from config.settings import ServerConfig
+from server.app import run_server
+
+
+def main():
+    """Parse arguments and start the server"""
+    parser = argparse.ArgumentParser(description="Raavan AI HTTP API server")
+    parser.add_argument("--host", default=ServerConfig.HOST)
+    parser.add_argument("--port", type=int, default=ServerConfig.PORT)
+    parser.add_argument("--processes", type=int, default=ServerConfig.PROCESSES,
+                        help="Server processes sharing the port (one per core)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(format="%(asctime)s %(process)d %(name)s %(levelname)s %(message)s")
+    logging.getLogger("api").setLevel(logging.INFO)  # Service events such as adaptive-limit changes
+    
+    run_server(host=args.host, port=args.port, processes=args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Adaptive retrieval and generation limits.
+Watches end-to-end chat latency and the Groq queue, and moves k, the context
+token budget and max_tokens between configured bounds so the p95 stays under
+the target: shorter answers at peak, richer ones again when there is headroom.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, NamedTuple, Optional
+
+from config.settings import AdaptiveConfig
+from api.rate_limiter import groq_rate_limiter
+from api.routing import is_short_factual
+from utils.metrics import Histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Limits(NamedTuple):
+    """Per-request retrieval and generation limits"""
+    
+    k: int
+    context_tokens: int
+    max_tokens: int
+
+
+def _scale(level: float, low: int, high: int) -> int:
+    return int(round(low + level * (high - low)))
+
+
+class AdaptiveController:
+    """Additive-increase, fast-decrease controller over a single richness level"""
+    
+    def __init__(self, target_p95: float = AdaptiveConfig.TARGET_P95):
+        """
+        Start at full richness.
+        
+        Args:
+            target_p95 (float): End-to-end p95 latency target in seconds
+        """
+        self.target_p95 = target_p95
+        self.level = 1.0  # 1.0 is the unadapted defaults, 0.0 every lower bound
+        self._lock = threading.Lock()
+        self._latency = Histogram(window=AdaptiveConfig.LATENCY_WINDOW)
+        self._next_decision = time.monotonic() + AdaptiveConfig.ADJUST_INTERVAL
+        self.history = deque(maxlen=AdaptiveConfig.HISTORY_SIZE)
+    
+    def limits(self, question: Optional[str] = None) -> Limits:
+        """
+        Get the limits for a new request.
+        
+        Args:
+            question (Optional[str]): User's question; short factual ones get shorter answers
+            
+        Returns:
+            Limits: k, context token budget and max_tokens; the defaults when adaptation is off
+        """
+        if not AdaptiveConfig.ENABLED:
+            return self._limits_at(1.0)
+        limits = self._limits_at(self.level)
+        if question is not None and is_short_factual(question):
+            limits = limits._replace(max_tokens=min(limits.max_tokens, AdaptiveConfig.SHORT_ANSWER_TOKENS))
+        return limits
+    
+    @staticmethod
+    def _limits_at(level: float) -> Limits:
+        return Limits(
+            k=_scale(level, AdaptiveConfig.MIN_K, AdaptiveConfig.MAX_K),
+            context_tokens=_scale(level, AdaptiveConfig.MIN_CONTEXT_TOKENS, AdaptiveConfig.MAX_CONTEXT_TOKENS),
+            max_tokens=_scale(level, AdaptiveConfig.MIN_MAX_TOKENS, AdaptiveConfig.MAX_MAX_TOKENS)
+        )
+    
+    def observe(self, seconds: float):
+        """
+        Record the end-to-end latency of one chat answer.
+        
+        Args:
+            seconds (float): Seconds from question to complete answer
+        """
+        self._latency.observe(seconds)
+        metrics.observe("raavan_chat_latency_seconds", seconds)
+        if AdaptiveConfig.ENABLED and time.monotonic() >= self._next_decision:
+            self.adjust()
+    
+    def adjust(self) -> bool:
+        """
+        Compare recent latency and queue depth with the target and move the level.
+        
+        Returns:
+            bool: True if the limits changed
+        """
+        with self._lock:
+            self._next_decision = time.monotonic() + AdaptiveConfig.ADJUST_INTERVAL
+            if len(self._latency.recent) < AdaptiveConfig.MIN_SAMPLES:
+                return False
+            p95 = self._latency.quantiles((0.95,))["p95"]
+            queue_depth = groq_rate_limiter.get_stats()["queue_depth"]
+            
+            if p95 > self.target_p95 or queue_depth >= AdaptiveConfig.QUEUE_HIGH:
+                level, direction = max(0.0, self.level - AdaptiveConfig.DECREASE_STEP), "down"
+            elif p95 < self.target_p95 * AdaptiveConfig.HEADROOM and queue_depth == 0:
+                level, direction = min(1.0, self.level + AdaptiveConfig.INCREASE_STEP), "up"
+            else:
+                return False
+            if level == self.level:
+                return False
+                
+            before, after = self._limits_at(self.level), self._limits_at(level)
+            self.level = level
+            # Judge the new limits on their own samples
+            self._latency = Histogram(window=AdaptiveConfig.LATENCY_WINDOW)
+            
+        entry = {
+            "time": time.time(),
+            "direction": direction,
+            "p95_seconds": round(p95, 3),
+            "queue_depth": queue_depth,
+            "level": round(level, 2),
+            "before": before._asdict(),
+            "after": after._asdict()
+        }
+        self.history.append(entry)
+        metrics.increment("raavan_adaptive_adjustments_total", direction=direction)
+        logger.info(
+            "Adaptive limits %s: p95=%.2fs (target %.2fs) queue=%d, k %d->%d, context %d->%d, max_tokens %d->%d",
+            direction, p95, self.target_p95, queue_depth, before.k, after.k,
+            before.context_tokens, after.context_tokens, before.max_tokens, after.max_tokens
+        )
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the current level, limits and recent latency.
+        
+        Returns:
+            Dict[str, Any]: Controller state; "adjustments" lists recent changes
+        """
+        limits = self._limits_at(self.level)
+        return {
+            "level": self.level,
+            "k": limits.k,
+            "context_tokens": limits.context_tokens,
+            "max_tokens": limits.max_tokens,
+            "p95_seconds": self._latency.quantiles((0.95,))["p95"],
+            "target_p95_seconds": self.target_p95,
+            "adjustments": list(self.history)
+        }
+
+
+# Process-wide controller shared by every session and worker thread
+adaptive_controller = AdaptiveController()
+metrics.register_collector("raavan_adaptive", adaptive_controller.get_stats)
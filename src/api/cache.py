@@ -0,0 +1,161 @@
+"""
+In-process caches for answers, query embeddings and retrieved context.
+Each is a bounded LRU with a time-to-live. Answers are kept per normalized
+question, both as a fallback while the LLM is unavailable and to serve the
+most common questions without calling it; the deploy-time warm-up fills all
+three before the server reports ready. Like retrieved context, answers are
+scoped to the index version, and also to the model and system prompt, so a
+new index or prompt is never answered from the old one.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import APIConfig, CircuitBreakerConfig, PersonaConfig, WarmupConfig
+from utils.helpers import normalize_question
+from utils.metrics import metrics
+
+
+class TTLCache:
+    """Thread-safe LRU of string keys with a time-to-live"""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            max_entries (int): Entries kept before the least recently used is evicted
+            ttl (float): Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Look up an entry.
+        
+        Args:
+            key (str): Cache key
+            max_age (Optional[float]): Stricter age limit in seconds than the TTL
+            
+        Returns:
+            Optional[Any]: Cached value, or None
+        """
+        limit = self.ttl if max_age is None else min(max_age, self.ttl)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > limit:
+                if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key: str, value: Any, age: float = 0.0):
+        """
+        Store an entry.
+        
+        Args:
+            key (str): Cache key
+            value (Any): Value to keep
+            age (float): Seconds since the value was produced, for values loaded from disk
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() - age, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry; hit counters are kept"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache size and hit counters.
+        
+        Returns:
+            Dict[str, int]: Entries, hits and misses
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache(maxsize=16)
+def _scope(index_version: str, model: str, system_prompt: str) -> str:
+    return hashlib.sha256(f"{index_version}|{model}|{system_prompt}".encode("utf-8")).hexdigest()[:16]
+
+
+def answer_scope(index_version: str = "") -> str:
+    """
+    Identify what an answer depends on besides the question.
+    
+    Args:
+        index_version (str): Version of the index the context came from, "" without one
+        
+    Returns:
+        str: Hash of the index version, model name and system prompt
+    """
+    return _scope(index_version, APIConfig.MODEL_NAME, PersonaConfig.SYSTEM_PROMPT)
+
+
+class AnswerCache(TTLCache):
+    """Thread-safe LRU of question to answer, per answer_scope()"""
+    
+    def __init__(self, max_entries: int = CircuitBreakerConfig.CACHE_SIZE,
+                 ttl: float = CircuitBreakerConfig.CACHE_TTL):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            max_entries (int): Answers kept before the least recently used is evicted
+            ttl (float): Seconds an answer stays valid
+        """
+        super().__init__(max_entries, ttl)
+    
+    def get(self, question: str, max_age: Optional[float] = None,
+            index_version: str = "") -> Optional[str]:
+        """
+        Look up the answer to a question.
+        
+        Args:
+            question (str): User's question
+            max_age (Optional[float]): Stricter age limit in seconds than the TTL
+            index_version (str): Version of the index being served
+            
+        Returns:
+            Optional[str]: Cached answer, or None
+        """
+        return super().get(f"{answer_scope(index_version)}|{normalize_question(question)}", max_age)
+    
+    def put(self, question: str, answer: str, age: float = 0.0, index_version: str = ""):
+        """
+        Store a successful answer.
+        
+        Args:
+            question (str): User's question
+            answer (str): Generated answer
+            age (float): Seconds since the answer was generated
+            index_version (str): Version of the index the context came from
+        """
+        super().put(f"{answer_scope(index_version)}|{normalize_question(question)}", answer, age)
+
+
+# Process-wide caches shared by every session and worker thread
+answer_cache = AnswerCache()
+query_cache = TTLCache(WarmupConfig.QUERY_CACHE_SIZE, WarmupConfig.QUERY_CACHE_TTL)
+retrieval_cache = TTLCache(WarmupConfig.RETRIEVAL_CACHE_SIZE, WarmupConfig.RETRIEVAL_CACHE_TTL)
+metrics.register_collector("raavan_answer_cache", answer_cache.get_stats)
+metrics.register_collector("raavan_query_cache", query_cache.get_stats)
+metrics.register_collector("raavan_retrieval_cache", retrieval_cache.get_stats)
@@ -0,0 +1,287 @@
+"""
+Record and replay of Groq traffic.
+With RAAVAN_GROQ_RECORD set, every chat completion GroqAPIService makes is
+written to a cassette: the request payload, the answer, the streamed deltas
+with their arrival times, and the reported usage. benchmarks/groq_stub.py
+replays a directory of cassettes with the recorded latencies, so pipeline
+changes can be measured offline against realistic Groq behaviour.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import CassetteConfig
+from utils.metrics import metrics
+
+CASSETTE_VERSION = 1
+WORD_PATTERN = re.compile(r"\w+")
+QUESTION_PATTERN = re.compile(r"^Question:\s*(.*?)\s*(?:\n\nContext:\n(.*))?$", re.DOTALL)
+
+
+def cassette_key(payload: Dict[str, Any]) -> str:
+    """
+    Identify a request by the model and messages it sends.
+    
+    Args:
+        payload (Dict[str, Any]): Chat-completions request body
+        
+    Returns:
+        str: Hex digest; equal for requests Groq would see as the same prompt
+    """
+    identity = {"model": payload.get("model"), "messages": payload.get("messages", [])}
+    return hashlib.sha256(json.dumps(identity, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def split_prompt(payload: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Extract the question and context of the last user message.
+    
+    Args:
+        payload (Dict[str, Any]): Chat-completions request body
+        
+    Returns:
+        Tuple[str, str]: Question and retrieved context; the whole message and "" if it is not ours
+    """
+    users = [m.get("content", "") for m in payload.get("messages", []) if m.get("role") == "user"]
+    if not users:
+        return "", ""
+    match = QUESTION_PATTERN.match(users[-1])
+    if match is None:
+        return users[-1], ""
+    return match.group(1), match.group(2) or ""
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(word.lower() for word in WORD_PATTERN.findall(text))
+
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two word sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class Recording:
+    """One request being recorded; written out once the answer is complete"""
+    
+    def __init__(self, recorder: "CassetteRecorder", payload: Dict[str, Any], url: str):
+        """
+        Start the clock for a request about to be sent.
+        
+        Args:
+            recorder (CassetteRecorder): Recorder that writes the cassette
+            payload (Dict[str, Any]): Request body
+            url (str): Endpoint the request goes to
+        """
+        self.recorder = recorder
+        self.payload = payload
+        self.url = url
+        self.started = time.perf_counter()
+        self.deltas: List[str] = []
+        self.offsets: List[float] = []
+        self.usage: Optional[Dict[str, Any]] = None
+    
+    def token(self, delta: str):
+        """Note a streamed content delta and when it arrived"""
+        self.offsets.append(round(time.perf_counter() - self.started, 4))
+        self.deltas.append(delta)
+    
+    def finish(self, content: Optional[str] = None, usage: Optional[Dict[str, Any]] = None):
+        """
+        Write the cassette of a completed answer.
+        
+        Args:
+            content (Optional[str]): Full answer of a non-streaming request; the joined deltas otherwise
+            usage (Optional[Dict[str, Any]]): Token usage reported by Groq
+        """
+        duration = time.perf_counter() - self.started
+        self.recorder.write({
+            "version": CASSETTE_VERSION,
+            "key": cassette_key(self.payload),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "url": self.url,
+            "request": self.payload,
+            "stream": bool(self.payload.get("stream")),
+            "content": content if content is not None else "".join(self.deltas),
+            "deltas": self.deltas,
+            "offsets": self.offsets,
+            "ttft": self.offsets[0] if self.offsets else round(duration, 4),
+            "duration": round(duration, 4),
+            "usage": usage or self.usage
+        })
+
+
+class CassetteRecorder:
+    """Writes one JSON cassette per completed Groq request"""
+    
+    def __init__(self, directory: Optional[str] = CassetteConfig.RECORD_DIR):
+        """
+        Initialize the recorder.
+        
+        Args:
+            directory (Optional[str]): Cassette directory; None or "" disables recording
+        """
+        self.directory = Path(directory) if directory else None
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.recorded = 0
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether requests are being recorded"""
+        return self.directory is not None
+    
+    def start(self, payload: Dict[str, Any], url: str) -> Optional[Recording]:
+        """
+        Begin recording a request.
+        
+        Args:
+            payload (Dict[str, Any]): Request body; headers and the API key are never recorded
+            url (str): Endpoint the request goes to
+            
+        Returns:
+            Optional[Recording]: The recording, or None while recording is off
+        """
+        if self.directory is None:
+            return None
+        return Recording(self, payload, url)
+    
+    def write(self, cassette: Dict[str, Any]):
+        """
+        Store a cassette atomically, so a replaying stub never reads half a file.
+        
+        Args:
+            cassette (Dict[str, Any]): Cassette contents
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        name = f"{stamp}_{cassette['key'][:12]}_{os.getpid()}_{next(self._counter)}.json"
+        staging = self.directory / f".{name}.tmp"
+        staging.write_text(json.dumps(cassette, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(staging, self.directory / name)
+        with self._lock:
+            self.recorded += 1
+        metrics.increment("raavan_groq_cassettes_recorded_total")
+
+
+def load_cassettes(directory: str) -> List[Dict[str, Any]]:
+    """
+    Read every cassette in a directory.
+    
+    Args:
+        directory (str): Cassette directory
+        
+    Returns:
+        List[Dict[str, Any]]: Cassettes sorted by file name, i.e. recording order
+        
+    Raises:
+        FileNotFoundError: If the directory does not exist
+    """
+    path = Path(directory)
+    if not path.is_dir():
+        raise FileNotFoundError(f"No cassette directory at {directory}")
+    cassettes = []
+    for file in sorted(path.glob("*.json")):
+        try:
+            cassette = json.loads(file.read_text(encoding="utf-8"))
+        except ValueError:
+            continue
+        if cassette.get("version") == CASSETTE_VERSION:
+            cassettes.append(cassette)
+    return cassettes
+
+
+class CassetteLibrary:
+    """Recorded Groq answers, looked up by prompt"""
+    
+    def __init__(self, cassettes: List[Dict[str, Any]], seed: Optional[int] = 42):
+        """
+        Index cassettes for matching.
+        
+        Args:
+            cassettes (List[Dict[str, Any]]): Cassettes from load_cassettes
+            seed (Optional[int]): Random seed for sampled timings
+            
+        Raises:
+            ValueError: If there are no cassettes
+        """
+        if not cassettes:
+            raise ValueError("A cassette library needs at least one cassette")
+        self.cassettes = cassettes
+        self.by_key: Dict[str, Dict[str, Any]] = {}
+        for cassette in cassettes:
+            self.by_key.setdefault(cassette["key"], cassette)
+        self._words = []
+        for cassette in cassettes:
+            question, context = split_prompt(cassette["request"])
+            self._words.append((_words(question), _words(context)))
+            
+        # Pooled latency distribution of everything recorded
+        self.ttfts = sorted(c["ttft"] for c in cassettes)
+        self.gaps = sorted(
+            later - earlier for c in cassettes for earlier, later in zip(c["offsets"], c["offsets"][1:])
+        )
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def match(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        """
+        Find the cassette that best answers a request.
+        
+        An identical prompt matches exactly. Otherwise the cassette with
+        the most similar question wins, ties going to the more similar
+        context and then to a cassette of the same model and stream mode.
+        
+        Args:
+            payload (Dict[str, Any]): Chat-completions request body
+            
+        Returns:
+            Tuple[Dict[str, Any], float]: Cassette and match score, 1.0 for an exact match
+        """
+        exact = self.by_key.get(cassette_key(payload))
+        if exact is not None:
+            return exact, 1.0
+            
+        question, context = split_prompt(payload)
+        question_words, context_words = _words(question), _words(context)
+        model, stream = payload.get("model"), bool(payload.get("stream"))
+        best, best_rank = None, None
+        for cassette, (q_words, c_words) in zip(self.cassettes, self._words):
+            rank = (
+                _similarity(question_words, q_words),
+                _similarity(context_words, c_words),
+                (cassette["request"].get("model") == model) + (cassette["stream"] == stream)
+            )
+            if best_rank is None or rank > best_rank:
+                best, best_rank = cassette, rank
+        return best, round(best_rank[0], 4)
+    
+    def sample_timing(self, tokens: int) -> List[float]:
+        """
+        Draw delta arrival times from the pooled latency distribution.
+        
+        Args:
+            tokens (int): Deltas to time
+            
+        Returns:
+            List[float]: Seconds from the request to each delta
+        """
+        with self._lock:
+            offsets = [self.random.choice(self.ttfts)] if tokens else []
+            for _ in range(tokens - 1):
+                offsets.append(offsets[-1] + (self.random.choice(self.gaps) if self.gaps else 0.0))
+        return offsets
+
+
+# Process-wide recorder used by GroqAPIService
+cassette_recorder = CassetteRecorder()
@@ -0,0 +1,255 @@
+"""
+Structure-aware chunking of the Ramayan corpus.
+Splits the text at kanda, sarga and section headings, then packs whole
+paragraphs and verses into chunks sized to a token target, without
+overlap. Every chunk carries its token count and position in the text, so
+query-time context assembly never has to measure it again.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import EmbeddingsConfig
+from utils.helpers import estimate_tokens
+
+# "Bala Kanda", "Sundara Kāṇḍa", "Ayodhyakanda" and lossy decodings like "K???a"
+KANDA_PATTERN = re.compile(r"k[aā?][nṇ?][dḍ?][aā?]$", re.IGNORECASE)
+SARGA_PATTERN = re.compile(r"\b(?:sarga|canto|chapter)\s+(\d+)", re.IGNORECASE)
+# Verse numbers: "॥ 12 ॥", "|| 12 ||", "।।12।।"
+VERSE_END_PATTERN = re.compile(r"(?:॥|\|\||।।)\s*[\d०-९.]*\s*(?:॥|\|\||।।)?")
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?।])\s+")
+
+MAX_HEADING_CHARS = 60
+
+
+@dataclass
+class Unit:
+    """A paragraph, stanza or sentence run that is never split further"""
+    text: str
+    line: int
+    verse: bool = False
+    tokens: int = field(init=False)
+    
+    def __post_init__(self):
+        self.tokens = estimate_tokens(self.text)
+
+
+@dataclass
+class Chunk:
+    """A chunk of the corpus and its metadata"""
+    text: str
+    metadata: Dict[str, Any]
+    
+    @property
+    def tokens(self) -> int:
+        """Estimated LLM tokens of the chunk text"""
+        return self.metadata["tokens"]
+
+
+def is_heading(line: str) -> bool:
+    """
+    Decide whether a line is a heading rather than body text.
+    
+    Args:
+        line (str): Stripped line
+        
+    Returns:
+        bool: True for short lines without closing punctuation
+    """
+    if not line or len(line) > MAX_HEADING_CHARS or line.startswith(("*", "-", "•")):
+        return False
+    if VERSE_END_PATTERN.search(line):
+        return False
+    return not line.rstrip(")]\"'").endswith((".", "!", "?", ":", ";", ",", "।"))
+
+
+def _split_long(unit: Unit, max_tokens: int, measure: Callable[[str], int] = estimate_tokens) -> List[Unit]:
+    """Split an oversized unit at sentence boundaries, or words as a last resort"""
+    pieces = []
+    for sentence in SENTENCE_END_PATTERN.split(unit.text):
+        pieces.extend(sentence.split(" ") if measure(sentence) > max_tokens else [sentence])
+        
+    units, current = [], ""
+    for piece in pieces:
+        candidate = f"{current} {piece}".strip()
+        if current and measure(candidate) > max_tokens:
+            units.append(Unit(current, unit.line, unit.verse))
+            candidate = piece
+        current = candidate
+    if current:
+        units.append(Unit(current, unit.line, unit.verse))
+    return units
+
+
+def parse_sections(text: str) -> List[Dict[str, Any]]:
+    """
+    Split text into sections with their heading path and body units.
+    
+    Consecutive short body lines form a stanza and stay together; long
+    lines are paragraphs and are cut after verse numbers when they hold
+    several verses.
+    
+    Args:
+        text (str): Corpus text
+        
+    Returns:
+        List[Dict[str, Any]]: Sections with kanda, sarga, section and units
+    """
+    sections: List[Dict[str, Any]] = []
+    state = {"kanda": None, "sarga": None, "section": None}
+    current = {**state, "units": []}
+    block: List[tuple] = []
+    
+    def flush_block():
+        if not block:
+            return
+        lines = [line for _, line in block]
+        if len(lines) > 1 and sum(map(len, lines)) / len(lines) < 120:
+            # A stanza: one unit per verse, ending at its verse number
+            verse: List[tuple] = []
+            for number, line in block:
+                verse.append((number, line))
+                if VERSE_END_PATTERN.search(line):
+                    current["units"].append(Unit("\n".join(l for _, l in verse), verse[0][0], verse=True))
+                    verse = []
+            if verse:
+                current["units"].append(Unit("\n".join(l for _, l in verse), verse[0][0], verse=True))
+        else:
+            for number, line in block:
+                parts = [p.strip() for p in re.split(f"({VERSE_END_PATTERN.pattern})", line)]
+                # Re-attach each verse number to the verse before it
+                verses = [" ".join(parts[i:i + 2]).strip() for i in range(0, len(parts), 2)]
+                verses = [v for v in verses if v]
+                is_verse = len(verses) > 1
+                for verse in verses:
+                    current["units"].append(Unit(verse, number, verse=is_verse))
+        block.clear()
+    
+    def start_section():
+        nonlocal current
+        flush_block()
+        if current["units"]:
+            sections.append(current)
+        current = {**state, "units": []}
+        
+    for number, raw in enumerate(text.splitlines(), start=1):
+        line = raw.strip()
+        if not line:
+            flush_block()
+            continue
+        if is_heading(line):
+            if len(line) <= 2:
+                continue  # Index letters of an alphabetical list
+            start_section()
+            sarga = SARGA_PATTERN.search(line)
+            if sarga:
+                state.update(sarga=int(sarga.group(1)), section=line)
+            elif KANDA_PATTERN.search(line):
+                state.update(kanda=line, sarga=None, section=line)
+            else:
+                # Any other heading means the text has left the kanda
+                state.update(kanda=None, sarga=None, section=line)
+            current.update(state)
+            continue
+        block.append((number, line))
+        
+    start_section()
+    return sections
+
+
+def chunk_text(text: str, target_tokens: int = EmbeddingsConfig.CHUNK_TOKENS,
+               max_tokens: int = EmbeddingsConfig.CHUNK_MAX_TOKENS,
+               min_tokens: int = EmbeddingsConfig.CHUNK_MIN_TOKENS,
+               measure: Optional[Callable[[str], int]] = None) -> List[Chunk]:
+    """
+    Chunk text along its structure.
+    
+    Units are packed greedily up to the target within one section; a
+    chunk never spans a heading. A short tail is merged into the previous
+    chunk when that stays under max_tokens.
+    
+    Args:
+        text (str): Corpus text
+        target_tokens (int): Preferred chunk size, in estimated LLM tokens
+        max_tokens (int): Hard limit, in the units of measure
+        min_tokens (int): Smallest chunk worth keeping on its own
+        measure (Optional[Callable[[str], int]]): Counts tokens against max_tokens, e.g. the
+            embedding tokenizer's word pieces; estimate_tokens by default
+        
+    Returns:
+        List[Chunk]: Chunks in text order with their metadata
+    """
+    measure = measure or estimate_tokens
+    chunks: List[Chunk] = []
+    for section in parse_sections(text):
+        units = [piece for unit in section["units"]
+                 for piece in (_split_long(unit, max_tokens, measure) if measure(unit.text) > max_tokens
+                               else [unit])]
+        # Word pieces never span the newline units are joined with, so sizes add up
+        sizes = {id(unit): measure(unit.text) for unit in units}
+                 
+        groups: List[List[Unit]] = []
+        for unit in units:
+            if groups and sum(u.tokens for u in groups[-1]) + unit.tokens <= target_tokens \
+                    and sum(sizes[id(u)] for u in groups[-1]) + sizes[id(unit)] <= max_tokens:
+                groups[-1].append(unit)
+            else:
+                groups.append([unit])
+        if len(groups) > 1 and sum(u.tokens for u in groups[-1]) < min_tokens \
+                and sum(sizes[id(u)] for g in groups[-2:] for u in g) <= max_tokens:
+            groups[-2].extend(groups.pop())
+            
+        for part, group in enumerate(groups):
+            body = "\n".join(unit.text for unit in group)
+            metadata = {
+                "tokens": estimate_tokens(body),
+                "chars": len(body),
+                "kanda": section["kanda"],
+                "sarga": section["sarga"],
+                "section": section["section"],
+                "part": part,
+                "parts": len(groups),
+                "start_line": group[0].line,
+                "end_line": group[-1].line,
+                "verses": sum(unit.verse for unit in group)
+            }
+            # Chroma only stores str, int, float and bool values
+            chunks.append(Chunk(body, {k: v for k, v in metadata.items() if v is not None}))
+            
+    for index, chunk in enumerate(chunks):
+        chunk.metadata["chunk"] = index
+    return chunks
+
+
+def chunk_stats(texts: List[str], k: int = EmbeddingsConfig.DEFAULT_K,
+                dimension: int = 384, source_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Summarize a chunking for the comparison report.
+    
+    Args:
+        texts (List[str]): Chunk texts
+        k (int): Chunks retrieved per question
+        dimension (int): Embedding dimension, for the vector index size
+        source_tokens (Optional[int]): Tokens of the unsplit text, for the duplication ratio
+        
+    Returns:
+        Dict[str, Any]: Counts, sizes and the expected prompt tokens at k
+    """
+    tokens = sorted(estimate_tokens(text) for text in texts)
+    stored = sum(tokens)
+    mean = stored / len(tokens) if tokens else 0.0
+    text_bytes = sum(len(text.encode("utf-8")) for text in texts)
+    stats = {
+        "chunks": len(texts),
+        "stored_tokens": stored,
+        "mean_tokens": round(mean, 1),
+        "p95_tokens": tokens[min(len(tokens) - 1, int(0.95 * len(tokens)))] if tokens else 0,
+        "max_tokens": tokens[-1] if tokens else 0,
+        "text_bytes": text_bytes,
+        "index_bytes": text_bytes + len(texts) * dimension * 4,
+        "prompt_tokens_at_k": round(mean * min(k, len(texts)), 1)
+    }
+    if source_tokens:
+        stats["duplication_ratio"] = round(stored / source_tokens, 3)
+    return stats
@@ -0,0 +1,145 @@
+"""
+Circuit breaker for Groq API calls.
+Trips when recent calls fail or run slow, rejects calls instantly while open,
+and lets a single probe through periodically to detect recovery.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any
+
+from config.settings import CircuitBreakerConfig
+from utils.metrics import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Count-based sliding window breaker with a half-open probe"""
+    
+    def __init__(self, name: str,
+                 window: int = CircuitBreakerConfig.WINDOW,
+                 min_calls: int = CircuitBreakerConfig.MIN_CALLS,
+                 failure_rate: float = CircuitBreakerConfig.FAILURE_RATE,
+                 slow_call_seconds: float = CircuitBreakerConfig.SLOW_CALL_SECONDS,
+                 slow_call_rate: float = CircuitBreakerConfig.SLOW_CALL_RATE,
+                 open_seconds: float = CircuitBreakerConfig.OPEN_SECONDS):
+        """
+        Initialize a closed breaker.
+        
+        Args:
+            name (str): Name used when reporting metrics
+            window (int): Most recent calls considered
+            min_calls (int): Calls needed before the breaker may trip
+            failure_rate (float): Fraction of failed calls that trips it
+            slow_call_seconds (float): Duration above which a call counts as slow
+            slow_call_rate (float): Fraction of slow calls that trips it
+            open_seconds (float): Seconds to stay open before probing
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        
+        self._lock = threading.Lock()
+        self._outcomes: deque = deque(maxlen=window)  # (failed, slow) pairs
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started = None
+        
+        # Metrics
+        self.opened = 0
+        self.rejected = 0
+    
+    def allow(self) -> bool:
+        """
+        Decide whether a call may go upstream.
+        
+        Returns:
+            bool: False if the call should fail fast
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probe_started = None
+                
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN:
+                stale = (self._probe_started is not None
+                         and now - self._probe_started > CircuitBreakerConfig.PROBE_TIMEOUT)
+                if self._probe_started is None or stale:
+                    self._probe_started = now
+                    return True
+                    
+            self.rejected += 1
+            return False
+    
+    def record(self, success: bool, seconds: float):
+        """
+        Report the outcome of an allowed call.
+        
+        Args:
+            success (bool): Whether the call produced an answer
+            seconds (float): Call duration (time to first token for streams)
+        """
+        slow = seconds > self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if success and not slow:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+                self._probe_started = None
+                return
+                
+            self._outcomes.append((not success, slow))
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failed = sum(1 for f, _ in self._outcomes if f) / len(self._outcomes)
+                slowed = sum(1 for _, s in self._outcomes if s) / len(self._outcomes)
+                if failed >= self.failure_rate or slowed >= self.slow_call_rate:
+                    self._trip()
+    
+    def release(self):
+        """Free the probe slot of an allowed call that never reached upstream"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_started = None
+    
+    def _trip(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        metrics.increment("raavan_circuit_opened_total", breaker=self.name)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state and counters.
+        
+        Returns:
+            Dict[str, Any]: State code (0 closed, 1 half-open, 2 open) and counters
+        """
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": _STATE_CODES[self.state],
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "window_calls": calls,
+                "window_failure_rate": sum(1 for f, _ in self._outcomes if f) / calls if calls else 0.0,
+                "window_slow_rate": sum(1 for _, s in self._outcomes if s) / calls if calls else 0.0
+            }
+
+
+# Process-wide breaker shared by every session and worker thread
+groq_breaker = CircuitBreaker("groq")
+metrics.register_collector("raavan_circuit_groq", groq_breaker.get_stats)
@@ -0,0 +1,235 @@
+"""
+Single-flight request coalescing.
+Concurrent callers asking for the same key share one in-flight computation,
+so a trending question costs one retrieval and one Groq call instead of hundreds.
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config.settings import DeadlineConfig
+from api.deadline import Deadline, DeadlineExceeded
+from utils.helpers import normalize_question
+from utils.metrics import metrics
+
+
+class _Call:
+    """A single in-flight computation and its eventual outcome"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _Stream:
+    """A shared token stream fed by one producer thread"""
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.tokens: List[str] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.consumers = 0
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one computation"""
+    
+    def __init__(self, name: str):
+        """
+        Initialize an empty flight group.
+        
+        Args:
+            name (str): Name used when reporting metrics
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Stream] = {}
+        self.executed = 0
+        self.coalesced = 0
+    
+    def do(self, key: str, fn: Callable[[], Any], deadline: Optional[Deadline] = None) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key.
+        
+        A caller stops waiting when its own deadline passes. If the shared
+        computation ran out of its leader's time, each caller runs fn itself.
+        
+        Args:
+            key (str): Identity of the computation
+            fn (Callable[[], Any]): Computation to run if none is in flight
+            deadline (Optional[Deadline]): This caller's deadline
+            
+        Returns:
+            Any: The shared result; exceptions are re-raised to every caller
+            
+        Raises:
+            DeadlineExceeded: If this caller's deadline passed while waiting
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                self.coalesced += 1
+                
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                # Later arrivals start a fresh call, so results are never stale
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            if deadline is None:
+                call.done.wait()
+            else:
+                while not call.done.wait(min(DeadlineConfig.POLL_INTERVAL, deadline.remaining())):
+                    deadline.check(f"{self.name}_wait")
+            if isinstance(call.error, DeadlineExceeded):
+                # The leader's deadline, not ours
+                return fn()
+                
+        if call.error is not None:
+            raise call.error
+        return call.result
+    
+    def stream(self, key: str, fn: Callable[[], Iterator[str]],
+               deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """
+        Share one token stream among concurrent callers with the same key.
+        
+        Late joiners replay the tokens produced so far, then follow live.
+        The producer stops early once every consumer has gone away, so fn
+        should not stop on any one caller's cancellation.
+        
+        Args:
+            key (str): Identity of the computation
+            fn (Callable[[], Iterator[str]]): Creates the upstream token iterator
+            deadline (Optional[Deadline]): This caller's deadline
+            
+        Yields:
+            str: Tokens in production order
+            
+        Raises:
+            DeadlineExceeded: If this caller's deadline passed while waiting for tokens
+        """
+        with self._lock:
+            shared = self._streams.get(key)
+            leader = shared is None or shared.consumers == 0  # Abandoned streams are stopping
+            if leader:
+                shared = _Stream()
+                self._streams[key] = shared
+                self.executed += 1
+            else:
+                self.coalesced += 1
+            with shared.condition:
+                shared.consumers += 1
+                
+        if leader:
+            threading.Thread(
+                target=self._produce, args=(key, shared, fn),
+                name=f"singleflight-{self.name}", daemon=True
+            ).start()
+            
+        position = 0
+        try:
+            while True:
+                with shared.condition:
+                    while position >= len(shared.tokens) and not shared.finished:
+                        if deadline is None:
+                            shared.condition.wait()
+                        else:
+                            deadline.check(f"{self.name}_wait")
+                            shared.condition.wait(min(DeadlineConfig.POLL_INTERVAL, deadline.remaining()))
+                    pending = shared.tokens[position:]
+                    finished = shared.finished
+                    error = shared.error
+                for token in pending:
+                    yield token
+                position += len(pending)
+                if finished and position >= len(shared.tokens):
+                    if error is not None:
+                        raise error
+                    return
+        finally:
+            with shared.condition:
+                shared.consumers -= 1
+    
+    def _produce(self, key: str, shared: _Stream, fn: Callable[[], Iterator[str]]):
+        tokens = None
+        try:
+            tokens = fn()
+            for token in tokens:
+                with shared.condition:
+                    if shared.consumers == 0:
+                        break
+                    shared.tokens.append(token)
+                    shared.condition.notify_all()
+        except BaseException as e:
+            shared.error = e
+        finally:
+            if tokens is not None and hasattr(tokens, "close"):
+                tokens.close()
+            with self._lock:
+                if self._streams.get(key) is shared:
+                    del self._streams[key]
+            with shared.condition:
+                shared.finished = True
+                shared.condition.notify_all()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters.
+        
+        Returns:
+            Dict[str, int]: Executed, coalesced and in-flight counts
+        """
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._streams)
+            }
+
+
+def llm_flight_key(question: str, context: str, model: str) -> str:
+    """
+    Build the single-flight key for an LLM call.
+    
+    Args:
+        question (str): User's question
+        context (str): Retrieved context
+        model (str): Model name
+        
+    Returns:
+        str: Key combining normalized question, context hash and model
+    """
+    context_hash = hashlib.sha1(context.encode("utf-8")).hexdigest()
+    return f"{model}|{context_hash}|{normalize_question(question)}"
+
+
+# Process-wide flight groups shared by every session and worker thread
+retrieval_flight = SingleFlight("retrieval")
+llm_flight = SingleFlight("llm")
+metrics.register_collector("raavan_singleflight_retrieval", retrieval_flight.get_stats)
+metrics.register_collector("raavan_singleflight_llm", llm_flight.get_stats)
+
+
+def get_coalescing_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get counters for all process-wide flight groups.
+    
+    Returns:
+        Dict[str, Dict[str, int]]: Stats keyed by flight group name
+    """
+    return {flight.name: flight.get_stats() for flight in (retrieval_flight, llm_flight)}
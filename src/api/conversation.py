@@ -0,0 +1,173 @@
+"""
+Multi-turn conversation memory.
+Keeps a rolling summary plus the last few turns within a fixed token budget,
+so follow-up questions work without prompts growing with the conversation.
+"""
+
+import re
+from typing import Dict, Any, List, Optional
+
+from config.settings import ConversationConfig, PersonaConfig, RateLimitConfig
+from api.deadline import Deadline
+from utils.helpers import estimate_tokens
+
+# Words that usually mean the question leans on earlier turns
+_FOLLOW_UP_PATTERN = re.compile(
+    r"\b(he|him|his|she|her|they|them|their|it|its|this|that|those|these|"
+    r"then|next|also|again)\b|"
+    r"(वह|वे|उस|उसने|उसे|उनके|उन्होंने|फिर|इसके|उसके)",
+    re.IGNORECASE
+)
+
+
+def new_conversation_state() -> Dict[str, Any]:
+    """
+    Create empty per-session conversation state.
+    
+    Returns:
+        Dict[str, Any]: Rolling summary and the id of the last summarized turn
+    """
+    return {"summary": "", "summarized_id": 0}
+
+
+def _usable(turn: Dict[str, Any]) -> bool:
+    # Error strings and load-shedding notices are not part of the conversation
+    return not turn["answer"].startswith(("⚠", "⏳"))
+
+
+class ConversationMemory:
+    """Builds bounded conversational prompts on top of GroqAPIService"""
+    
+    def __init__(self, groq_service):
+        """
+        Initialize with the Groq service used for summaries and rewrites.
+        
+        Args:
+            groq_service (GroqAPIService): Service for helper LLM calls
+        """
+        self.groq_service = groq_service
+    
+    def build_history_messages(self, state: Dict[str, Any],
+                               turns: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Build the conversation messages that precede the new question.
+        
+        The rolling summary comes first, then as many of the most recent
+        turns as fit in HISTORY_TOKEN_BUDGET. Turns that left the last
+        RECENT_TURNS but are not in the summary yet stay verbatim, so no
+        turn falls between the two.
+        
+        Args:
+            state (Dict[str, Any]): Conversation state of the session
+            turns (List[Dict[str, Any]]): Recent turns, oldest first
+            
+        Returns:
+            List[Dict[str, str]]: Chat messages, oldest first
+        """
+        budget = ConversationConfig.HISTORY_TOKEN_BUDGET
+        messages: List[Dict[str, str]] = []
+        
+        if state["summary"]:
+            summary = f"Summary of the conversation so far:\n{state['summary']}"
+            budget -= estimate_tokens(summary)
+            messages.append({"role": "system", "content": summary})
+            
+        usable = [t for t in turns if _usable(t)]
+        start = max(0, len(usable) - ConversationConfig.RECENT_TURNS)
+        while start > 0 and usable[start - 1].get("id", 0) > state["summarized_id"]:
+            start -= 1
+            
+        answer_chars = ConversationConfig.MAX_ANSWER_TOKENS * 4
+        recent: List[Dict[str, str]] = []
+        for turn in reversed(usable[start:]):
+            answer = turn["answer"]
+            if len(answer) > answer_chars:
+                answer = answer[:answer_chars] + "..."
+            cost = estimate_tokens(turn["question"]) + estimate_tokens(answer)
+            if cost > budget:
+                break
+            budget -= cost
+            recent[:0] = [
+                {"role": "user", "content": turn["question"]},
+                {"role": "assistant", "content": answer}
+            ]
+            
+        return messages + recent
+    
+    def condense_question(self, question: str, state: Dict[str, Any],
+                          turns: List[Dict[str, Any]], deadline: Optional[Deadline] = None) -> str:
+        """
+        Rewrite a follow-up as a standalone question for retrieval.
+        
+        Questions without earlier turns, or that do not look like
+        follow-ups, are returned unchanged without an LLM call.
+        
+        Args:
+            question (str): The new question
+            state (Dict[str, Any]): Conversation state of the session
+            turns (List[Dict[str, Any]]): Recent turns, oldest first
+            deadline (Optional[Deadline]): Request deadline; cancelling it stops the rewrite
+            
+        Returns:
+            str: Standalone question
+            
+        Raises:
+            DeadlineExceeded: If the deadline passes or is cancelled during the rewrite
+        """
+        usable = [t for t in turns if _usable(t)]
+        if not usable or not _FOLLOW_UP_PATTERN.search(question):
+            return question
+            
+        history = self.build_history_messages(state, usable)
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in history)
+        rewritten = self.groq_service.complete(
+            [
+                {"role": "system", "content": PersonaConfig.CONDENSE_PROMPT},
+                {"role": "user", "content": f"Conversation:\n{transcript}\n\nFollow-up question: {question}"}
+            ],
+            max_tokens=ConversationConfig.CONDENSE_MAX_TOKENS,
+            route=self.groq_service.route(question),
+            deadline=deadline
+        ).strip()
+        
+        if not rewritten or rewritten.startswith(("⚠", "⏳")):
+            return question
+        return rewritten
+    
+    def maybe_refresh_summary(self, state: Dict[str, Any], turns: List[Dict[str, Any]]) -> bool:
+        """
+        Fold turns that left the recent window into the rolling summary.
+        
+        Runs only once SUMMARY_EVERY such turns have accumulated, so most
+        turns pay nothing for summarization; until then build_history_messages
+        keeps them verbatim.
+        
+        Args:
+            state (Dict[str, Any]): Conversation state, updated in place
+            turns (List[Dict[str, Any]]): Recent turns, oldest first
+            
+        Returns:
+            bool: True if the summary was refreshed
+        """
+        usable = [t for t in turns if _usable(t)]
+        older = usable[:-ConversationConfig.RECENT_TURNS]
+        pending = [t for t in older if t["id"] > state["summarized_id"]]
+        if len(pending) < ConversationConfig.SUMMARY_EVERY:
+            return False
+            
+        transcript = "\n".join(f"User: {t['question']}\nRaavan: {t['answer']}" for t in pending)
+        summary = self.groq_service.complete(
+            [
+                {"role": "system", "content": PersonaConfig.SUMMARY_PROMPT},
+                {"role": "user", "content": f"Current summary:\n{state['summary'] or '(none)'}\n\nNew turns:\n{transcript}"}
+            ],
+            max_tokens=ConversationConfig.SUMMARY_MAX_TOKENS,
+            priority=RateLimitConfig.PRIORITY_BACKGROUND
+        ).strip()
+        
+        if not summary or summary.startswith(("⚠", "⏳")):
+            return False
+            
+        # One update, as the session may read the state while this runs on the executor
+        state.update(summary=summary, summarized_id=pending[-1]["id"])
+        return True
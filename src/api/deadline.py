@@ -0,0 +1,183 @@
+"""
+End-to-end request deadlines and cooperative cancellation.
+A chat request carries one Deadline from the moment it arrives through query
+encoding, vector search, context assembly and the LLM call. Each stage
+checks the time left, picks cheaper settings when it is short, and stops
+once it has run out or the caller has gone away.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from config.settings import AdaptiveConfig, DeadlineConfig
+from utils.metrics import metrics
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of time or its caller went away"""
+    
+    stage_error = False  # Counted by raavan_deadline_aborts_total, not as a stage error
+
+
+class Deadline:
+    """Point in time by which a request must be answered, plus a cancel switch"""
+    
+    def __init__(self, seconds: float = DeadlineConfig.CHAT_SECONDS, expires_at: Optional[float] = None):
+        """
+        Start the clock.
+        
+        Args:
+            seconds (float): Budget from now
+            expires_at (Optional[float]): Absolute time.monotonic() expiry, overriding seconds
+        """
+        self.expires_at = expires_at if expires_at is not None else time.monotonic() + seconds
+        self._cancelled = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether the caller gave up on the request"""
+        return self._cancelled.is_set()
+    
+    @property
+    def expired(self) -> bool:
+        """Whether there is no point in doing more work"""
+        return self.cancelled or time.monotonic() >= self.expires_at
+    
+    def remaining(self) -> float:
+        """Seconds left, 0.0 once expired or cancelled"""
+        if self.cancelled:
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def timeout(self, limit: float) -> float:
+        """A blocking call's timeout: limit, or less if the deadline is closer"""
+        return max(0.001, min(limit, self.remaining()))
+    
+    def cancel(self):
+        """Abandon the request and stop the work registered with on_cancel"""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass  # Cancelling is best effort
+    
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run callback when the request is cancelled, e.g. to close a connection.
+        
+        Args:
+            callback (Callable[[], None]): Called once, from the cancelling thread
+            
+        Returns:
+            Callable[[], None]: Unregisters the callback
+        """
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                            
+                return remove
+        callback()
+        return lambda: None
+    
+    def detached(self) -> "Deadline":
+        """Same expiry without the cancel switch, for work shared with other callers"""
+        return Deadline(expires_at=self.expires_at)
+    
+    def exceeded(self, stage: str) -> DeadlineExceeded:
+        """
+        Count an abort and build the exception for it.
+        
+        Args:
+            stage (str): Stage that gave up
+            
+        Returns:
+            DeadlineExceeded: Exception to raise
+        """
+        reason = "cancelled" if self.cancelled else "expired"
+        metrics.increment("raavan_deadline_aborts_total", stage=stage, reason=reason)
+        return DeadlineExceeded(f"Request {reason} during {stage}")
+    
+    def check(self, stage: str):
+        """
+        Stop the request if it is out of time.
+        
+        Args:
+            stage (str): Stage about to start, for the abort metric
+            
+        Raises:
+            DeadlineExceeded: If the deadline passed or the request was cancelled
+        """
+        if self.expired:
+            raise self.exceeded(stage)
+    
+    def fit_max_tokens(self, max_tokens: int) -> int:
+        """
+        Shorten the answer so it can finish before the deadline.
+        
+        Args:
+            max_tokens (int): Completion limit chosen for the request
+            
+        Returns:
+            int: The limit, lowered to what the remaining time can generate
+        """
+        generation = self.remaining() - DeadlineConfig.FIRST_TOKEN_SECONDS
+        affordable = max(DeadlineConfig.MIN_ANSWER_TOKENS, int(generation * DeadlineConfig.TOKENS_PER_SECOND))
+        if affordable < max_tokens:
+            metrics.increment("raavan_deadline_degraded_total", setting="max_tokens")
+            return affordable
+        return max_tokens
+    
+    def fit_limits(self, limits):
+        """
+        Pick cheaper retrieval and generation limits when time is short.
+        
+        Args:
+            limits (Limits): Limits from the adaptive controller
+            
+        Returns:
+            Limits: The same limits, or the adaptive lower bounds for retrieval below
+                LOW_BUDGET_SECONDS, with max_tokens fitted to the time left
+        """
+        if self.remaining() < DeadlineConfig.LOW_BUDGET_SECONDS:
+            metrics.increment("raavan_deadline_degraded_total", setting="retrieval")
+            limits = limits._replace(
+                k=min(limits.k, AdaptiveConfig.MIN_K),
+                context_tokens=min(limits.context_tokens, AdaptiveConfig.MIN_CONTEXT_TOKENS)
+            )
+        return limits._replace(max_tokens=self.fit_max_tokens(limits.max_tokens))
+
+
+@contextmanager
+def guard(deadline: Optional[Deadline], stage: str) -> Iterator[None]:
+    """
+    Report failures caused by the deadline as DeadlineExceeded.
+    
+    A socket timeout or a connection closed by cancel() is the deadline at
+    work, not an upstream failure, and must not count against Groq.
+    
+    Args:
+        deadline (Optional[Deadline]): Request deadline, None for no limit
+        stage (str): Stage name for the abort metric
+    """
+    try:
+        yield
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        if deadline is not None and deadline.expired:
+            raise deadline.exceeded(stage) from e
+        raise
@@ -0,0 +1,289 @@
+"""
+Out-of-process embedding server.
+One daemon owns the sentence-transformers model and serves every session and
+worker over a Unix socket, collecting concurrent requests into micro-batches
+so the model encodes many texts per forward pass.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import EmbeddingsConfig
+
+# Frames are a 4-byte big-endian length followed by the payload
+_LENGTH = struct.Struct(">I")
+
+
+def _send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding server connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return _recv_exact(sock, size)
+
+
+class MicroBatcher:
+    """Collects concurrent encode requests into one model call"""
+    
+    def __init__(self, encode, max_batch_size: int = EmbeddingsConfig.MAX_BATCH_SIZE,
+                 window: float = EmbeddingsConfig.BATCH_WINDOW_MS / 1000):
+        """
+        Start the batching thread.
+        
+        Args:
+            encode (Callable[[List[str]], List[List[float]]]): Batch encoder
+            max_batch_size (int): Texts per model call
+            window (float): Seconds to wait for more requests after the first
+        """
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._condition = threading.Condition()
+        self._pending: List[Tuple[List[str], Future]] = []
+        
+        # Metrics
+        self.batches = 0
+        self.texts = 0
+        self.requests = 0
+        
+        threading.Thread(target=self._run, name="embedding-batcher", daemon=True).start()
+    
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for encoding.
+        
+        Args:
+            texts (List[str]): Texts to encode
+            
+        Returns:
+            Future: Resolves to a float32 array with one row per text
+        """
+        future: Future = Future()
+        with self._condition:
+            self._pending.append((texts, future))
+            self._condition.notify()
+        return future
+    
+    def _take_batch(self) -> List[Tuple[List[str], Future]]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = time.monotonic() + self.window
+            while True:
+                size = sum(len(texts) for texts, _ in self._pending)
+                remaining = deadline - time.monotonic()
+                if size >= self.max_batch_size or remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+                
+            # Whole requests only; a single large request may exceed the limit
+            batch, size = [], 0
+            while self._pending and (not batch or size + len(self._pending[0][0]) <= self.max_batch_size):
+                texts, future = self._pending.pop(0)
+                batch.append((texts, future))
+                size += len(texts)
+            return batch
+    
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            texts = [text for request, _ in batch for text in request]
+            try:
+                vectors = np.asarray(self.encode(texts), dtype=np.float32) if texts else None
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+                
+            self.batches += 1
+            self.texts += len(texts)
+            self.requests += len(batch)
+            start = 0
+            for request, future in batch:
+                if vectors is None:
+                    future.set_result(np.zeros((0, 0), dtype=np.float32))
+                else:
+                    future.set_result(vectors[start:start + len(request)])
+                start += len(request)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching counters.
+        
+        Returns:
+            Dict[str, Any]: Requests, texts, batches and average batch size
+        """
+        return {
+            "requests": self.requests,
+            "texts": self.texts,
+            "batches": self.batches,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0.0
+        }
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Serves one persistent client connection"""
+    
+    def handle(self):
+        batcher: MicroBatcher = self.server.batcher
+        while True:
+            try:
+                request = json.loads(_recv_frame(self.request))
+            except (ConnectionError, OSError):
+                return
+                
+            try:
+                if request.get("op") == "stats":
+                    _send_frame(self.request, json.dumps(batcher.get_stats()).encode("utf-8"))
+                    continue
+                texts = request["texts"]
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    raise ValueError("'texts' must be a list of strings")
+                vectors = batcher.submit(texts).result()
+                header = {"shape": list(vectors.shape)}
+                _send_frame(self.request, json.dumps(header).encode("utf-8"))
+                _send_frame(self.request, vectors.astype("<f4").tobytes())
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                try:
+                    _send_frame(self.request, json.dumps({"error": str(e)}).encode("utf-8"))
+                except OSError:
+                    return
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server in front of a single embeddings model"""
+    
+    daemon_threads = True
+    request_queue_size = socket.SOMAXCONN  # Many workers connect at once on startup
+    
+    def __init__(self, socket_path: str, embeddings, max_batch_size: int = EmbeddingsConfig.MAX_BATCH_SIZE,
+                 window: float = EmbeddingsConfig.BATCH_WINDOW_MS / 1000):
+        """
+        Bind the socket and start batching.
+        
+        Args:
+            socket_path (str): Filesystem path of the Unix socket
+            embeddings: Local embeddings model (embed_documents is used for batches)
+            max_batch_size (int): Texts per model call
+            window (float): Seconds to wait for more requests after the first
+        """
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # Stale socket from a previous run
+        self.socket_path = socket_path
+        self.batcher = MicroBatcher(embeddings.embed_documents, max_batch_size, window)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o660)
+    
+    def server_close(self):
+        """Close the socket and remove its file"""
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class EmbeddingClient:
+    """Drop-in embeddings for Chroma and VectorDatabaseService backed by the daemon"""
+    
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = EmbeddingsConfig.CLIENT_TIMEOUT):
+        """
+        Initialize the client; connections are opened lazily per thread.
+        
+        Args:
+            socket_path (Optional[str]): Unix socket of the embedding server
+            timeout (float): Seconds to wait for a response
+        """
+        self.socket_path = socket_path or EmbeddingsConfig.SERVER_SOCKET or EmbeddingsConfig.DEFAULT_SERVER_SOCKET
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+    
+    def _drop_connection(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+    
+    def _request(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        # One retry covers a daemon restart between calls
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                _send_frame(sock, json.dumps(payload).encode("utf-8"))
+                header = json.loads(_recv_frame(sock))
+                body = _recv_frame(sock) if "shape" in header else None
+                return header, body
+            except (ConnectionError, OSError):
+                self._drop_connection()
+                if attempt:
+                    raise
+        raise ConnectionError("Embedding server unavailable")
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Encode documents.
+        
+        Args:
+            texts (List[str]): Texts to encode
+            
+        Returns:
+            List[List[float]]: One vector per text
+        """
+        if not texts:
+            return []
+        header, body = self._request({"texts": list(texts)})
+        if "error" in header:
+            raise RuntimeError(f"Embedding server error: {header['error']}")
+        return np.frombuffer(body, dtype="<f4").reshape(header["shape"]).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Encode a search query.
+        
+        Args:
+            text (str): Query text
+            
+        Returns:
+            List[float]: Query vector
+        """
+        return self.embed_documents([text])[0]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the daemon's batching counters.
+        
+        Returns:
+            Dict[str, Any]: Server-side statistics
+        """
+        header, _ = self._request({"op": "stats"})
+        return header
@@ -0,0 +1,78 @@
+"""
+Extractive answers built locally from retrieved context.
+Used when the LLM is unavailable: the sentences that best match the question
+are taken from the top-ranked chunks and returned behind a persona line.
+"""
+
+import math
+import re
+from typing import List, Optional, Set, Tuple
+
+from config.settings import CircuitBreakerConfig, PersonaConfig
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?।])\s+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = {
+    "the", "and", "for", "was", "were", "are", "who", "what", "when", "where", "which",
+    "how", "why", "did", "does", "with", "from", "that", "this", "his", "her", "him",
+    "about", "tell", "into", "has", "had", "have", "you", "your", "its", "they", "them",
+    "का", "की", "के", "को", "में", "है", "था", "थी", "थे", "और", "से", "ने", "क्या", "कौन"
+}
+_MAX_SENTENCE_CHARS = 400
+
+
+class FallbackAnswer(str):
+    """
+    An answer given without the LLM, from the answer cache or the context.
+    
+    Shown like any answer, but not kept as a conversation turn or timed as
+    an LLM call.
+    """
+
+
+def _keywords(text: str) -> Set[str]:
+    return {
+        word for word in (w.lower() for w in _WORD.findall(text))
+        if len(word) > 2 and word not in _STOPWORDS
+    }
+
+
+def extractive_answer(question: str, context: str,
+                      max_sentences: int = CircuitBreakerConfig.FALLBACK_SENTENCES) -> Optional[str]:
+    """
+    Build an answer from the retrieved context without calling the LLM.
+    
+    Sentences are scored by keyword overlap with the question, normalized by
+    sentence length, with a small bonus for higher-ranked chunks, and the best
+    ones are returned in their original order.
+    
+    Args:
+        question (str): User's question
+        context (str): Retrieved chunks, best first, separated by blank lines
+        max_sentences (int): Sentences to include
+        
+    Returns:
+        Optional[str]: Answer text, or None if the context has nothing usable
+    """
+    if not context or context.startswith("Error retrieving context"):
+        return None
+        
+    terms = _keywords(question)
+    scored: List[Tuple[float, int, int, str]] = []
+    for rank, chunk in enumerate(context.split("\n\n")):
+        for position, sentence in enumerate(_SENTENCE_SPLIT.split(" ".join(chunk.split()))):
+            if len(sentence) < 20:
+                continue
+            words = _keywords(sentence)
+            overlap = len(terms & words)
+            if not overlap:
+                continue
+            score = overlap / math.sqrt(len(words)) + 0.1 / (1 + rank)
+            scored.append((score, rank, position, sentence[:_MAX_SENTENCE_CHARS]))
+            
+    if not scored:
+        return None
+        
+    best = sorted(scored, reverse=True)[:max_sentences]
+    sentences = [sentence for _, _, _, sentence in sorted(best, key=lambda s: (s[1], s[2]))]
+    return f"{PersonaConfig.FALLBACK_PREFIX}\n\n" + " ".join(sentences)
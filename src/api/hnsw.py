@@ -0,0 +1,120 @@
+"""
+HNSW index parameters for the Chroma collection.
+Loads the tuned parameters written by benchmarks/tune_hnsw.py and rebuilds
+the collection with them from its stored vectors, without re-embedding.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.settings import EmbeddingsConfig
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def default_hnsw_params() -> Dict[str, Any]:
+    """
+    Get the built-in HNSW parameters.
+    
+    Returns:
+        Dict[str, Any]: space, M, construction_ef and search_ef
+    """
+    return {
+        "space": EmbeddingsConfig.HNSW_SPACE,
+        "M": EmbeddingsConfig.HNSW_M,
+        "construction_ef": EmbeddingsConfig.HNSW_CONSTRUCTION_EF,
+        "search_ef": EmbeddingsConfig.HNSW_SEARCH_EF
+    }
+
+
+def load_hnsw_params(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load tuned HNSW parameters, falling back to the defaults.
+    
+    Args:
+        path (Optional[str]): Parameter file, defaults to HNSW_PARAMS_FILE
+        
+    Returns:
+        Dict[str, Any]: space, M, construction_ef and search_ef
+    """
+    params = default_hnsw_params()
+    params_file = Path(path or EmbeddingsConfig.HNSW_PARAMS_FILE)
+    if params_file.exists():
+        tuned = json.loads(params_file.read_text(encoding="utf-8"))
+        params.update({key: tuned[key] for key in params if key in tuned})
+    return params
+
+
+def save_hnsw_params(params: Dict[str, Any], path: Optional[str] = None, **extra):
+    """
+    Write tuned HNSW parameters to the config file.
+    
+    Args:
+        params (Dict[str, Any]): space, M, construction_ef and search_ef
+        path (Optional[str]): Parameter file, defaults to HNSW_PARAMS_FILE
+        **extra: Additional fields recorded alongside, e.g. measured recall
+    """
+    params_file = Path(path or EmbeddingsConfig.HNSW_PARAMS_FILE)
+    params_file.write_text(json.dumps({**params, **extra}, indent=2) + "\n", encoding="utf-8")
+
+
+def collection_metadata(params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Translate HNSW parameters into Chroma collection metadata.
+    
+    Args:
+        params (Optional[Dict[str, Any]]): Parameters, loaded from config if omitted
+        
+    Returns:
+        Dict[str, Any]: Metadata for create_collection
+    """
+    params = params or load_hnsw_params()
+    return {
+        "hnsw:space": params["space"],
+        "hnsw:M": int(params["M"]),
+        "hnsw:construction_ef": int(params["construction_ef"]),
+        "hnsw:search_ef": int(params["search_ef"])
+    }
+
+
+def rebuild_collection(persist_directory: str = EmbeddingsConfig.PERSIST_DIRECTORY,
+                       params: Optional[Dict[str, Any]] = None,
+                       collection: str = "langchain") -> int:
+    """
+    Recreate a Chroma collection with new HNSW parameters.
+    
+    Vectors, documents and metadata are read from the existing collection,
+    so nothing is re-embedded. Run it while no worker is writing.
+    
+    Args:
+        persist_directory (str): Chroma persist directory
+        params (Optional[Dict[str, Any]]): Parameters, loaded from config if omitted
+        collection (str): Collection name
+        
+    Returns:
+        int: Number of vectors in the rebuilt collection
+    """
+    import chromadb
+    from api.shared_index import read_collection
+    
+    ids, vectors, documents, metadatas, _ = read_collection(persist_directory, collection)
+    
+    client = chromadb.PersistentClient(path=persist_directory)
+    try:
+        client.delete_collection(collection)
+    except ValueError:
+        pass  # Did not exist
+    rebuilt = client.create_collection(collection, metadata=collection_metadata(params))
+    
+    # Chroma rejects empty metadata dicts
+    has_metadata = any(metadatas)
+    for start in range(0, len(ids), REBUILD_BATCH_SIZE):
+        end = start + REBUILD_BATCH_SIZE
+        rebuilt.add(
+            ids=ids[start:end],
+            embeddings=vectors[start:end].tolist(),
+            documents=documents[start:end],
+            metadatas=[m or None for m in metadatas[start:end]] if has_metadata else None
+        )
+    return len(ids)
@@ -0,0 +1,290 @@
+"""
+Blue/green versions of the vector index.
+Every ingestion writes a complete new version directory and then flips an
+atomic CURRENT pointer. Serving processes notice the flip, open and warm the
+new version in the background and swap it in; queries already running finish
+on the version they started with.
+"""
+
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import EmbeddingsConfig, IndexVersionConfig
+from utils.metrics import metrics
+
+
+def pointer_path(versions_dir: str = IndexVersionConfig.VERSIONS_DIR) -> Path:
+    """Path of the CURRENT pointer file"""
+    return Path(versions_dir, IndexVersionConfig.POINTER_FILE)
+
+
+def current_version(versions_dir: str = IndexVersionConfig.VERSIONS_DIR) -> Optional[str]:
+    """
+    Read the CURRENT pointer.
+    
+    Args:
+        versions_dir (str): Directory holding the versions
+        
+    Returns:
+        Optional[str]: Active version name, or None if nothing was published
+    """
+    try:
+        return pointer_path(versions_dir).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def set_current(version: str, versions_dir: str = IndexVersionConfig.VERSIONS_DIR):
+    """
+    Point CURRENT at a version atomically.
+    
+    Args:
+        version (str): Version name; it must exist
+        versions_dir (str): Directory holding the versions
+    """
+    if not Path(versions_dir, version).is_dir():
+        raise ValueError(f"Index version '{version}' does not exist in {versions_dir}")
+    pointer = pointer_path(versions_dir)
+    staging = pointer.with_name(f"{pointer.name}.tmp-{os.getpid()}")
+    staging.write_text(version + "\n", encoding="utf-8")
+    os.replace(staging, pointer)
+
+
+def list_versions(versions_dir: str = IndexVersionConfig.VERSIONS_DIR) -> List[str]:
+    """
+    List complete versions, oldest first.
+    
+    Args:
+        versions_dir (str): Directory holding the versions
+        
+    Returns:
+        List[str]: Version names
+    """
+    root = Path(versions_dir)
+    if not root.is_dir():
+        return []
+    return sorted(path.name for path in root.iterdir() if path.is_dir() and path.name.startswith("v"))
+
+
+def publish_version(build: Callable[[Path], None], versions_dir: str = IndexVersionConfig.VERSIONS_DIR,
+                    activate: bool = True) -> str:
+    """
+    Build a new version next to the live ones and optionally activate it.
+    
+    The version only becomes visible under its final name once the build
+    has finished, so readers never see a half-written index.
+    
+    Args:
+        build (Callable[[Path], None]): Writes the index into the given directory
+        versions_dir (str): Directory holding the versions
+        activate (bool): Flip CURRENT to the new version and collect old ones
+        
+    Returns:
+        str: Name of the new version
+    """
+    root = Path(versions_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    version = time.strftime("v%Y%m%dT%H%M%S")
+    while (root / version).exists():
+        time.sleep(1)
+        version = time.strftime("v%Y%m%dT%H%M%S")
+        
+    staging = root / f".{version}.building"
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        build(staging)
+        staging.rename(root / version)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        
+    if activate:
+        set_current(version, versions_dir)
+        gc_versions(versions_dir)
+    return version
+
+
+def gc_versions(versions_dir: str = IndexVersionConfig.VERSIONS_DIR,
+                keep: int = IndexVersionConfig.KEEP_VERSIONS) -> List[str]:
+    """
+    Delete old versions.
+    
+    The current version and the newest `keep` versions stay, so processes
+    that have not switched yet and quick rollbacks still find theirs.
+    
+    Args:
+        versions_dir (str): Directory holding the versions
+        keep (int): Newest versions to keep
+        
+    Returns:
+        List[str]: Deleted version names
+    """
+    current = current_version(versions_dir)
+    versions = list_versions(versions_dir)
+    doomed = [v for v in versions[:max(0, len(versions) - keep)] if v != current]
+    for version in doomed:
+        shutil.rmtree(Path(versions_dir, version), ignore_errors=True)
+    return doomed
+
+
+def open_version(path: Path, embedding):
+    """
+    Open the index stored in a version directory.
+    
+    Args:
+        path (Path): Version directory
+        embedding: Embeddings instance used for queries
+        
+    Returns:
+        Chroma: Vector store (SharedVectorIndex for exported versions)
+    """
+    if (path / "manifest.json").exists():
+        from api.shared_index import SharedVectorIndex
+        return SharedVectorIndex(str(path), embedding)
+        
+    from langchain_community.vectorstores import Chroma
+    return Chroma(persist_directory=str(path), embedding_function=embedding)
+
+
+def warm_up(store, embedding, queries: List[str] = IndexVersionConfig.WARMUP_QUERIES) -> float:
+    """
+    Run a few searches so index files are loaded before traffic arrives.
+    
+    Args:
+        store: Vector store to warm
+        embedding: Embeddings instance
+        queries (List[str]): Questions to search for
+        
+    Returns:
+        float: Seconds spent
+    """
+    start = time.perf_counter()
+    for question in queries:
+        if embedding is not None:
+            store.similarity_search_by_vector(embedding.embed_query(question), k=EmbeddingsConfig.DEFAULT_K)
+        else:
+            store.similarity_search(question, k=EmbeddingsConfig.DEFAULT_K)
+    return time.perf_counter() - start
+
+
+class VersionedIndex:
+    """Vector store that follows the CURRENT pointer and hot-swaps versions"""
+    
+    def __init__(self, embedding=None, versions_dir: str = IndexVersionConfig.VERSIONS_DIR,
+                 poll_interval: float = IndexVersionConfig.POLL_INTERVAL):
+        """
+        Open the current version and start watching the pointer.
+        
+        Args:
+            embedding: Embeddings instance used for queries
+            versions_dir (str): Directory holding the versions
+            poll_interval (float): Seconds between pointer checks
+        """
+        self.embeddings = embedding
+        self.versions_dir = versions_dir
+        self.poll_interval = poll_interval
+        version = current_version(versions_dir)
+        if version is None:
+            raise FileNotFoundError(f"No index version has been published in {versions_dir}")
+        # (version, store) is replaced as one reference so readers never see a mix
+        self._active: Tuple[str, Any] = (version, open_version(Path(versions_dir, version), embedding))
+        self._stop = threading.Event()
+        
+        # Metrics
+        self.swaps = 0
+        self.last_warmup_seconds = 0.0
+        self.last_error: Optional[str] = None
+        
+        threading.Thread(target=self._watch, name="index-version-watcher", daemon=True).start()
+    
+    @property
+    def version(self) -> str:
+        """Name of the version serving new queries"""
+        return self._active[0]
+    
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)  # Keep serving the old version
+    
+    def check(self) -> bool:
+        """
+        Switch to the version CURRENT points at, if it changed.
+        
+        The new version is opened and warmed before the swap, so the first
+        queries on it do not pay for loading the index.
+        
+        Returns:
+            bool: True if a new version was swapped in
+        """
+        version = current_version(self.versions_dir)
+        if version is None or version == self._active[0]:
+            return False
+            
+        store = open_version(Path(self.versions_dir, version), self.embeddings)
+        self.last_warmup_seconds = warm_up(store, self.embeddings)
+        metrics.observe("raavan_index_warmup_seconds", self.last_warmup_seconds)
+        
+        self._active = (version, store)
+        self.swaps += 1
+        metrics.increment("raavan_index_swaps_total")
+        return True
+    
+    def close(self):
+        """Stop watching the pointer"""
+        self._stop.set()
+    
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Any]:
+        """
+        Search the active version by vector.
+        
+        Args:
+            embedding (List[float]): Query vector
+            k (int): Number of documents to return
+            
+        Returns:
+            List[Any]: Documents, nearest first
+        """
+        _, store = self._active
+        return store.similarity_search_by_vector(embedding, k=k, **kwargs)
+    
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Any]:
+        """
+        Search the active version by text.
+        
+        Args:
+            query (str): Query text
+            k (int): Number of documents to return
+            
+        Returns:
+            List[Any]: Documents, nearest first
+        """
+        _, store = self._active
+        return store.similarity_search(query, k=k, **kwargs)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the active version and swap statistics.
+        
+        Returns:
+            Dict[str, Any]: Statistics of the active store plus version details
+        """
+        version, store = self._active
+        if hasattr(store, "get_stats"):
+            stats = store.get_stats()
+        else:
+            collection = store._collection
+            stats = {"collection_name": collection.name, "status": "Connected"}
+        stats.update(
+            version=version,
+            swaps=self.swaps,
+            last_warmup_seconds=self.last_warmup_seconds,
+            last_error=self.last_error
+        )
+        return stats
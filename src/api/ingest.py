@@ -0,0 +1,97 @@
+"""
+Corpus ingestion helpers shared by the index build tools.
+Reads the source text and splits it into chunks, either along its structure
+or with the character splitter of prepare_data.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import EmbeddingsConfig
+from utils.helpers import estimate_tokens
+
+
+def load_text(file_path: str) -> str:
+    """
+    Read a text file, falling back to latin-1 like prepare_data.
+    
+    Args:
+        file_path (str): Text file
+        
+    Returns:
+        str: File contents
+    """
+    path = Path(file_path)
+    try:
+        return path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        print("⚠ UTF-8 decoding failed, falling back to latin-1...")
+        return path.read_text(encoding="latin-1")
+
+
+def split_text(text: str) -> List[str]:
+    """
+    Split text into overlapping chunks for embedding.
+    
+    Args:
+        text (str): Source text
+        
+    Returns:
+        List[str]: Chunks of about CHUNK_SIZE characters
+    """
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=EmbeddingsConfig.CHUNK_SIZE,
+        chunk_overlap=EmbeddingsConfig.CHUNK_OVERLAP,
+        separators=["\n\n", "\n", ".", "!", "?", " "]
+    )
+    return text_splitter.split_text(text)
+
+
+def embedding_token_counter(model_name: str = EmbeddingsConfig.MODEL_NAME) -> Optional[Callable[[str], int]]:
+    """
+    Count word pieces the way the embedding model reads them.
+    
+    Args:
+        model_name (str): Sentence-transformers model name
+        
+    Returns:
+        Optional[Callable[[str], int]]: Word pieces of a text, without special tokens;
+            None if the tokenizer cannot be loaded
+    """
+    try:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"⚠ Embedding tokenizer unavailable, chunk limits use estimated tokens: {e}")
+        return None
+    return lambda text: len(tokenizer.tokenize(text))
+
+
+def chunk_documents(text: str, chunker: str = "structure") -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Chunk text and describe every chunk.
+    
+    Structure-aware chunks are kept within the embedding model's input,
+    counted with its tokenizer when it can be loaded.
+    
+    Args:
+        text (str): Source text
+        chunker (str): "structure" for headings, paragraphs and verses, "chars" for prepare_data's splitter
+        
+    Returns:
+        Tuple[List[str], List[Dict[str, Any]]]: Chunk texts and their metadata, including token counts
+    """
+    if chunker == "chars":
+        texts = split_text(text)
+        return texts, [{"tokens": estimate_tokens(chunk), "chars": len(chunk), "chunk": i}
+                       for i, chunk in enumerate(texts)]
+                       
+    from api.chunking import chunk_text
+    measure = embedding_token_counter()
+    if measure is None:
+        chunks = chunk_text(text)
+    else:
+        chunks = chunk_text(text, max_tokens=EmbeddingsConfig.CHUNK_MAX_WORD_PIECES, measure=measure)
+    return [chunk.text for chunk in chunks], [chunk.metadata for chunk in chunks]
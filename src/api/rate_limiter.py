@@ -0,0 +1,302 @@
+"""
+Admission control for Groq API calls.
+A shared token bucket budgets both requests and tokens per minute, and callers
+that do not fit wait in a priority queue with deadlines instead of hitting 429s.
+The bucket balances live in a locked state file, so server processes and the
+Streamlit app on one host draw from the same account quota.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+from config.settings import RateLimitConfig
+from utils.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # No flock on Windows; each process keeps its own budget
+
+logger = logging.getLogger(__name__)
+
+# Request tokens, request refill time, token tokens, token refill time, paused until
+_STATE = struct.Struct("5d")
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted before its deadline"""
+    
+    def __init__(self, message: str, position: int, retry_after: float):
+        super().__init__(message)
+        self.position = position
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at a fixed rate"""
+    
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            capacity (float): Maximum tokens held (burst size)
+            refill_per_second (float): Tokens added per second
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def refill(self, now: float):
+        """Add the tokens accrued since the last update"""
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated = now
+    
+    def time_until(self, amount: float, now: float) -> float:
+        """
+        Seconds until the bucket holds at least amount tokens.
+        
+        Args:
+            amount (float): Tokens needed
+            now (float): Current monotonic time
+            
+        Returns:
+            float: Zero if available now
+        """
+        self.refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.refill_per_second)
+    
+    def consume(self, amount: float):
+        """Take tokens; the balance may go negative when reconciling usage"""
+        self.tokens -= min(amount, self.capacity)
+
+
+class _Waiter:
+    """A queued request ordered by priority, then arrival"""
+    
+    __slots__ = ("priority", "sequence", "tokens", "deadline", "enqueued")
+    
+    def __init__(self, priority: int, sequence: int, tokens: int, deadline: float):
+        self.priority = priority
+        self.sequence = sequence
+        self.tokens = tokens
+        self.deadline = deadline
+        self.enqueued = time.monotonic()
+    
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class GroqRateLimiter:
+    """Request- and token-per-minute limiter with a priority wait queue"""
+    
+    def __init__(self,
+                 requests_per_minute: int = RateLimitConfig.REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = RateLimitConfig.TOKENS_PER_MINUTE,
+                 max_queue_size: int = RateLimitConfig.MAX_QUEUE_SIZE,
+                 state_file: Optional[str] = RateLimitConfig.STATE_FILE):
+        """
+        Initialize the limiter.
+        
+        Args:
+            requests_per_minute (int): Request budget
+            tokens_per_minute (int): Prompt plus completion token budget
+            max_queue_size (int): Waiters allowed before new arrivals are shed
+            state_file (Optional[str]): Bucket balances shared with other processes, None for this process only
+        """
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.max_queue_size = max_queue_size
+        
+        self._condition = threading.Condition()
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        
+        self.state_file = state_file if fcntl is not None else None
+        self._state_fd: Optional[int] = None
+        self._state_pid: Optional[int] = None
+        
+        # Metrics
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _position(self, waiter: _Waiter) -> int:
+        return 1 + sum(1 for other in self._queue if other < waiter)
+    
+    def _open_state(self) -> Optional[int]:
+        # Opened per process: a descriptor inherited across fork shares its lock with the parent
+        if self._state_pid != os.getpid():
+            self._state_pid = os.getpid()
+            self._state_fd = None
+            try:
+                Path(self.state_file).parent.mkdir(parents=True, exist_ok=True)
+                self._state_fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o600)
+            except OSError as e:
+                logger.warning("Rate limit state %s unavailable, budgeting per process: %s", self.state_file, e)
+        return self._state_fd
+    
+    @contextmanager
+    def _shared(self) -> Iterator[None]:
+        """
+        Load the bucket balances other processes left, and store them back.
+        
+        Held around every read-modify-write of the buckets, inside _condition.
+        Priority order holds within a process; between processes it is
+        first come, first served.
+        """
+        fd = self._open_state() if self.state_file else None
+        if fd is None:
+            yield
+            return
+            
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            data = os.pread(fd, _STATE.size, 0)
+            if len(data) == _STATE.size:
+                values = _STATE.unpack(data)
+                # Refill times from a previous boot lie ahead of this boot's clock; start full then
+                if max(values[1], values[3]) <= time.monotonic():
+                    (self.requests.tokens, self.requests.updated,
+                     self.tokens.tokens, self.tokens.updated, self._paused_until) = values
+            yield
+            os.pwrite(fd, _STATE.pack(self.requests.tokens, self.requests.updated,
+                                      self.tokens.tokens, self.tokens.updated, self._paused_until), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    
+    def acquire(self, tokens: int, priority: int = RateLimitConfig.PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None) -> float:
+        """
+        Block until the request fits in both budgets.
+        
+        Args:
+            tokens (int): Estimated prompt plus completion tokens
+            priority (int): Lower values are admitted first
+            timeout (Optional[float]): Seconds to wait before giving up
+            
+        Returns:
+            float: Seconds spent queued
+            
+        Raises:
+            RateLimitExceeded: If the queue is full or the deadline passes
+        """
+        timeout = RateLimitConfig.MAX_QUEUE_WAIT if timeout is None else timeout
+        
+        with self._condition:
+            if len(self._queue) >= self.max_queue_size:
+                self.shed += 1
+                raise RateLimitExceeded("Queue is full", len(self._queue) + 1, self._drain_estimate())
+                
+            waiter = _Waiter(priority, next(self._sequence), tokens, time.monotonic() + timeout)
+            heapq.heappush(self._queue, waiter)
+            
+            try:
+                while True:
+                    wait = None
+                    if self._queue[0] is waiter:
+                        with self._shared():
+                            now = time.monotonic()
+                            wait = max(
+                                self._paused_until - now,
+                                self.requests.time_until(1, now),
+                                self.tokens.time_until(waiter.tokens, now)
+                            )
+                            if wait <= 0:
+                                self.requests.consume(1)
+                                self.tokens.consume(waiter.tokens)
+                        if wait <= 0:
+                            heapq.heappop(self._queue)
+                            waited = now - waiter.enqueued
+                            self.admitted += 1
+                            self.total_wait += waited
+                            self.max_wait = max(self.max_wait, waited)
+                            self._condition.notify_all()
+                            return waited
+                            
+                    now = time.monotonic()
+                    remaining = waiter.deadline - now
+                    if remaining <= 0:
+                        position = self._position(waiter)
+                        self._queue.remove(waiter)
+                        heapq.heapify(self._queue)
+                        self.timed_out += 1
+                        self._condition.notify_all()
+                        raise RateLimitExceeded("Timed out waiting for quota", position, self._drain_estimate())
+                        
+                    self._condition.wait(remaining if wait is None else min(wait, remaining))
+            except BaseException:
+                if waiter in self._queue:
+                    self._queue.remove(waiter)
+                    heapq.heapify(self._queue)
+                    self._condition.notify_all()
+                raise
+    
+    def reconcile(self, estimated: int, actual: int):
+        """
+        Correct the token budget once the real usage is known.
+        
+        Args:
+            estimated (int): Tokens charged at admission
+            actual (int): Tokens reported by the API
+        """
+        with self._condition:
+            with self._shared():
+                self.tokens.refill(time.monotonic())
+                self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens + estimated - actual)
+            self._condition.notify_all()
+    
+    def pause(self, seconds: float):
+        """
+        Stop admitting requests, e.g. after a 429 with Retry-After.
+        
+        Args:
+            seconds (float): How long to hold the queue
+        """
+        with self._condition, self._shared():
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    def _drain_estimate(self) -> float:
+        # Rough seconds until the current queue clears at the request rate
+        return (len(self._queue) + 1) / self.requests.refill_per_second
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth and wait-time metrics.
+        
+        Returns:
+            Dict[str, Any]: Limiter metrics
+        """
+        with self._condition, self._shared():
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "queue_depth": len(self._queue),
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "timed_out": self.timed_out,
+                "avg_wait_seconds": self.total_wait / self.admitted if self.admitted else 0.0,
+                "max_wait_seconds": self.max_wait,
+                "requests_available": round(self.requests.tokens, 2),
+                "tokens_available": round(self.tokens.tokens, 2)
+            }
+
+
+# Process-wide limiter shared by every session and worker thread
+groq_rate_limiter = GroqRateLimiter()
+metrics.register_collector("raavan_rate_limiter", groq_rate_limiter.get_stats)
@@ -0,0 +1,185 @@
+"""
+Latency-aware model routing and hedging policy.
+Picks a model tier from simple query features and recent per-model latency,
+and decides how long to wait for a first token before sending a hedged duplicate.
+"""
+
+import re
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from config.settings import RoutingConfig
+from utils.helpers import estimate_tokens
+from utils.metrics import Histogram, metrics
+
+# Questions asking for a story or an explanation need the larger model
+_NARRATIVE_PATTERN = re.compile(
+    r"\b(why|how|explain|describe|story|narrate|tell me about|compare|relationship|"
+    r"significance|lesson|teach)\b|"
+    r"(क्यों|कैसे|कथा|कहानी|वर्णन|समझाओ|बताइए)",
+    re.IGNORECASE
+)
+
+
+def is_short_factual(question: str) -> bool:
+    """
+    Check whether a question is a short lookup rather than a request for a story.
+    
+    Args:
+        question (str): User's question
+        
+    Returns:
+        bool: True for short questions without narrative cues
+    """
+    short = estimate_tokens(question) <= RoutingConfig.SHORT_QUESTION_TOKENS
+    return short and not _NARRATIVE_PATTERN.search(question)
+
+
+class Route(NamedTuple):
+    """Routing decision for one LLM call"""
+    
+    model: str
+    alternate: str
+    reason: str
+
+
+class ModelRouter:
+    """Chooses a model per request and tracks first-token latency per model"""
+    
+    def __init__(self, fast_model: str = RoutingConfig.FAST_MODEL,
+                 quality_model: str = RoutingConfig.QUALITY_MODEL):
+        """
+        Initialize the router.
+        
+        Args:
+            fast_model (str): Model for short factual lookups
+            quality_model (str): Model for narrative and explanatory answers
+        """
+        self.fast_model = fast_model
+        self.quality_model = quality_model
+        self._lock = threading.Lock()
+        self._first_token: Dict[str, Histogram] = {}
+        
+        # Metrics
+        self.hedges_sent = 0
+        self.hedges_skipped = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+    
+    def _latency(self, model: str) -> Histogram:
+        with self._lock:
+            histogram = self._first_token.get(model)
+            if histogram is None:
+                histogram = self._first_token[model] = Histogram(window=RoutingConfig.LATENCY_WINDOW)
+            return histogram
+    
+    def _p95(self, model: str) -> Optional[float]:
+        # None until enough samples exist to trust the estimate
+        histogram = self._latency(model)
+        if len(histogram.recent) < RoutingConfig.MIN_SAMPLES:
+            return None
+        return histogram.quantiles((0.95,))["p95"]
+    
+    def route(self, question: str) -> Route:
+        """
+        Pick the model tier for a question.
+        
+        Short questions without narrative cues go to the fast tier. A tier
+        whose recent p95 first-token latency exceeds SLOW_FIRST_TOKEN is
+        swapped for the other one if that one is currently faster.
+        
+        Args:
+            question (str): User's question
+            
+        Returns:
+            Route: Chosen model, hedge alternate and the reason
+        """
+        if is_short_factual(question):
+            model, alternate, reason = self.fast_model, self.quality_model, "short"
+        else:
+            model, alternate, reason = self.quality_model, self.fast_model, "narrative"
+            
+        primary_p95, alternate_p95 = self._p95(model), self._p95(alternate)
+        if (primary_p95 is not None and alternate_p95 is not None
+                and primary_p95 > RoutingConfig.SLOW_FIRST_TOKEN and alternate_p95 < primary_p95):
+            model, alternate, reason = alternate, model, "latency"
+            
+        metrics.increment("raavan_llm_routed_total", model=model, reason=reason)
+        return Route(model, alternate, reason)
+    
+    def hedge_delay(self, model: str) -> float:
+        """
+        Seconds to wait for a first token before hedging.
+        
+        Args:
+            model (str): Model of the primary request
+            
+        Returns:
+            float: HEDGE_QUANTILE of recent first-token latency, clamped
+        """
+        histogram = self._latency(model)
+        if len(histogram.recent) < RoutingConfig.MIN_SAMPLES:
+            return RoutingConfig.HEDGE_DEFAULT_DELAY
+        quantile = RoutingConfig.HEDGE_QUANTILE
+        delay = histogram.quantiles((quantile,))[f"p{int(quantile * 100)}"]
+        return min(RoutingConfig.HEDGE_MAX_DELAY, max(RoutingConfig.HEDGE_MIN_DELAY, delay))
+    
+    def observe_first_token(self, model: str, seconds: float):
+        """
+        Record time to first token of one attempt.
+        
+        Cancelled attempts report their elapsed time too, so slow models
+        are not hidden by survivorship.
+        
+        Args:
+            model (str): Model name
+            seconds (float): Seconds from send to first token (or cancellation)
+        """
+        self._latency(model).observe(seconds)
+        metrics.observe("raavan_llm_first_token_seconds", seconds, model=model)
+    
+    def record_hedge(self, sent: bool):
+        """Count a hedge that was sent, or skipped for lack of quota"""
+        with self._lock:
+            if sent:
+                self.hedges_sent += 1
+            else:
+                self.hedges_skipped += 1
+    
+    def record_winner(self, hedged: bool, model: str):
+        """
+        Count which attempt of a hedged race answered first.
+        
+        Args:
+            hedged (bool): True if the duplicate won
+            model (str): Model of the winning attempt
+        """
+        with self._lock:
+            if hedged:
+                self.hedge_wins += 1
+            else:
+                self.primary_wins += 1
+        metrics.increment("raavan_llm_hedge_winner_total", winner="hedge" if hedged else "primary", model=model)
+    
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get hedging counters and per-tier latency.
+        
+        Returns:
+            Dict[str, float]: Router metrics
+        """
+        with self._lock:
+            stats = {
+                "hedges_sent": self.hedges_sent,
+                "hedges_skipped": self.hedges_skipped,
+                "hedge_wins": self.hedge_wins,
+                "primary_wins": self.primary_wins
+            }
+        for tier, model in (("fast", self.fast_model), ("quality", self.quality_model)):
+            stats[f"{tier}_first_token_p95_seconds"] = self._p95(model) or 0.0
+        return stats
+
+
+# Process-wide router shared by every session and worker thread
+model_router = ModelRouter()
+metrics.register_collector("raavan_router", model_router.get_stats)
@@ -3,9 +3,77 @@ API services for external integrations.
 Handles all API calls including Groq LLaMA and vector database operations.
 """
 
+import json
+import os
+import queue
+import socket
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional
-from config.settings import APIConfig, PersonaConfig
+from typing import Dict, Any, Optional, Iterator, List
+from config.settings import (
+    APIConfig, PersonaConfig, EmbeddingsConfig, ServerConfig, RateLimitConfig, MetricsConfig,
+    RoutingConfig, ShardConfig, WarmupConfig
+)
+from api.coalescing import llm_flight, retrieval_flight, llm_flight_key
+from api.rate_limiter import groq_rate_limiter, RateLimitExceeded
+from api.routing import model_router, Route
+from api.circuit_breaker import groq_breaker
+from api.cache import answer_cache, query_cache, retrieval_cache
+from api.cassettes import Recording, cassette_recorder
+from api.deadline import Deadline, DeadlineExceeded, guard
+from api.fallback import FallbackAnswer, extractive_answer
+from utils.helpers import normalize_question, estimate_tokens
+from utils.metrics import metrics
+
+
+CIRCUIT_OPEN_MESSAGE = "⚠ Groq is unavailable right now; failing fast until it recovers."
+
+
+def abort_response(response: requests.Response):
+    """
+    Unblock a read of a streaming response from another thread.
+    
+    close() waits for the reading thread to let go of the connection, so
+    the socket is shut down instead and the reader closes it on its way out.
+    
+    Args:
+        response (requests.Response): Response being read elsewhere
+    """
+    raw = response.raw
+    try:
+        if hasattr(raw, "shutdown"):
+            raw.shutdown()  # urllib3 >= 2.3
+        else:
+            raw._fp.fp.raw._sock.shutdown(socket.SHUT_RD)
+    except Exception:
+        # Connection already released or finished; nothing is blocked on it
+        pass
+
+
+class _Attempt:
+    """One upstream streaming request taking part in a hedged race"""
+    
+    def __init__(self, model: str, hedged: bool):
+        self.model = model
+        self.hedged = hedged
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.finished = False
+        self.response: Optional[requests.Response] = None
+        self.cancelled = threading.Event()
+    
+    def cancel(self):
+        """Stop the attempt and close its connection"""
+        if self.cancelled.is_set():
+            return
+        self.cancelled.set()
+        if self.first_token is None and not self.finished:
+            # Censored sample: the model was at least this slow
+            model_router.observe_first_token(self.model, time.perf_counter() - self.started)
+        response = self.response
+        if response is not None:
+            abort_response(response)
 
 
 class GroqAPIService:
@@ -13,56 +81,611 @@ class GroqAPIService:
     
     def __init__(self):
         self.api_url = APIConfig.GROQ_API_URL
+        self.hedge_url = RoutingConfig.HEDGE_API_URL or self.api_url
         self.headers = APIConfig.get_headers()
         self.model_name = APIConfig.MODEL_NAME
         self.max_tokens = APIConfig.MAX_TOKENS
     
-    def query_llama(self, question: str, context: str) -> str:
+    def build_messages(self, question: str, context: str,
+                       history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+        """
+        Build the chat messages sent to the model.
+        
+        Args:
+            question (str): User's question
+            context (str): Retrieved context from vector database
+            history (Optional[List[Dict[str, str]]]): Prior conversation messages
+            
+        Returns:
+            List[Dict[str, str]]: System, history and user messages
+        """
+        return [
+            {
+                "role": "system",
+                "content": PersonaConfig.SYSTEM_PROMPT
+            },
+            *(history or []),
+            {
+                "role": "user",
+                "content": f"Question: {question}\n\nContext:\n{context}"
+            }
+        ]
+    
+    def admit(self, messages: List[Dict[str, str]], priority: int, max_tokens: int,
+              timeout: Optional[float] = None) -> int:
+        """
+        Wait for Groq quota before sending a request.
+        
+        Args:
+            messages (List[Dict[str, str]]): Messages about to be sent
+            priority (int): Queue priority (lower is sooner)
+            max_tokens (int): Completion token limit of the request
+            timeout (Optional[float]): Seconds to wait, defaults to MAX_QUEUE_WAIT
+            
+        Returns:
+            int: Estimated tokens charged against the budget
+            
+        Raises:
+            RateLimitExceeded: If quota is not available in time
+        """
+        prompt = "\n".join(message["content"] for message in messages)
+        estimated = estimate_tokens(prompt) + max_tokens
+        waited = groq_rate_limiter.acquire(estimated, priority=priority, timeout=timeout)
+        metrics.observe(MetricsConfig.STAGE_METRIC, waited, stage="rate_limit_wait")
+        return estimated
+    
+    @staticmethod
+    def llm_error(kind: str, message: str) -> str:
+        """Count a failed LLM call and return the message shown to the user"""
+        metrics.increment("raavan_llm_errors_total", kind=kind)
+        return message
+    
+    @staticmethod
+    def upstream_error(kind: str, message: str, started: Optional[float]) -> str:
+        """Count a failed upstream call against the circuit breaker, then as an LLM error"""
+        if started is not None:
+            groq_breaker.record(False, time.perf_counter() - started)
+        return GroqAPIService.llm_error(kind, message)
+    
+    @staticmethod
+    def busy_message(error: RateLimitExceeded) -> str:
+        """Format the load-shedding message shown instead of an answer"""
+        return PersonaConfig.BUSY_MESSAGE.format(
+            position=error.position,
+            wait=int(error.retry_after) + 1
+        )
+    
+    @staticmethod
+    def record_usage(estimated: int, usage: Optional[Dict[str, Any]]):
+        """Replace the admission estimate with the reported token usage"""
+        if usage and "total_tokens" in usage:
+            groq_rate_limiter.reconcile(estimated, usage["total_tokens"])
+    
+    @staticmethod
+    def handle_rate_limited(response: requests.Response):
+        """
+        Hold the shared queue when Groq answers 429 anyway.
+        
+        A quota rejection says nothing about Groq's health, so it is
+        reported like a shed request rather than as a breaker failure.
+        
+        Raises:
+            RateLimitExceeded: If the response is a 429
+        """
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("retry-after", "1"))
+            except ValueError:
+                retry_after = 1.0
+            groq_rate_limiter.pause(retry_after)
+            raise RateLimitExceeded("Groq returned 429", 1, retry_after)
+    
+    def route(self, question: str) -> Optional[Route]:
+        """Pick the model tier for a question, or None when routing is off"""
+        return model_router.route(question) if RoutingConfig.ENABLED else None
+    
+    def query_llama(self, question: str, context: str,
+                    priority: int = RateLimitConfig.PRIORITY_INTERACTIVE,
+                    history: Optional[List[Dict[str, str]]] = None,
+                    max_tokens: Optional[int] = None,
+                    deadline: Optional[Deadline] = None,
+                    index_version: str = "") -> str:
         """
         Query the Groq LLaMA model with context.
         
+        Identical concurrent questions share a single in-flight request.
+        With routing enabled the model tier is chosen per question. If Groq
+        fails or the circuit breaker is open, a cached or extractive answer
+        is returned instead of the error when one is available, as a
+        FallbackAnswer.
+        
         Args:
             question (str): User's question
             context (str): Retrieved context from vector database
+            priority (int): Rate-limit queue priority (lower is sooner)
+            history (Optional[List[Dict[str, str]]]): Prior conversation messages
+            max_tokens (Optional[int]): Completion limit, defaults to MAX_TOKENS
+            deadline (Optional[Deadline]): Request deadline; max_tokens is fitted to the time left
+            index_version (str): Version of the index the context came from; answers are cached per version
             
         Returns:
             str: Generated response from LLaMA
+            
+        Raises:
+            DeadlineExceeded: If the deadline passes before the answer is complete
         """
-        try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": PersonaConfig.SYSTEM_PROMPT
-                },
-                {
-                    "role": "user",
-                    "content": f"Question: {question}\n\nContext:\n{context}"
-                }
-            ]
+        if deadline is not None:
+            deadline.check("llm")
+            max_tokens = deadline.fit_max_tokens(max_tokens or self.max_tokens)
+        messages = self.build_messages(question, context, history)
+        route = self.route(question)
+        if not APIConfig.COALESCE_REQUESTS:
+            answer = self.complete(messages, max_tokens, priority=priority, route=route, deadline=deadline)
+        else:
+            model = route.model if route else self.model_name
+            key = llm_flight_key(question, self.key_context(context, history), model)
+            answer = llm_flight.do(
+                key,
+                lambda: self.complete(messages, max_tokens, priority=priority, route=route, deadline=deadline),
+                deadline=deadline
+            )
             
+        if answer.startswith("⚠"):
+            return self.fallback_answer(question, context, index_version) or answer
+        if not history and not answer.startswith("⏳"):
+            answer_cache.put(question, answer, index_version=index_version)
+        return answer
+    
+    @staticmethod
+    def cached_answer(question: str, index_version: str = "") -> Optional[str]:
+        """
+        Look up a recent answer to serve without retrieval or a Groq call.
+        
+        Only first-turn questions qualify; follow-ups depend on the conversation.
+        
+        Args:
+            question (str): User's question
+            index_version (str): Version of the index being served
+            
+        Returns:
+            Optional[str]: An answer younger than ANSWER_MAX_AGE, or None
+        """
+        if not WarmupConfig.SERVE_CACHED_ANSWERS:
+            return None
+        answer = answer_cache.get(question, max_age=WarmupConfig.ANSWER_MAX_AGE, index_version=index_version)
+        if answer is not None:
+            metrics.increment("raavan_answer_cache_served_total")
+        return answer
+    
+    @staticmethod
+    def fallback_answer(question: str, context: str, index_version: str = "") -> Optional[str]:
+        """
+        Answer locally while Groq is unavailable.
+        
+        Args:
+            question (str): User's question
+            context (str): Retrieved context from vector database
+            index_version (str): Version of the index the context came from
+            
+        Returns:
+            Optional[FallbackAnswer]: A cached answer, else an extractive one, else None
+        """
+        cached = answer_cache.get(question, index_version=index_version)
+        if cached is not None:
+            metrics.increment("raavan_llm_fallback_total", source="cache")
+            return FallbackAnswer(cached)
+        answer = extractive_answer(question, context)
+        if answer is None:
+            return None
+        metrics.increment("raavan_llm_fallback_total", source="extractive")
+        return FallbackAnswer(answer)
+    
+    @staticmethod
+    def key_context(context: str, history: Optional[List[Dict[str, str]]]) -> str:
+        """Fold conversation history into the coalescing key's context"""
+        return context + json.dumps(history) if history else context
+    
+    def complete(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None,
+                 priority: int = RateLimitConfig.PRIORITY_INTERACTIVE,
+                 route: Optional[Route] = None, deadline: Optional[Deadline] = None) -> str:
+        """
+        Send prepared messages to Groq and return the completion.
+        
+        Args:
+            messages (List[Dict[str, str]]): Chat messages
+            max_tokens (Optional[int]): Completion limit, defaults to MAX_TOKENS
+            priority (int): Rate-limit queue priority (lower is sooner)
+            route (Optional[Route]): Routing decision from route(question); without one the
+                request goes to MODEL_NAME unrouted, as the last message is a whole prompt
+            deadline (Optional[Deadline]): Bounds the quota wait and the HTTP timeouts
+            
+        Returns:
+            str: Generated text, or an error message
+            
+        Raises:
+            DeadlineExceeded: If the deadline passes first
+        """
+        max_tokens = max_tokens or self.max_tokens
+        if deadline is not None:
+            deadline.check("llm")
+        if not groq_breaker.allow():
+            return self.llm_error("circuit_open", CIRCUIT_OPEN_MESSAGE)
+            
+        started = time.perf_counter()
+        try:
             payload = {
                 "model": self.model_name,
                 "messages": messages,
-                "max_tokens": self.max_tokens
+                "max_tokens": max_tokens
             }
             
-            response = requests.post(
-                self.api_url, 
-                headers=self.headers, 
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
+            with guard(deadline, "llm"):
+                queue_wait = deadline.timeout(RateLimitConfig.MAX_QUEUE_WAIT) if deadline is not None else None
+                estimated = self.admit(messages, priority, max_tokens, timeout=queue_wait)
+                started = time.perf_counter()
             
-            answer = response.json()["choices"][0]["message"]["content"]
+                if route is not None:
+                    with metrics.span("llm"):
+                        answer = "".join(self.race(messages, max_tokens, priority, route, estimated, deadline))
+                else:
+                    with metrics.span("llm"):
+                        recording = cassette_recorder.start(payload, self.api_url)
+                        response = requests.post(
+                            self.api_url, 
+                            headers=self.headers, 
+                            json=payload,
+                            timeout=deadline.timeout(30) if deadline is not None else 30
+                        )
+                        self.handle_rate_limited(response)
+                        response.raise_for_status()
+                        
+                        body = response.json()
+                    self.record_usage(estimated, body.get("usage"))
+                    
+                    answer = body["choices"][0]["message"]["content"]
+                    if recording is not None:
+                        recording.finish(answer, body.get("usage"))
+                        
+            groq_breaker.record(True, time.perf_counter() - started)
             return answer
             
+        except DeadlineExceeded:
+            groq_breaker.release()
+            raise
+        except RateLimitExceeded as e:
+            groq_breaker.release()
+            return self.llm_error("rate_limited", self.busy_message(e))
         except requests.exceptions.RequestException as e:
-            return f"⚠ Network error: {str(e)}"
+            return self.upstream_error("network", f"⚠ Network error: {str(e)}", started)
         except KeyError as e:
-            return f"⚠ API response error: Missing key {str(e)}"
+            return self.upstream_error("response", f"⚠ API response error: Missing key {str(e)}", started)
         except Exception as e:
-            return f"⚠ Error calling Groq LLaMA: {str(e)}"
+            return self.upstream_error("other", f"⚠ Error calling Groq LLaMA: {str(e)}", started)
+    
+    def stream_llama(self, question: str, context: str,
+                     priority: int = RateLimitConfig.PRIORITY_INTERACTIVE,
+                     history: Optional[List[Dict[str, str]]] = None,
+                     max_tokens: Optional[int] = None,
+                     deadline: Optional[Deadline] = None,
+                     index_version: str = "") -> Iterator[str]:
+        """
+        Stream the Groq LLaMA response token by token.
+        
+        Errors are yielded as a single message, mirroring query_llama,
+        including the fallback answer (a FallbackAnswer) when Groq is unavailable.
+        Identical concurrent questions share one upstream token stream.
+        
+        Args:
+            question (str): User's question
+            context (str): Retrieved context from vector database
+            priority (int): Rate-limit queue priority (lower is sooner)
+            history (Optional[List[Dict[str, str]]]): Prior conversation messages
+            max_tokens (Optional[int]): Completion limit, defaults to MAX_TOKENS
+            deadline (Optional[Deadline]): Request deadline; cancelling it closes the upstream stream
+            index_version (str): Version of the index the context came from; answers are cached per version
+            
+        Yields:
+            str: Content deltas as they arrive
+            
+        Raises:
+            DeadlineExceeded: If the deadline passes or is cancelled mid-stream
+        """
+        if deadline is not None:
+            deadline.check("llm")
+            max_tokens = deadline.fit_max_tokens(max_tokens or self.max_tokens)
+        messages = self.build_messages(question, context, history)
+        route = self.route(question)
+        if not APIConfig.COALESCE_REQUESTS:
+            tokens = self._stream(messages, priority, route, max_tokens, deadline)
+        else:
+            model = route.model if route else self.model_name
+            key = llm_flight_key(question, self.key_context(context, history), model)
+            # The shared stream stops when its last consumer leaves, not when one cancels
+            upstream_deadline = deadline.detached() if deadline is not None else None
+            tokens = llm_flight.stream(
+                key, lambda: self._stream(messages, priority, route, max_tokens, upstream_deadline),
+                deadline=deadline
+            )
+        return self._with_fallback(tokens, question, context, cache=not history, index_version=index_version)
+    
+    def _with_fallback(self, tokens: Iterator[str], question: str, context: str,
+                       cache: bool, index_version: str = "") -> Iterator[str]:
+        parts: List[str] = []
+        try:
+            for token in tokens:
+                if not parts and token.startswith("⚠"):
+                    yield self.fallback_answer(question, context, index_version) or token
+                    return
+                parts.append(token)
+                yield token
+        finally:
+            tokens.close()
+            
+        if cache and parts and not parts[0].startswith("⏳") and not parts[-1].startswith("⚠"):
+            answer_cache.put(question, "".join(parts), index_version=index_version)
+    
+    def _stream(self, messages: List[Dict[str, str]], priority: int,
+                route: Optional[Route] = None, max_tokens: Optional[int] = None,
+                deadline: Optional[Deadline] = None) -> Iterator[str]:
+        max_tokens = max_tokens or self.max_tokens
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        
+        if not groq_breaker.allow():
+            yield self.llm_error("circuit_open", CIRCUIT_OPEN_MESSAGE)
+            return
+            
+        started = time.perf_counter()
+        recorded = False  # Breaker outcome reported, at the first token or on failure
+        try:
+            with guard(deadline, "llm"):
+                queue_wait = deadline.timeout(RateLimitConfig.MAX_QUEUE_WAIT) if deadline is not None else None
+                estimated = self.admit(messages, priority, max_tokens, timeout=queue_wait)
+                started = time.perf_counter()
+                
+                with metrics.span("llm") as timing:
+                    if route is not None:
+                        tokens = self.race(messages, max_tokens, priority, route, estimated, deadline)
+                    else:
+                        tokens = self._post_stream(payload, estimated, deadline)
+                        
+                    try:
+                        for token in tokens:
+                            if deadline is not None:
+                                deadline.check("llm")
+                            if not recorded:
+                                recorded = True
+                                groq_breaker.record(True, time.perf_counter() - started)
+                                metrics.observe(
+                                    MetricsConfig.STAGE_METRIC,
+                                    time.perf_counter() - timing["start"],
+                                    stage="llm_first_token"
+                                )
+                            yield token
+                    finally:
+                        tokens.close()
+                        
+                if not recorded:
+                    recorded = True  # Empty completion
+                    groq_breaker.record(True, time.perf_counter() - started)
+                    
+        except DeadlineExceeded:
+            raise  # Not a Groq failure; the breaker slot is released below
+        except RateLimitExceeded as e:
+            yield self.llm_error("rate_limited", self.busy_message(e))
+        except requests.exceptions.RequestException as e:
+            yield self.upstream_error("network", f"⚠ Network error: {str(e)}", None if recorded else started)
+            recorded = True
+        except (KeyError, IndexError, ValueError) as e:
+            yield self.upstream_error("response", f"⚠ API response error: {str(e)}", None if recorded else started)
+            recorded = True
+        except Exception as e:
+            yield self.upstream_error("other", f"⚠ Error calling Groq LLaMA: {str(e)}", None if recorded else started)
+            recorded = True
+        finally:
+            if not recorded:
+                groq_breaker.release()  # Shed by the rate limiter, or abandoned before the first token
+    
+    def _post_stream(self, payload: Dict[str, Any], estimated: int,
+                     deadline: Optional[Deadline] = None) -> Iterator[str]:
+        recording = cassette_recorder.start(payload, self.api_url)
+        with requests.post(
+            self.api_url,
+            headers=self.headers,
+            json=payload,
+            timeout=deadline.timeout(30) if deadline is not None else 30,
+            stream=True
+        ) as response:
+            # Shutting the socket unblocks a read stuck on a stalled upstream
+            remove = deadline.on_cancel(lambda: abort_response(response)) if deadline is not None else None
+            try:
+                self.handle_rate_limited(response)
+                response.raise_for_status()
+                yield from self.iter_deltas(response, estimated, recording)
+            finally:
+                if remove is not None:
+                    remove()
+    
+    def iter_deltas(self, response: requests.Response, estimated: int,
+                    recording: Optional[Recording] = None) -> Iterator[str]:
+        """
+        Parse a streaming chat completion into content deltas.
+        
+        Args:
+            response (requests.Response): Streaming response from Groq
+            estimated (int): Tokens charged at admission, reconciled on the usage chunk
+            recording (Optional[Recording]): Cassette to note deltas in; written once the stream completes
+            
+        Yields:
+            str: Non-empty content deltas
+        """
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            # Groq reports usage on the final chunk under x_groq
+            usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage")
+            self.record_usage(estimated, usage)
+            if usage and recording is not None:
+                recording.usage = usage
+            if not chunk.get("choices"):
+                continue
+            delta = chunk["choices"][0].get("delta", {})
+            if delta.get("content"):
+                if recording is not None:
+                    recording.token(delta["content"])
+                yield delta["content"]
+        if recording is not None:
+            recording.finish()
+    
+    def race(self, messages: List[Dict[str, str]], max_tokens: int, priority: int,
+             route: Route, estimated: int, deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """
+        Stream from the routed model, hedging to the alternate if it is slow.
+        
+        If the primary has not produced a token within the router's hedge
+        delay (or fails before its first token), a duplicate is sent to the
+        alternate model on the hedge endpoint. Whichever produces a token
+        first wins; the other is cancelled.
+        
+        Args:
+            messages (List[Dict[str, str]]): Chat messages
+            max_tokens (int): Completion token limit
+            priority (int): Rate-limit queue priority of the hedge
+            route (Route): Routing decision
+            estimated (int): Tokens already charged for the primary
+            deadline (Optional[Deadline]): Request deadline; cancelling it stops the race
+            
+        Yields:
+            str: Content deltas of the winning attempt
+            
+        Raises:
+            Exception: The first failure, if every attempt failed
+            DeadlineExceeded: If the deadline passes first
+        """
+        events: "queue.Queue" = queue.Queue()
+        attempts = [self._launch(route.model, self.api_url, messages, max_tokens, estimated, events, False,
+                                 deadline)]
+        remove = deadline.on_cancel(lambda: events.put((None, "cancelled", None))) if deadline is not None else None
+        hedge_at = None
+        if RoutingConfig.HEDGE_ENABLED:
+            hedge_at = attempts[0].started + model_router.hedge_delay(route.model)
+        winner = None
+        failures: List[Exception] = []
+        
+        try:
+            while True:
+                if winner is None and hedge_at is None and len(failures) == len(attempts):
+                    raise failures[0]
+                    
+                timeout = None
+                if winner is None and hedge_at is not None:
+                    timeout = max(0.0, hedge_at - time.perf_counter())
+                if deadline is not None:
+                    timeout = deadline.remaining() if timeout is None else min(timeout, deadline.remaining())
+                try:
+                    attempt, kind, value = events.get(timeout=timeout)
+                except queue.Empty:
+                    if deadline is not None:
+                        deadline.check("llm")
+                    if hedge_at is None or time.perf_counter() < hedge_at:
+                        continue
+                    hedge_at = None
+                    hedge = self._hedge(route, messages, max_tokens, priority, events, deadline)
+                    if hedge is not None:
+                        attempts.append(hedge)
+                    continue
+                if kind == "cancelled":
+                    deadline.check("llm")
+                    continue
+                    
+                if winner is None:
+                    if kind == "error":
+                        failures.append(value)
+                        if hedge_at is not None:
+                            hedge_at = time.perf_counter()  # Fail over right away
+                        continue
+                    winner = attempt
+                    hedge_at = None
+                    for other in attempts:
+                        if other is not winner:
+                            other.cancel()
+                    if len(attempts) > 1:
+                        model_router.record_winner(winner.hedged, winner.model)
+                        
+                if attempt is not winner:
+                    continue
+                if kind == "token":
+                    yield value
+                elif kind == "done":
+                    return
+                else:
+                    raise value
+        finally:
+            if remove is not None:
+                remove()
+            for attempt in attempts:
+                attempt.cancel()
+    
+    def _hedge(self, route: Route, messages: List[Dict[str, str]], max_tokens: int,
+               priority: int, events: "queue.Queue", deadline: Optional[Deadline] = None) -> Optional[_Attempt]:
+        # Hedges only use spare quota; they never queue behind other callers
+        try:
+            estimated = self.admit(messages, priority, max_tokens, timeout=0)
+        except RateLimitExceeded:
+            model_router.record_hedge(False)
+            return None
+        model_router.record_hedge(True)
+        return self._launch(route.alternate, self.hedge_url, messages, max_tokens, estimated, events, True,
+                            deadline)
+    
+    def _launch(self, model: str, url: str, messages: List[Dict[str, str]], max_tokens: int,
+                estimated: int, events: "queue.Queue", hedged: bool,
+                deadline: Optional[Deadline] = None) -> _Attempt:
+        attempt = _Attempt(model, hedged)
+        threading.Thread(
+            target=self._run_attempt,
+            args=(attempt, url, messages, max_tokens, estimated, events,
+                  deadline.timeout(30) if deadline is not None else 30),
+            name="groq-attempt", daemon=True
+        ).start()
+        return attempt
+    
+    def _run_attempt(self, attempt: _Attempt, url: str, messages: List[Dict[str, str]],
+                     max_tokens: int, estimated: int, events: "queue.Queue", timeout: float = 30):
+        payload = {
+            "model": attempt.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        try:
+            recording = cassette_recorder.start(payload, url)
+            with requests.post(url, headers=self.headers, json=payload, timeout=timeout, stream=True) as response:
+                attempt.response = response
+                if attempt.cancelled.is_set():
+                    return
+                self.handle_rate_limited(response)
+                response.raise_for_status()
+                for token in self.iter_deltas(response, estimated, recording):
+                    if attempt.cancelled.is_set():
+                        return
+                    if attempt.first_token is None:
+                        attempt.first_token = time.perf_counter() - attempt.started
+                        model_router.observe_first_token(attempt.model, attempt.first_token)
+                    events.put((attempt, "token", token))
+            attempt.finished = True
+            events.put((attempt, "done", None))
+        except Exception as e:
+            attempt.finished = True
+            events.put((attempt, "error", e))
 
 
 class VectorDatabaseService:
@@ -77,24 +700,132 @@ class VectorDatabaseService:
         """
         self.vectordb = vectordb
     
-    def retrieve_context(self, question: str, k: int = 7) -> str:
+    @property
+    def version(self) -> str:
+        """Version of the index being served, "" for an unversioned database"""
+        return getattr(self.vectordb, "version", "")
+    
+    def retrieve_context(self, question: str, k: int = 7, filters: Dict[str, Any] = None,
+                         token_budget: Optional[int] = None, deadline: Optional[Deadline] = None) -> str:
         """
         Retrieve relevant context from vector database.
         
+        Contexts are cached per index version, so a new version is searched afresh.
+        
         Args:
             question (str): User's question
             k (int): Number of documents to retrieve
+            filters (Dict[str, Any]): Shard metadata to restrict a sharded corpus to
+            token_budget (Optional[int]): Estimated context tokens to stop at; the best document is always kept
+            deadline (Optional[Deadline]): Checked between encoding, search and assembly
             
         Returns:
             str: Combined context from retrieved documents
+            
+        Raises:
+            DeadlineExceeded: If the deadline passes before the context is assembled
         """
+        key = (
+            f"{self.version}|{k}|{token_budget or ''}|"
+            f"{json.dumps(filters, sort_keys=True) if filters else ''}|{normalize_question(question)}"
+        )
+        cached = retrieval_cache.get(key)
+        if cached is not None:
+            return cached
+            
+        # Shard timeouts and errors leave results incomplete; those are not cached
+        degraded = getattr(self.vectordb, "timeouts", 0) + getattr(self.vectordb, "errors", 0)
+        if not APIConfig.COALESCE_REQUESTS:
+            context = self._search(question, k, filters, token_budget, deadline)
+        else:
+            context = retrieval_flight.do(
+                key, lambda: self._search(question, k, filters, token_budget, deadline), deadline=deadline
+            )
+            
+        if not context.startswith("Error retrieving context") and \
+                degraded == getattr(self.vectordb, "timeouts", 0) + getattr(self.vectordb, "errors", 0):
+            retrieval_cache.put(key, context)
+        return context
+    
+    def encode_query(self, question: str, embeddings) -> List[float]:
+        """
+        Encode a question, reusing vectors of recent and warmed-up questions.
+        
+        Args:
+            question (str): Question to encode
+            embeddings: Embeddings instance of the vector database
+            
+        Returns:
+            List[float]: Query vector
+        """
+        vector = query_cache.get(question)
+        if vector is None:
+            vector = embeddings.embed_query(question)
+            query_cache.put(question, vector)
+        return vector
+    
+    def _search(self, question: str, k: int, filters: Dict[str, Any] = None,
+                token_budget: Optional[int] = None, deadline: Optional[Deadline] = None) -> str:
         try:
-            results = self.vectordb.similarity_search(question, k=k)
-            context_text = "\n\n".join([doc.page_content for doc in results])
+            embeddings = getattr(self.vectordb, "embeddings", None)
+            if embeddings is not None:
+                # Encode separately so encoding and search are timed apart
+                if deadline is not None:
+                    deadline.check("query_encoding")
+                with metrics.span("query_encoding"):
+                    query_vector = self.encode_query(question, embeddings)
+                if deadline is not None:
+                    deadline.check("vector_search")
+                with metrics.span("vector_search"):
+                    if hasattr(self.vectordb, "search_shards"):
+                        # Sharded corpus: fan out to the shards relevant to this question
+                        timeout = deadline.timeout(ShardConfig.SHARD_TIMEOUT) if deadline is not None else None
+                        scored = self.vectordb.search_shards(question, query_vector, k=k, filters=filters,
+                                                             timeout=timeout)
+                        results = [doc for doc, _ in scored]
+                    else:
+                        results = self.vectordb.similarity_search_by_vector(query_vector, k=k)
+            else:
+                if deadline is not None:
+                    deadline.check("vector_search")
+                with metrics.span("vector_search"):
+                    results = self.vectordb.similarity_search(question, k=k)
+                    
+            if deadline is not None:
+                deadline.check("context_assembly")
+            with metrics.span("context_assembly"):
+                if token_budget is not None:
+                    results = self.fit_budget(results, token_budget)
+                context_text = "\n\n".join([doc.page_content for doc in results])
             return context_text
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             return f"Error retrieving context: {str(e)}"
     
+    @staticmethod
+    def fit_budget(documents: List[Any], token_budget: int) -> List[Any]:
+        """
+        Keep the best-ranked documents that fit in a token budget.
+        
+        Token counts stored with the chunk at ingestion are used when present.
+        
+        Args:
+            documents (List[Any]): Retrieved documents, best first
+            token_budget (int): Estimated tokens available for context
+            
+        Returns:
+            List[Any]: A prefix of the documents; never empty if documents is not
+        """
+        kept, used = [], 0
+        for doc in documents:
+            cost = (getattr(doc, "metadata", None) or {}).get("tokens") or estimate_tokens(doc.page_content)
+            if kept and used + cost > token_budget:
+                break
+            kept.append(doc)
+            used += cost
+        return kept
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the vector database.
@@ -103,6 +834,9 @@ class VectorDatabaseService:
             Dict[str, Any]: Database statistics
         """
         try:
+            if hasattr(self.vectordb, "get_stats"):
+                return self.vectordb.get_stats()
+                
             # Get collection info if available
             collection = self.vectordb._collection
             return {
@@ -114,3 +848,217 @@ class VectorDatabaseService:
                 "status": "Error",
                 "error": str(e)
             }
+
+
+class RaavanAPIClient:
+    """Thin client for the headless Raavan AI HTTP API"""
+    
+    def __init__(self, base_url: str = None):
+        """
+        Initialize with the API server address.
+        
+        Args:
+            base_url (str): Base URL of the API server
+        """
+        self.base_url = (base_url or ServerConfig.API_BASE_URL).rstrip("/")
+        self.timeout = ServerConfig.CLIENT_TIMEOUT
+    
+    def chat(self, question: str, history: Optional[List[Dict[str, Any]]] = None,
+             state: Optional[Dict[str, Any]] = None, deadline: Optional[Deadline] = None) -> str:
+        """
+        Ask a question and return the full answer.
+        
+        Args:
+            question (str): User's question
+            history (Optional[List[Dict[str, Any]]]): Earlier turns of the session, oldest first
+            state (Optional[Dict[str, Any]]): Conversation state with the rolling summary
+            deadline (Optional[Deadline]): Sent to the server as the request's timeout
+            
+        Returns:
+            str: Generated response
+        """
+        payload: Dict[str, Any] = {"question": question, **self.conversation_payload(history, state)}
+        timeout = self.timeout
+        if deadline is not None:
+            payload["timeout"] = round(deadline.remaining(), 3)
+            timeout = deadline.timeout(self.timeout) + 1.0  # Let the server report its own 504
+        try:
+            response = requests.post(
+                f"{self.base_url}/chat",
+                json=payload,
+                timeout=timeout
+            )
+            if response.status_code == 504:
+                return PersonaConfig.DEADLINE_MESSAGE
+            response.raise_for_status()
+            body = response.json()
+            return FallbackAnswer(body["answer"]) if body.get("fallback") else body["answer"]
+        except requests.exceptions.RequestException as e:
+            return f"⚠ Network error: {str(e)}"
+        except (KeyError, ValueError) as e:
+            return f"⚠ API response error: {str(e)}"
+    
+    @staticmethod
+    def conversation_payload(history: Optional[List[Dict[str, Any]]],
+                             state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Turns and rolling summary in the form /chat and /summary read them"""
+        payload: Dict[str, Any] = {}
+        if history:
+            payload["history"] = [
+                {"id": turn.get("id", 0), "question": turn["question"], "answer": turn["answer"]}
+                for turn in history
+            ]
+        if state and state["summary"]:
+            payload["summary"] = state["summary"]
+            payload["summarized_id"] = state["summarized_id"]
+        return payload
+    
+    def refresh_summary(self, state: Dict[str, Any], history: List[Dict[str, Any]]) -> bool:
+        """
+        Have the server fold older turns into the rolling summary.
+        
+        The thin-client counterpart of ConversationMemory.maybe_refresh_summary.
+        
+        Args:
+            state (Dict[str, Any]): Conversation state, updated in place
+            history (List[Dict[str, Any]]): Earlier turns of the session, oldest first
+            
+        Returns:
+            bool: True if the summary was refreshed; on errors the next turn retries
+        """
+        try:
+            response = requests.post(
+                f"{self.base_url}/summary",
+                json=self.conversation_payload(history, state),
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            body = response.json()
+            if not body["refreshed"]:
+                return False
+            # One update, as the session may read the state while this runs on the executor
+            state.update(summary=body["summary"], summarized_id=body["summarized_id"])
+            return True
+        except (requests.exceptions.RequestException, KeyError, ValueError):
+            return False
+    
+    def horoscope(self, name: str, birth_datetime, location: str,
+                  zodiac: str = "tropical") -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate planetary positions on the server.
+        
+        Args:
+            name (str): Person's name
+            birth_datetime (datetime): Birth date and time
+            location (str): Birth location
+            zodiac (str): "tropical", or "sidereal" for a Vedic chart with dashas
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Planetary positions data; for "sidereal", the chart
+                of AstrologyCalculator.get_vedic_chart
+        """
+        response = requests.post(
+            f"{self.base_url}/horoscope",
+            json={
+                "name": name,
+                "birth_datetime": birth_datetime.isoformat(),
+                "location": location,
+                "zodiac": zodiac
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        body = response.json()
+        if zodiac == "sidereal":
+            return {"planets": body["planets"], **body["vedic"]}
+        return body["planets"]
+
+
+def create_embeddings(model_name: str = EmbeddingsConfig.MODEL_NAME, normalize: bool = True):
+    """
+    Create the embeddings used for queries.
+    
+    If RAAVAN_SNAPSHOT is set, the encoder runs from the serving snapshot.
+    If RAAVAN_EMBEDDING_SOCKET is set, a client of the shared embedding
+    server is returned instead of loading the model in this process.
+    
+    Args:
+        model_name (str): Sentence-transformers model name
+        normalize (bool): Whether to normalize embeddings
+        
+    Returns:
+        HuggingFaceEmbeddings: Embeddings instance (EmbeddingClient when using the server)
+    """
+    if EmbeddingsConfig.SNAPSHOT_FILE:
+        # NumPy encoder over the mapped weights; torch is never imported
+        from api.snapshot import SnapshotEmbeddings, open_snapshot
+        return SnapshotEmbeddings(open_snapshot(EmbeddingsConfig.SNAPSHOT_FILE))
+    if EmbeddingsConfig.SERVER_SOCKET:
+        from api.embedding_server import EmbeddingClient
+        return EmbeddingClient(EmbeddingsConfig.SERVER_SOCKET)
+    return create_local_embeddings(model_name, normalize)
+
+
+def create_local_embeddings(model_name: str = EmbeddingsConfig.MODEL_NAME, normalize: bool = True):
+    """
+    Load the HuggingFace embeddings model in this process.
+    
+    Args:
+        model_name (str): Sentence-transformers model name
+        normalize (bool): Whether to normalize embeddings
+        
+    Returns:
+        HuggingFaceEmbeddings: Embeddings instance
+    """
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    
+    encode_kwargs = {'normalize_embeddings': True} if normalize else {}
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={'device': 'cpu'},  # Force CPU usage
+        encode_kwargs=encode_kwargs
+    )
+
+
+def create_vectordb(embedding):
+    """
+    Open the persisted Chroma vector database.
+    
+    With RAAVAN_SNAPSHOT set, the index inside the serving snapshot is used.
+    When a shard manifest exists every shard in it is opened instead. Once
+    publish_index.py has published a version, the current version is served
+    and followed. In read-only mode the memory-mapped shared index is opened.
+    
+    Args:
+        embedding: Embeddings instance used for queries
+        
+    Returns:
+        Chroma: Vector database instance (SnapshotVectorIndex, ShardSet, VersionedIndex or
+            SharedVectorIndex in those modes)
+    """
+    if EmbeddingsConfig.SNAPSHOT_FILE:
+        from api.snapshot import SnapshotVectorIndex, open_snapshot
+        return SnapshotVectorIndex(open_snapshot(EmbeddingsConfig.SNAPSHOT_FILE), embedding)
+        
+    if os.path.exists(ShardConfig.MANIFEST_FILE):
+        from api.shards import ShardSet
+        return ShardSet(ShardConfig.MANIFEST_FILE, embedding)
+        
+    from api.index_versions import VersionedIndex, current_version
+    if current_version() is not None:
+        # Published versions are followed and hot-swapped without a restart
+        return VersionedIndex(embedding)
+        
+    if EmbeddingsConfig.READ_ONLY_INDEX:
+        # Memory-mapped export shared by every worker; never writes to chroma_db
+        from api.shared_index import SharedVectorIndex
+        return SharedVectorIndex(EmbeddingsConfig.SHARED_INDEX_DIR, embedding)
+        
+    from langchain_community.vectorstores import Chroma
+    from api.hnsw import collection_metadata
+    
+    return Chroma(
+        persist_directory=EmbeddingsConfig.PERSIST_DIRECTORY,
+        embedding_function=embedding,
+        collection_metadata=collection_metadata()  # Applies when the collection is created
+    )
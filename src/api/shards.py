@@ -0,0 +1,444 @@
+"""
+Sharded corpus searched in parallel.
+Each kanda, commentary or translation lives in its own collection so it can be
+rebuilt on its own. A query is encoded once, routed to the shards that can
+answer it, searched on a thread pool with a per-shard timeout, and the
+per-shard top-k lists are merged by distance.
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import ShardConfig
+from utils.metrics import metrics
+
+_DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+_LATIN = re.compile(r"[A-Za-z]")
+
+
+def detect_language(text: str) -> str:
+    """
+    Guess the script of a query.
+    
+    Args:
+        text (str): Query text
+        
+    Returns:
+        str: "hi" for mostly Devanagari text, otherwise "en"
+    """
+    return "hi" if len(_DEVANAGARI.findall(text)) > len(_LATIN.findall(text)) else "en"
+
+
+def load_manifest(manifest_file: str = ShardConfig.MANIFEST_FILE) -> Dict[str, Any]:
+    """
+    Read the shard manifest.
+    
+    Args:
+        manifest_file (str): Path of shards.json
+        
+    Returns:
+        Dict[str, Any]: {"shards": [...]}, empty if the file does not exist
+    """
+    path = Path(manifest_file)
+    if not path.exists():
+        return {"shards": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def register_shard(entry: Dict[str, Any], manifest_file: str = ShardConfig.MANIFEST_FILE) -> Optional[Dict[str, Any]]:
+    """
+    Add or replace a shard in the manifest atomically.
+    
+    Serving processes pick up the change on their next manifest check.
+    
+    Args:
+        entry (Dict[str, Any]): Shard entry; "name" identifies it
+        manifest_file (str): Path of shards.json
+        
+    Returns:
+        Optional[Dict[str, Any]]: The entry it replaced, if any
+    """
+    manifest = load_manifest(manifest_file)
+    previous = next((s for s in manifest["shards"] if s["name"] == entry["name"]), None)
+    manifest["shards"] = [s for s in manifest["shards"] if s["name"] != entry["name"]] + [entry]
+    
+    path = Path(manifest_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    staging.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(staging, path)
+    return previous
+
+
+def build_shard(name: str, texts: List[str], embedding, language: Optional[str] = None,
+                metadata: Optional[Dict[str, Any]] = None, keywords: Optional[List[str]] = None,
+                manifest_file: str = ShardConfig.MANIFEST_FILE,
+                metadatas: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Embed texts into a new version of a shard and publish it.
+    
+    The collection is written to a fresh directory, so serving processes
+    keep searching the old version until the manifest points at the new
+    one. The version before the replaced one is deleted.
+    
+    Args:
+        name (str): Shard name, e.g. "sundara-kanda"
+        texts (List[str]): Chunks to index
+        embedding: Embeddings instance
+        language (Optional[str]): "en" or "hi"; None searches it for every query
+        metadata (Optional[Dict[str, Any]]): Routing metadata, also stored on each chunk
+        keywords (Optional[List[str]]): Words in a question that point at this shard
+        manifest_file (str): Path of shards.json
+        metadatas (Optional[List[Dict[str, Any]]]): Per-chunk metadata, e.g. from chunk_documents
+        
+    Returns:
+        Dict[str, Any]: The published manifest entry
+    """
+    from langchain_community.vectorstores import Chroma
+    from api.hnsw import collection_metadata
+    
+    base_dir = Path(manifest_file).parent
+    path = f"{name}-{time.strftime('%Y%m%dT%H%M%S')}"
+    metadata = dict(metadata or {})
+    Chroma.from_texts(
+        texts=texts,
+        embedding=embedding,
+        metadatas=[{**chunk, "shard": name, **metadata} for chunk in (metadatas or [{}] * len(texts))],
+        persist_directory=str(base_dir / path),
+        collection_metadata=collection_metadata()
+    )
+    
+    entry = {
+        "name": name,
+        "path": path,
+        "collection": "langchain",
+        "language": language,
+        "metadata": metadata,
+        "keywords": list(keywords or []),
+        "chunks": len(texts)
+    }
+    previous = register_shard(entry, manifest_file)
+    
+    # Workers may still have the previous version open until their next reload
+    keep = {path, previous["path"] if previous else None}
+    for old in base_dir.glob(f"{name}-*"):
+        if old.is_dir() and old.name not in keep:
+            shutil.rmtree(old, ignore_errors=True)
+    return entry
+
+
+class Shard:
+    """One searchable collection and the routing hints describing it"""
+    
+    def __init__(self, entry: Dict[str, Any], store):
+        """
+        Initialize from a manifest entry.
+        
+        Args:
+            entry (Dict[str, Any]): Manifest entry
+            store: Opened vector store
+        """
+        self.name: str = entry["name"]
+        self.entry = entry
+        self.store = store
+        self.language: Optional[str] = entry.get("language")  # None matches every query
+        self.metadata: Dict[str, Any] = entry.get("metadata", {})
+        keywords = [re.escape(word.lower()) for word in entry.get("keywords", [])]
+        self.keywords = re.compile(r"\b(" + "|".join(keywords) + r")\b") if keywords else None
+    
+    @property
+    def key(self) -> Tuple:
+        """Identity of the underlying data; a changed key means the shard was rebuilt"""
+        return (self.entry.get("path"), self.entry.get("collection"), self.entry.get("format"))
+
+
+def open_shard(entry: Dict[str, Any], base_dir: str, embedding) -> Shard:
+    """
+    Open the vector store behind a manifest entry.
+    
+    Args:
+        entry (Dict[str, Any]): Manifest entry
+        base_dir (str): Directory relative paths are resolved against
+        embedding: Embeddings instance used for queries
+        
+    Returns:
+        Shard: Opened shard
+    """
+    location = Path(base_dir, entry["path"])
+    if entry.get("format") == "shared":
+        from api.shared_index import SharedVectorIndex
+        return Shard(entry, SharedVectorIndex(str(location), embedding))
+        
+    from langchain_community.vectorstores import Chroma
+    return Shard(entry, Chroma(
+        persist_directory=str(location),
+        collection_name=entry.get("collection", "langchain"),
+        embedding_function=embedding
+    ))
+
+
+def scored_search(store, embedding: List[float], k: int) -> List[Tuple[Any, float]]:
+    """
+    Nearest-neighbour search returning distances, for Chroma or the shared index.
+    
+    Args:
+        store: Vector store
+        embedding (List[float]): Query vector
+        k (int): Number of documents
+        
+    Returns:
+        List[Tuple[Any, float]]: Documents and distances, nearest first
+    """
+    if hasattr(store, "similarity_search_by_vector_with_score"):
+        return store.similarity_search_by_vector_with_score(embedding, k=k)
+    # LangChain's Chroma returns raw distances from this method despite its name
+    return store.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+
+
+class ShardRouter:
+    """Skips shards that cannot answer a query"""
+    
+    def select(self, shards: List[Shard], question: str,
+               filters: Optional[Dict[str, Any]] = None) -> List[Shard]:
+        """
+        Choose the shards to search.
+        
+        Shards in another language are skipped unless none match. Shards
+        whose metadata differs from the filters are skipped. If the question
+        names a shard's keyword (e.g. a kanda), keyword-tagged shards that
+        it does not name are skipped; untagged shards are always searched.
+        
+        Args:
+            shards (List[Shard]): All shards
+            question (str): Query text
+            filters (Optional[Dict[str, Any]]): Required shard metadata values
+            
+        Returns:
+            List[Shard]: Shards to search
+        """
+        language = detect_language(question)
+        candidates = [s for s in shards if s.language in (None, language)] or list(shards)
+        if filters:
+            candidates = [
+                s for s in candidates if all(s.metadata.get(key) == value for key, value in filters.items())
+            ]
+            
+        text = question.lower()
+        named = [s for s in candidates if s.keywords is not None and s.keywords.search(text)]
+        if named:
+            candidates = [s for s in candidates if s.keywords is None or s in named]
+        return candidates
+
+
+class ShardSet:
+    """Vector store over many collections with parallel fan-out search"""
+    
+    def __init__(self, manifest_file: str = ShardConfig.MANIFEST_FILE, embedding=None,
+                 max_workers: int = ShardConfig.SEARCH_WORKERS,
+                 timeout: float = ShardConfig.SHARD_TIMEOUT,
+                 router: Optional[ShardRouter] = None):
+        """
+        Open every shard in the manifest.
+        
+        Args:
+            manifest_file (str): Path of shards.json
+            embedding: Embeddings instance used to encode queries
+            max_workers (int): Threads searching shards
+            timeout (float): Seconds to wait for shards before merging without them
+            router (Optional[ShardRouter]): Shard selection policy
+        """
+        self.manifest_file = manifest_file
+        self.embeddings = embedding
+        self.timeout = timeout
+        self.router = router or ShardRouter()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard-search")
+        self._lock = threading.Lock()
+        self._shards: List[Shard] = []
+        self._mtime: Optional[float] = None
+        self._checked = time.monotonic()
+        self._reloading = False
+        self.last_reload_error: Optional[str] = None
+        
+        # Metrics
+        self.searches = 0
+        self.shards_searched = 0
+        self.shards_skipped = 0
+        self.timeouts = 0
+        self.errors = 0
+        
+        self.reload()
+    
+    @property
+    def shards(self) -> List[Shard]:
+        """Current shards; the list is replaced, never mutated"""
+        return self._shards
+    
+    @property
+    def version(self) -> str:
+        """Identity of the shard data being served; changes when a shard is rebuilt"""
+        return ",".join(f"{shard.name}={shard.entry.get('path')}" for shard in self._shards)
+    
+    def reload(self):
+        """
+        Re-read the manifest and swap in changed shards.
+        
+        Unchanged shards keep their open stores. Searches already running
+        finish on the shards they started with.
+        """
+        mtime = os.stat(self.manifest_file).st_mtime if os.path.exists(self.manifest_file) else None
+        base_dir = str(Path(self.manifest_file).parent)
+        current = {shard.name: shard for shard in self._shards}
+        
+        shards = []
+        for entry in load_manifest(self.manifest_file)["shards"]:
+            existing = current.get(entry["name"])
+            if existing is not None and Shard(entry, None).key == existing.key:
+                shards.append(Shard(entry, existing.store))  # Routing hints may have changed
+            else:
+                shards.append(open_shard(entry, base_dir, self.embeddings))
+                
+        with self._lock:
+            self._shards = shards
+            self._mtime = mtime
+    
+    def _maybe_reload(self):
+        # Opening a rebuilt shard happens off the request path
+        now = time.monotonic()
+        if now - self._checked < ShardConfig.RELOAD_INTERVAL:
+            return
+        self._checked = now
+        mtime = os.stat(self.manifest_file).st_mtime if os.path.exists(self.manifest_file) else None
+        with self._lock:
+            if mtime == self._mtime or self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._background_reload, name="shard-reload", daemon=True).start()
+    
+    def _background_reload(self):
+        try:
+            self.reload()
+            self.last_reload_error = None
+        except Exception as e:
+            self.last_reload_error = str(e)
+        finally:
+            with self._lock:
+                self._reloading = False
+    
+    def _search_one(self, shard: Shard, embedding: List[float], k: int) -> List[Tuple[Any, float]]:
+        start = time.perf_counter()
+        try:
+            return scored_search(shard.store, embedding, k)
+        finally:
+            metrics.observe("raavan_shard_search_seconds", time.perf_counter() - start, shard=shard.name)
+    
+    def search_shards(self, question: str, embedding: List[float], k: int = 4,
+                      filters: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """
+        Search the relevant shards in parallel and merge their results.
+        
+        Args:
+            question (str): Query text, used for routing
+            embedding (List[float]): Query vector
+            k (int): Number of documents to return
+            filters (Optional[Dict[str, Any]]): Required shard metadata values
+            timeout (Optional[float]): Shorter wait than the shard timeout, e.g. the request's time left
+            
+        Returns:
+            List[Tuple[Any, float]]: Documents and distances, nearest first
+        """
+        self._maybe_reload()
+        shards = self.shards
+        selected = self.router.select(shards, question, filters)
+        self.shards_skipped += len(shards) - len(selected)
+        return self._fan_out(selected, embedding, k, timeout)
+    
+    def _fan_out(self, shards: List[Shard], embedding: List[float], k: int,
+                 timeout: Optional[float] = None) -> List[Tuple[Any, float]]:
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        self.searches += 1
+        self.shards_searched += len(shards)
+        if not shards:
+            return []
+            
+        futures = {self._executor.submit(self._search_one, shard, embedding, k): shard for shard in shards}
+        done, pending = wait(futures, timeout=timeout)
+        for future in pending:
+            future.cancel()
+            self.timeouts += 1
+            metrics.increment("raavan_shard_timeouts_total", shard=futures[future].name)
+            
+        results, failures = [], []
+        for future in done:
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                self.errors += 1
+                metrics.increment("raavan_shard_errors_total", shard=futures[future].name)
+                failures.append(e)
+                
+        if len(failures) == len(futures):
+            raise failures[0]
+        if not done:
+            raise TimeoutError(f"No shard answered within {timeout:.1f}s")
+            
+        # Every shard uses the same embedding model, so distances are comparable
+        results.sort(key=lambda item: item[1])
+        return results[:k]
+    
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Any]:
+        """
+        Search every shard without routing.
+        
+        Args:
+            embedding (List[float]): Query vector
+            k (int): Number of documents to return
+            
+        Returns:
+            List[Any]: Documents, nearest first
+        """
+        self._maybe_reload()
+        return [doc for doc, _ in self._fan_out(self.shards, embedding, k)]
+    
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Any]:
+        """
+        Encode a text query and search the relevant shards.
+        
+        Args:
+            query (str): Query text
+            k (int): Number of documents to return
+            
+        Returns:
+            List[Any]: Documents, nearest first
+        """
+        return [doc for doc, _ in self.search_shards(query, self.embeddings.embed_query(query), k)]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get shard and fan-out statistics.
+        
+        Returns:
+            Dict[str, Any]: Shard list and search counters
+        """
+        shards = self.shards
+        return {
+            "collection_name": "sharded",
+            "mode": "sharded",
+            "status": "Connected",
+            "shards": [
+                {"name": s.name, "language": s.language, "metadata": s.metadata} for s in shards
+            ],
+            "searches": self.searches,
+            "shards_searched": self.shards_searched,
+            "shards_skipped": self.shards_skipped,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "last_reload_error": self.last_reload_error
+        }
@@ -0,0 +1,300 @@
+"""
+Read-only vector index shared by worker processes.
+The ingestion tool exports the Chroma collection once into flat files; every
+worker then memory-maps them read-only, so the vectors and chunk texts live
+once in the OS page cache instead of once per process.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from config.settings import EmbeddingsConfig
+
+FORMAT_VERSION = 1
+
+# Chroma's embeddings_queue operation codes
+_ADD, _UPDATE, _UPSERT, _DELETE = 0, 1, 2, 3
+
+
+class ReadOnlyIndexError(Exception):
+    """Raised when something tries to write to the shared serving index"""
+
+
+class IndexedDocument:
+    """Minimal stand-in for a LangChain Document"""
+    
+    __slots__ = ("page_content", "metadata")
+    
+    def __init__(self, page_content: str, metadata: Dict[str, Any]):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+def open_chroma_readonly(persist_directory: str) -> sqlite3.Connection:
+    """
+    Open Chroma's SQLite database without taking any locks.
+    
+    Args:
+        persist_directory (str): Chroma persist directory
+        
+    Returns:
+        sqlite3.Connection: Immutable, read-only connection
+    """
+    path = Path(persist_directory, "chroma.sqlite3").resolve()
+    return sqlite3.connect(f"{path.as_uri()}?mode=ro&immutable=1", uri=True)
+
+
+def read_collection(persist_directory: str, collection: str = "langchain") -> Tuple[
+        List[str], np.ndarray, List[str], List[Dict[str, Any]], str]:
+    """
+    Read every vector and document of a Chroma collection straight from SQLite.
+    
+    Args:
+        persist_directory (str): Chroma persist directory
+        collection (str): Collection name
+        
+    Returns:
+        Tuple: ids, float32 vectors (N x D), documents, metadatas and distance space
+    """
+    conn = open_chroma_readonly(persist_directory)
+    try:
+        row = conn.execute(
+            "SELECT id, dimension, config_json_str FROM collections WHERE name = ?", (collection,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Collection '{collection}' not found in {persist_directory}")
+        collection_id, dimension, config_json = row
+        space = (
+            json.loads(config_json or "{}").get("vector_index", {}).get("hnsw", {}).get("space", "l2")
+        )
+        
+        # Replay the write log so updates and deletes are honoured
+        vectors: Dict[str, np.ndarray] = {}
+        order: Dict[str, int] = {}
+        for seq_id, embedding_id, operation, vector, encoding in conn.execute(
+            "SELECT seq_id, id, operation, vector, encoding FROM embeddings_queue "
+            "WHERE topic LIKE ? ORDER BY seq_id",
+            (f"%{collection_id}",)
+        ):
+            if operation == _DELETE:
+                vectors.pop(embedding_id, None)
+                continue
+            if operation == _ADD and embedding_id in vectors:
+                continue
+            if operation == _UPDATE and embedding_id not in vectors:
+                continue
+            if vector is None:
+                continue
+            if encoding and encoding.upper() != "FLOAT32":
+                raise ValueError(f"Unsupported vector encoding {encoding}")
+            vectors[embedding_id] = np.frombuffer(vector, dtype="<f4")
+            order.setdefault(embedding_id, seq_id)
+            
+        documents: Dict[str, str] = {}
+        metadatas: Dict[str, Dict[str, Any]] = {}
+        for embedding_id, key, string_value, int_value, float_value, bool_value in conn.execute(
+            "SELECT e.embedding_id, m.key, m.string_value, m.int_value, m.float_value, m.bool_value "
+            "FROM embedding_metadata m JOIN embeddings e ON e.id = m.id "
+            "JOIN segments s ON s.id = e.segment_id WHERE s.collection = ?",
+            (collection_id,)
+        ):
+            if key == "chroma:document":
+                documents[embedding_id] = string_value or ""
+                continue
+            value = next(
+                (v for v in (string_value, int_value, float_value) if v is not None),
+                None if bool_value is None else bool(bool_value)
+            )
+            metadatas.setdefault(embedding_id, {})[key] = value
+    finally:
+        conn.close()
+        
+    ids = sorted(vectors, key=order.get)
+    if ids:
+        matrix = np.vstack([vectors[i] for i in ids]).astype(np.float32)
+    else:
+        matrix = np.zeros((0, dimension or 0), dtype=np.float32)
+    return ids, matrix, [documents.get(i, "") for i in ids], [metadatas.get(i, {}) for i in ids], space
+
+
+def export_shared_index(persist_directory: str = EmbeddingsConfig.PERSIST_DIRECTORY,
+                        output_dir: str = EmbeddingsConfig.SHARED_INDEX_DIR,
+                        collection: str = "langchain") -> Dict[str, Any]:
+    """
+    Export a Chroma collection into the memory-mappable serving format.
+    
+    This is the only code path that writes the shared index. The new files
+    are built next to the target and swapped in, so running workers keep
+    their existing mappings until they reopen.
+    
+    Args:
+        persist_directory (str): Chroma persist directory to read
+        output_dir (str): Directory to write the shared index to
+        collection (str): Collection name
+        
+    Returns:
+        Dict[str, Any]: Manifest of the written index
+    """
+    ids, vectors, documents, metadatas, space = read_collection(persist_directory, collection)
+    
+    target = Path(output_dir)
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    
+    np.save(staging / "vectors.npy", vectors)
+    np.save(staging / "norms.npy", np.einsum("ij,ij->i", vectors, vectors).astype(np.float32))
+    
+    encoded = [document.encode("utf-8") for document in documents]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+    np.save(staging / "offsets.npy", offsets)
+    (staging / "documents.bin").write_bytes(b"".join(encoded))
+    (staging / "records.json").write_text(
+        json.dumps({"ids": ids, "metadatas": metadatas}, ensure_ascii=False), encoding="utf-8"
+    )
+    
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "collection": collection,
+        "count": len(ids),
+        "dimension": int(vectors.shape[1]),
+        "space": space,
+        "source": str(Path(persist_directory).resolve()),
+        "created_at": time.time()
+    }
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    
+    backup = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        target.rename(backup)
+    staging.rename(target)
+    shutil.rmtree(backup, ignore_errors=True)
+    return manifest
+
+
+class SharedVectorIndex:
+    """Read-only, memory-mapped vector store with a Chroma-like search API"""
+    
+    def __init__(self, index_dir: str = EmbeddingsConfig.SHARED_INDEX_DIR, embedding=None):
+        """
+        Map an exported index.
+        
+        Args:
+            index_dir (str): Directory written by export_shared_index
+            embedding: Embeddings instance used to encode text queries
+        """
+        self.index_dir = Path(index_dir)
+        self.embeddings = embedding
+        self.manifest = json.loads((self.index_dir / "manifest.json").read_text(encoding="utf-8"))
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported shared index format in {index_dir}")
+        if self.manifest.get("space", "l2") not in ("l2", "cosine", "ip"):
+            raise ValueError(f"Unsupported distance space {self.manifest['space']}")
+            
+        # Read-only mappings: pages are shared between every process mapping them
+        self.vectors = np.load(self.index_dir / "vectors.npy", mmap_mode="r")
+        self.norms = np.load(self.index_dir / "norms.npy", mmap_mode="r")
+        self.offsets = np.load(self.index_dir / "offsets.npy", mmap_mode="r")
+        with open(self.index_dir / "documents.bin", "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._documents = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            
+        records = json.loads((self.index_dir / "records.json").read_text(encoding="utf-8"))
+        self.ids: List[str] = records["ids"]
+        self.metadatas: List[Dict[str, Any]] = records["metadatas"]
+    
+    def _document(self, index: int) -> IndexedDocument:
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        text = self._documents[start:end].decode("utf-8")
+        return IndexedDocument(text, dict(self.metadatas[index]))
+    
+    def _distances(self, vector: List[float]) -> np.ndarray:
+        query = np.asarray(vector, dtype=np.float32)
+        dots = self.vectors @ query
+        space = self.manifest.get("space", "l2")
+        if space == "ip":
+            return 1.0 - dots
+        if space == "cosine":
+            return 1.0 - dots / (np.sqrt(self.norms) * np.linalg.norm(query) + 1e-12)
+        return self.norms - 2.0 * dots + float(query @ query)
+    
+    def similarity_search_by_vector_with_score(self, embedding: List[float],
+                                               k: int = 4) -> List[Tuple[IndexedDocument, float]]:
+        """
+        Exact nearest-neighbour search over all vectors.
+        
+        Args:
+            embedding (List[float]): Query vector
+            k (int): Number of documents to return
+            
+        Returns:
+            List[Tuple[IndexedDocument, float]]: Documents and distances, nearest first
+        """
+        count = len(self.ids)
+        k = min(k, count)
+        if k <= 0:
+            return []
+        distances = self._distances(embedding)
+        top = np.argpartition(distances, k - 1)[:k] if k < count else np.arange(count)
+        top = top[np.argsort(distances[top], kind="stable")]
+        return [(self._document(int(i)), float(distances[i])) for i in top]
+    
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    **kwargs) -> List[IndexedDocument]:
+        """
+        Return the k documents nearest to a query vector.
+        
+        Args:
+            embedding (List[float]): Query vector
+            k (int): Number of documents to return
+            
+        Returns:
+            List[IndexedDocument]: Documents, nearest first
+        """
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+    
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[IndexedDocument]:
+        """
+        Return the k documents nearest to a text query.
+        
+        Args:
+            query (str): Query text
+            k (int): Number of documents to return
+            
+        Returns:
+            List[IndexedDocument]: Documents, nearest first
+        """
+        if self.embeddings is None:
+            raise ValueError("An embeddings instance is required for text queries")
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+    
+    def _reject_write(self, *args, **kwargs):
+        raise ReadOnlyIndexError(
+            "The shared index is read-only; rebuild it with export_index.py instead"
+        )
+        
+    add_texts = add_documents = add_embeddings = delete = update_document = persist = _reject_write
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+        
+        Returns:
+            Dict[str, Any]: Collection name, size and mode
+        """
+        return {
+            "collection_name": self.manifest["collection"],
+            "documents": self.manifest["count"],
+            "dimension": self.manifest["dimension"],
+            "mode": "read-only shared index",
+            "status": "Connected"
+        }
@@ -0,0 +1,469 @@
+"""
+Single-file serving snapshot for fast cold starts.
+One versioned file holds the embedding model weights, its vocabulary, the
+corpus vectors and the chunk texts. Serving processes map it read-only and
+encode queries with a NumPy port of the MiniLM encoder, so startup imports
+neither torch nor Chroma and pages are faulted in on first use.
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config.settings import EmbeddingsConfig
+from api.shared_index import SharedVectorIndex, read_collection
+
+MAGIC = b"RAAVANSNAP"
+FORMAT_VERSION = 1
+ALIGNMENT = 64  # Section offsets are aligned so array views start on cache lines
+
+# Magic, format version and header length, followed by the JSON header
+_PREAMBLE = struct.Struct("<10sIQ")
+
+
+def write_snapshot(path: str, persist_directory: str = EmbeddingsConfig.PERSIST_DIRECTORY,
+                   model_name: str = EmbeddingsConfig.MODEL_NAME,
+                   collection: str = "langchain") -> Dict[str, Any]:
+    """
+    Build a serving snapshot from chroma_db and the sentence-transformers model.
+    
+    This is a build step: it needs torch and sentence-transformers, which the
+    serving side does not. The file is written next to the target and
+    renamed into place.
+    
+    Args:
+        path (str): Snapshot file to write
+        persist_directory (str): Chroma persist directory to read
+        model_name (str): Sentence-transformers model to pack
+        collection (str): Collection name
+        
+    Returns:
+        Dict[str, Any]: Header metadata of the written snapshot
+    """
+    from sentence_transformers import SentenceTransformer
+    
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    config = transformer.auto_model.config
+    if config.model_type != "bert":
+        raise ValueError(f"Only BERT-style encoders can be packed, not {config.model_type}")
+    vocab = transformer.tokenizer.get_vocab()
+    
+    ids, vectors, documents, metadatas, space = read_collection(persist_directory, collection)
+    encoded = [document.encode("utf-8") for document in documents]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+    
+    sections: Dict[str, Any] = {
+        "vocab": "\n".join(sorted(vocab, key=vocab.get)).encode("utf-8"),
+        "vectors": vectors,
+        "norms": np.einsum("ij,ij->i", vectors, vectors).astype(np.float32),
+        "offsets": offsets,
+        "documents": b"".join(encoded),
+        "records": json.dumps({"ids": ids, "metadatas": metadatas}, ensure_ascii=False).encode("utf-8")
+    }
+    for name, tensor in transformer.auto_model.state_dict().items():
+        if tensor.is_floating_point() and not name.startswith("pooler."):
+            sections[f"weights/{name}"] = tensor.detach().cpu().numpy().astype(np.float32)
+            
+    meta = {
+        "model": {
+            "name": model_name,
+            "hidden_size": config.hidden_size,
+            "num_layers": config.num_hidden_layers,
+            "num_heads": config.num_attention_heads,
+            "layer_norm_eps": config.layer_norm_eps,
+            "max_seq_length": min(model.max_seq_length, config.max_position_embeddings),
+            "do_lower_case": bool(getattr(transformer.tokenizer, "do_lower_case", True)),
+            "normalize": True
+        },
+        "index": {
+            "collection": collection,
+            "count": len(ids),
+            "dimension": int(vectors.shape[1]),
+            "space": space,
+            "source": str(Path(persist_directory).resolve())
+        },
+        "created_at": time.time()
+    }
+    
+    target = Path(path)
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    _write_sections(staging, sections, meta)
+    os.replace(staging, target)
+    return meta
+
+
+def _write_sections(path: Path, sections: Dict[str, Any], meta: Dict[str, Any]):
+    # Lay the sections out first, then write header and payloads in one pass
+    table, payloads, position = {}, [], 0
+    for name, value in sections.items():
+        if isinstance(value, np.ndarray):
+            data = np.ascontiguousarray(value).astype(value.dtype.newbyteorder("<"), copy=False)
+            entry = {"dtype": data.dtype.str, "shape": list(data.shape)}
+            raw = data.tobytes()
+        else:
+            entry, raw = {"dtype": "bytes"}, bytes(value)
+        position = -(-position // ALIGNMENT) * ALIGNMENT
+        entry.update(offset=position, length=len(raw))
+        table[name] = entry
+        payloads.append((position, raw))
+        position += len(raw)
+        
+    header = json.dumps({**meta, "sections": table}).encode("utf-8")
+    data_start = -(-(_PREAMBLE.size + len(header)) // ALIGNMENT) * ALIGNMENT
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for offset, raw in payloads:
+            f.seek(data_start + offset)
+            f.write(raw)
+        f.truncate(data_start + position)
+
+
+class Snapshot:
+    """Read-only mapping of a snapshot file; sections are views into the mapping"""
+    
+    def __init__(self, path: str):
+        """
+        Map a snapshot and parse its header; no section is read yet.
+        
+        Args:
+            path (str): Snapshot file
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Raavan serving snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {version} in {path}")
+        self.header = json.loads(self._map[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        self.data_start = -(-(_PREAMBLE.size + header_length) // ALIGNMENT) * ALIGNMENT
+        self.sections: Dict[str, Dict[str, Any]] = self.header["sections"]
+    
+    def offset(self, name: str) -> int:
+        """Absolute file offset of a section"""
+        return self.data_start + self.sections[name]["offset"]
+    
+    def array(self, name: str) -> np.ndarray:
+        """
+        Zero-copy, read-only view of an array section.
+        
+        Args:
+            name (str): Section name
+            
+        Returns:
+            np.ndarray: View backed by the mapping
+        """
+        entry = self.sections[name]
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"])) if entry["shape"] else 1
+        return np.frombuffer(self._map, dtype=dtype, count=count, offset=self.offset(name)).reshape(entry["shape"])
+    
+    def bytes(self, name: str) -> bytes:
+        """Copy of a byte section"""
+        start = self.offset(name)
+        return self._map[start:start + self.sections[name]["length"]]
+    
+    @property
+    def mapping(self) -> mmap.mmap:
+        """The underlying read-only mapping"""
+        return self._map
+
+
+class WordPieceTokenizer:
+    """BERT uncased tokenizer: basic splitting followed by greedy WordPiece"""
+    
+    def __init__(self, vocab: List[str], do_lower_case: bool = True):
+        """
+        Initialize from the vocabulary in id order.
+        
+        Args:
+            vocab (List[str]): Tokens, index is the token id
+            do_lower_case (bool): Lowercase and strip accents like BERT uncased
+        """
+        self.vocab = {token: index for index, token in enumerate(vocab)}
+        self.do_lower_case = do_lower_case
+        self.unk_id = self.vocab["[UNK]"]
+        self.cls_id = self.vocab["[CLS]"]
+        self.sep_id = self.vocab["[SEP]"]
+        self.pad_id = self.vocab.get("[PAD]", 0)
+        self._cache: Dict[str, List[int]] = {}
+    
+    @staticmethod
+    def _is_punctuation(char: str) -> bool:
+        code = ord(char)
+        if 33 <= code <= 47 or 58 <= code <= 64 or 91 <= code <= 96 or 123 <= code <= 126:
+            return True
+        return unicodedata.category(char).startswith("P")
+    
+    @staticmethod
+    def _is_cjk(code: int) -> bool:
+        return (0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0x20000 <= code <= 0x2A6DF
+                or 0x2A700 <= code <= 0x2B73F or 0x2B740 <= code <= 0x2B81F or 0x2B820 <= code <= 0x2CEAF
+                or 0xF900 <= code <= 0xFAFF or 0x2F800 <= code <= 0x2FA1F)
+    
+    def _basic_tokens(self, text: str) -> List[str]:
+        chars = []
+        for char in text:
+            code = ord(char)
+            category = unicodedata.category(char)
+            if code == 0 or code == 0xFFFD or (category.startswith("C") and char not in "\t\n\r"):
+                continue
+            if self._is_cjk(code):
+                chars.append(f" {char} ")
+            elif char.isspace() or category == "Zs":
+                chars.append(" ")
+            else:
+                chars.append(char)
+                
+        tokens = []
+        for word in "".join(chars).split():
+            if self.do_lower_case:
+                word = "".join(
+                    c for c in unicodedata.normalize("NFD", word.lower()) if unicodedata.category(c) != "Mn"
+                )
+            current = []
+            for char in word:
+                if self._is_punctuation(char):
+                    if current:
+                        tokens.append("".join(current))
+                        current = []
+                    tokens.append(char)
+                else:
+                    current.append(char)
+            if current:
+                tokens.append("".join(current))
+        return tokens
+    
+    def _wordpiece(self, word: str) -> List[int]:
+        cached = self._cache.get(word)
+        if cached is not None:
+            return cached
+        if len(word) > 100:
+            return [self.unk_id]
+        ids, start = [], 0
+        while start < len(word):
+            end = len(word)
+            while end > start:
+                piece = word[start:end] if start == 0 else f"##{word[start:end]}"
+                if piece in self.vocab:
+                    ids.append(self.vocab[piece])
+                    break
+                end -= 1
+            else:
+                ids = [self.unk_id]
+                break
+            start = end
+        if len(self._cache) < 50000:
+            self._cache[word] = ids
+        return ids
+    
+    def encode(self, text: str, max_length: int) -> List[int]:
+        """
+        Convert text to token ids with [CLS] and [SEP], truncated to max_length.
+        
+        Args:
+            text (str): Input text
+            max_length (int): Maximum sequence length including special tokens
+            
+        Returns:
+            List[int]: Token ids
+        """
+        ids = [token_id for word in self._basic_tokens(text) for token_id in self._wordpiece(word)]
+        return [self.cls_id] + ids[:max_length - 2] + [self.sep_id]
+
+
+def _erf(x: np.ndarray) -> np.ndarray:
+    # Abramowitz and Stegun 7.1.26; absolute error below 1.5e-7
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1.0 - poly * np.exp(-x * x))
+
+
+def _layer_norm(x: np.ndarray, weight: np.ndarray, bias: np.ndarray, eps: float) -> np.ndarray:
+    mean = x.mean(axis=-1, keepdims=True)
+    variance = ((x - mean) ** 2).mean(axis=-1, keepdims=True)
+    return (x - mean) / np.sqrt(variance + eps) * weight + bias
+
+
+class SnapshotEmbeddings:
+    """Sentence embeddings computed in NumPy from the weights in a snapshot"""
+    
+    def __init__(self, snapshot: Snapshot, batch_size: int = 32):
+        """
+        Prepare the encoder; weights are only touched on the first encode.
+        
+        Args:
+            snapshot (Snapshot): Opened snapshot
+            batch_size (int): Texts per forward pass
+        """
+        self.snapshot = snapshot
+        self.config = snapshot.header["model"]
+        self.batch_size = batch_size
+        self._tokenizer: Optional[WordPieceTokenizer] = None
+        self._weights: Dict[str, np.ndarray] = {}
+    
+    @property
+    def tokenizer(self) -> WordPieceTokenizer:
+        """Tokenizer, built from the snapshot vocabulary on first use"""
+        if self._tokenizer is None:
+            vocab = self.snapshot.bytes("vocab").decode("utf-8").split("\n")
+            self._tokenizer = WordPieceTokenizer(vocab, self.config["do_lower_case"])
+        return self._tokenizer
+    
+    def _w(self, name: str) -> np.ndarray:
+        weight = self._weights.get(name)
+        if weight is None:
+            weight = self._weights[name] = self.snapshot.array(f"weights/{name}")
+        return weight
+    
+    def _linear(self, x: np.ndarray, name: str) -> np.ndarray:
+        # PyTorch stores Linear weights as (out, in)
+        return x @ self._w(f"{name}.weight").T + self._w(f"{name}.bias")
+    
+    def _forward(self, token_ids: List[List[int]]) -> np.ndarray:
+        eps = self.config["layer_norm_eps"]
+        heads = self.config["num_heads"]
+        length = max(len(ids) for ids in token_ids)
+        ids = np.full((len(token_ids), length), self.tokenizer.pad_id, dtype=np.int64)
+        mask = np.zeros((len(token_ids), length), dtype=np.float32)
+        for row, sequence in enumerate(token_ids):
+            ids[row, :len(sequence)] = sequence
+            mask[row, :len(sequence)] = 1.0
+            
+        x = (self._w("embeddings.word_embeddings.weight")[ids]
+             + self._w("embeddings.position_embeddings.weight")[:length]
+             + self._w("embeddings.token_type_embeddings.weight")[0])
+        x = _layer_norm(x, self._w("embeddings.LayerNorm.weight"), self._w("embeddings.LayerNorm.bias"), eps)
+        
+        batch, _, hidden = x.shape
+        head_size = hidden // heads
+        attention_bias = ((1.0 - mask) * np.finfo(np.float32).min)[:, None, None, :]
+        
+        def split(t):
+            return t.reshape(batch, length, heads, head_size).transpose(0, 2, 1, 3)
+            
+        for layer in range(self.config["num_layers"]):
+            prefix = f"encoder.layer.{layer}"
+            q = split(self._linear(x, f"{prefix}.attention.self.query"))
+            k = split(self._linear(x, f"{prefix}.attention.self.key"))
+            v = split(self._linear(x, f"{prefix}.attention.self.value"))
+            scores = q @ k.transpose(0, 1, 3, 2) / np.sqrt(head_size) + attention_bias
+            scores = np.exp(scores - scores.max(axis=-1, keepdims=True))
+            probabilities = scores / scores.sum(axis=-1, keepdims=True)
+            context = (probabilities @ v).transpose(0, 2, 1, 3).reshape(batch, length, hidden)
+            
+            attention = self._linear(context, f"{prefix}.attention.output.dense")
+            x = _layer_norm(attention + x, self._w(f"{prefix}.attention.output.LayerNorm.weight"),
+                            self._w(f"{prefix}.attention.output.LayerNorm.bias"), eps)
+            intermediate = self._linear(x, f"{prefix}.intermediate.dense")
+            intermediate = 0.5 * intermediate * (1.0 + _erf(intermediate / np.sqrt(2.0)))
+            output = self._linear(intermediate, f"{prefix}.output.dense")
+            x = _layer_norm(output + x, self._w(f"{prefix}.output.LayerNorm.weight"),
+                            self._w(f"{prefix}.output.LayerNorm.bias"), eps)
+                            
+        # Mean pooling over real tokens, as sentence-transformers does
+        pooled = (x * mask[:, :, None]).sum(axis=1) / np.maximum(mask.sum(axis=1, keepdims=True), 1e-9)
+        if self.config.get("normalize", True):
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Encode documents.
+        
+        Args:
+            texts (List[str]): Texts to encode
+            
+        Returns:
+            List[List[float]]: One vector per text
+        """
+        max_length = self.config["max_seq_length"]
+        encoded = [self.tokenizer.encode(text, max_length) for text in texts]
+        # Sort by length so each batch pads as little as possible
+        order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+        vectors: List[Optional[List[float]]] = [None] * len(encoded)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for index, vector in zip(batch, self._forward([encoded[i] for i in batch])):
+                vectors[index] = vector.tolist()
+        return vectors
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Encode a search query.
+        
+        Args:
+            text (str): Query text
+            
+        Returns:
+            List[float]: Query vector
+        """
+        return self.embed_documents([text])[0]
+
+
+class SnapshotVectorIndex(SharedVectorIndex):
+    """The shared-index search API over the vectors and chunks in a snapshot"""
+    
+    def __init__(self, snapshot: Snapshot, embedding=None):
+        """
+        Point the index at the snapshot sections.
+        
+        Args:
+            snapshot (Snapshot): Opened snapshot
+            embedding: Embeddings instance used to encode text queries
+        """
+        self.snapshot = snapshot
+        self.index_dir = Path(snapshot.path)
+        self.embeddings = embedding
+        self.manifest = dict(snapshot.header["index"])
+        self.vectors = snapshot.array("vectors")
+        self.norms = snapshot.array("norms")
+        # Chunk offsets are made absolute so texts are sliced straight from the mapping
+        self.offsets = snapshot.array("offsets") + snapshot.offset("documents")
+        self._documents = snapshot.mapping
+        records = json.loads(snapshot.bytes("records"))
+        self.ids: List[str] = records["ids"]
+        self.metadatas: List[Dict[str, Any]] = records["metadatas"]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+        
+        Returns:
+            Dict[str, Any]: Collection name, size and mode
+        """
+        stats = super().get_stats()
+        stats["mode"] = "serving snapshot"
+        return stats
+
+
+_opened: Dict[str, Snapshot] = {}
+
+
+def open_snapshot(path: str) -> Snapshot:
+    """
+    Map a snapshot once per process.
+    
+    Args:
+        path (str): Snapshot file
+        
+    Returns:
+        Snapshot: Shared mapping for the embeddings and the index
+    """
+    key = os.path.abspath(path)
+    if key not in _opened:
+        _opened[key] = Snapshot(key)
+    return _opened[key]
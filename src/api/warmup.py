@@ -0,0 +1,307 @@
+"""
+Deploy-time cache warm-up.
+Ranks the questions in a log of past traffic and precomputes query
+embeddings, retrieved context and Groq answers for the most frequent ones,
+so the head of the query distribution is served from cache from the first
+request after a deploy.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import RateLimitConfig, WarmupConfig
+from api.adaptive import adaptive_controller
+from api.cache import answer_cache, answer_scope, query_cache
+from utils.helpers import normalize_question
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def load_question_log(path: str = WarmupConfig.QUESTION_LOG,
+                      lookback_days: float = WarmupConfig.LOOKBACK_DAYS) -> List[str]:
+    """
+    Read past questions from a log.
+    
+    Args:
+        path (str): Chat history database (.sqlite3, .db), JSONL with a "question" field, or plain text
+        lookback_days (float): Age limit for chat history rows
+        
+    Returns:
+        List[str]: Questions in log order, with repeats; empty if the log does not exist
+    """
+    log = Path(path)
+    if not log.is_file():
+        return []
+        
+    if log.suffix in (".sqlite3", ".sqlite", ".db"):
+        conn = sqlite3.connect(f"{log.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT question FROM chat_history WHERE created_at >= ?",
+                (time.time() - lookback_days * 86400,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+        
+    questions = []
+    for line in log.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                question = json.loads(line).get("question")
+            except (ValueError, AttributeError):
+                continue
+            if isinstance(question, str):
+                questions.append(question)
+        else:
+            questions.append(line)
+    return questions
+
+
+def rank_questions(questions: List[str], top_n: int = WarmupConfig.TOP_N,
+                   min_count: int = WarmupConfig.MIN_COUNT) -> List[Tuple[str, int]]:
+    """
+    Rank questions by how often they were asked.
+    
+    Questions are counted by their normalized form, the key the answer
+    cache uses, and reported in the wording first seen.
+    
+    Args:
+        questions (List[str]): Logged questions
+        top_n (int): Questions to keep
+        min_count (int): Fewest occurrences worth warming
+        
+    Returns:
+        List[Tuple[str, int]]: (question, count), most frequent first
+    """
+    counts: Counter = Counter()
+    wording: Dict[str, str] = {}
+    for question in questions:
+        key = normalize_question(question)
+        if len(key) < 3:
+            continue
+        counts[key] += 1
+        wording.setdefault(key, question.strip())
+    return [(wording[key], count) for key, count in counts.most_common(top_n) if count >= min_count]
+
+
+@contextmanager
+def _exclusive(path: str, deadline: float) -> Iterator[bool]:
+    """Hold a lock file shared by server processes; yields False if it was not acquired in time"""
+    try:
+        import fcntl
+    except ImportError:
+        yield False  # No flock on Windows; each process warms on its own
+        return
+        
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{path}.lock", "a") as handle:
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    yield False
+                    return
+                time.sleep(0.2)
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _no_lock() -> Iterator[bool]:
+    yield False
+
+
+def load_warm_answers(path: str = WarmupConfig.ANSWERS_FILE,
+                      index_version: str = "") -> Dict[str, Dict[str, Any]]:
+    """
+    Read answers saved by an earlier warm-up.
+    
+    Answers from another index version, model or system prompt are left out.
+    
+    Args:
+        path (str): Answers file
+        index_version (str): Version of the index being served
+        
+    Returns:
+        Dict[str, Dict[str, Any]]: Normalized question to {"question", "answer", "created_at", "scope"}
+    """
+    scope = answer_scope(index_version)
+    try:
+        with open(path, encoding="utf-8") as f:
+            answers = json.load(f).get("answers", {})
+        return {key: entry for key, entry in answers.items() if entry.get("scope") == scope}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def save_warm_answers(answers: Dict[str, Dict[str, Any]], path: str = WarmupConfig.ANSWERS_FILE):
+    """
+    Write the answers file atomically.
+    
+    Args:
+        answers (Dict[str, Dict[str, Any]]): Normalized question to {"question", "answer", "created_at", "scope"}
+        path (str): Answers file
+    """
+    staging = f"{path}.tmp-{os.getpid()}"
+    with open(staging, "w", encoding="utf-8") as f:
+        json.dump({"answers": answers}, f, ensure_ascii=False, indent=1)
+    os.replace(staging, path)
+
+
+def warm_caches(questions: List[str], vector_service, groq_service,
+                concurrency: int = WarmupConfig.CONCURRENCY,
+                requests_per_second: float = WarmupConfig.REQUESTS_PER_SECOND,
+                timeout: float = WarmupConfig.TIMEOUT,
+                answers_file: Optional[str] = WarmupConfig.ANSWERS_FILE) -> Dict[str, Any]:
+    """
+    Precompute embeddings, context and answers for a list of questions.
+    
+    Query embeddings are computed in one batch and contexts on a bounded
+    pool, with the limits the chat path will use, so live requests hit the
+    same cache keys. Answers saved by another process or an earlier deploy
+    are reused while younger than ANSWER_MAX_AGE; only the rest are sent to
+    Groq, at background priority and paced to requests_per_second. Work
+    still pending at the timeout is dropped; calls already in flight keep
+    filling the cache.
+    
+    Args:
+        questions (List[str]): Questions, most important first
+        vector_service (VectorDatabaseService): Retrieval service, or None without a database
+        groq_service (GroqAPIService): LLM service
+        concurrency (int): Parallel retrievals and Groq calls
+        requests_per_second (float): Pace of warm-up Groq calls
+        timeout (float): Seconds before giving up on the remaining work
+        answers_file (Optional[str]): Answers shared between processes, None to skip
+        
+    Returns:
+        Dict[str, Any]: Counts per stage and seconds spent
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    report = {"questions": len(questions), "embedded": 0, "retrieved": 0, "answers_loaded": 0,
+              "answered": 0, "failed": 0, "skipped": 0}
+    if not questions:
+        report["seconds"] = 0.0
+        return report
+        
+    embeddings = getattr(getattr(vector_service, "vectordb", None), "embeddings", None)
+    if embeddings is not None:
+        with metrics.span("warmup_encoding"):
+            # embed_query is embed_documents of one text for every encoder we use
+            for question, vector in zip(questions, embeddings.embed_documents(questions)):
+                query_cache.put(question, vector)
+        report["embedded"] = len(questions)
+    
+    def retrieve(question: str) -> str:
+        limits = adaptive_controller.limits(question)
+        return vector_service.retrieve_context(question, k=limits.k, token_budget=limits.context_tokens)
+        
+    contexts = {question: "" for question in questions}
+    index_version = getattr(vector_service, "version", "")
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="raavan-warmup")
+    try:
+        if vector_service is not None:
+            with metrics.span("warmup_retrieval"):
+                futures = {pool.submit(retrieve, question): question for question in questions}
+                finished, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+                for future in finished:
+                    if future.exception() is None and not future.result().startswith("Error retrieving context"):
+                        contexts[futures[future]] = future.result()
+                        report["retrieved"] += 1
+                        
+        # One process at a time asks Groq; the others then load its answers
+        with _exclusive(answers_file, deadline) if answers_file else _no_lock():
+            saved = load_warm_answers(answers_file, index_version) if answers_file else {}
+            now = time.time()
+            for question in questions:
+                entry = saved.get(normalize_question(question))
+                if entry and now - entry["created_at"] < WarmupConfig.ANSWER_MAX_AGE:
+                    answer_cache.put(question, entry["answer"], age=now - entry["created_at"],
+                                     index_version=index_version)
+                    report["answers_loaded"] += 1
+                    
+            pending = [
+                q for q in questions
+                if answer_cache.get(q, max_age=WarmupConfig.ANSWER_MAX_AGE, index_version=index_version) is None
+            ]
+            pace = {"next": time.monotonic()}
+            pace_lock = threading.Lock()
+            
+            def answer(question: str) -> Tuple[str, Optional[str]]:
+                with pace_lock:
+                    slot = max(time.monotonic(), pace["next"])
+                    pace["next"] = slot + 1.0 / requests_per_second
+                time.sleep(max(0.0, slot - time.monotonic()))
+                if time.monotonic() >= deadline:
+                    return "skipped", None
+                limits = adaptive_controller.limits(question)
+                groq_service.query_llama(question, contexts[question],
+                                         priority=RateLimitConfig.PRIORITY_BACKGROUND,
+                                         max_tokens=limits.max_tokens, index_version=index_version)
+                # query_llama only caches real answers, not errors or fallbacks
+                text = answer_cache.get(question, index_version=index_version)
+                return ("answered", text) if text is not None else ("failed", None)
+                
+            with metrics.span("warmup_answers"):
+                futures = {pool.submit(answer, question): question for question in pending}
+                finished, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            for future, question in futures.items():
+                if future not in finished:
+                    report["skipped"] += 1
+                    continue
+                status, text = ("failed", None) if future.exception() is not None else future.result()
+                report[status] += 1
+                if text is not None:
+                    saved[normalize_question(question)] = {
+                        "question": question, "answer": text, "created_at": time.time(),
+                        "scope": answer_scope(index_version)
+                    }
+                    
+            if answers_file and report["answered"]:
+                save_warm_answers(saved, answers_file)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        
+    report["seconds"] = round(time.monotonic() - started, 3)
+    metrics.observe("raavan_warmup_seconds", report["seconds"])
+    return report
+
+
+def run_warmup(vector_service, groq_service, log_path: str = WarmupConfig.QUESTION_LOG,
+               top_n: int = WarmupConfig.TOP_N) -> Dict[str, Any]:
+    """
+    Warm the caches with the most frequent questions of the question log.
+    
+    Args:
+        vector_service (VectorDatabaseService): Retrieval service, or None without a database
+        groq_service (GroqAPIService): LLM service
+        log_path (str): Question log
+        top_n (int): Questions to warm
+        
+    Returns:
+        Dict[str, Any]: The warm-up report, plus the log size and top questions
+    """
+    logged = load_question_log(log_path)
+    ranked = rank_questions(logged, top_n)
+    report = warm_caches([question for question, _ in ranked], vector_service, groq_service)
+    report.update(log=log_path, logged=len(logged), top=ranked[:10])
+    logger.info("Cache warm-up: %s", {k: v for k, v in report.items() if k != "top"})
+    return report
@@ -5,6 +5,8 @@ Contains the core app class and session management.
 
 import sys
 import os
+import time
+import uuid
 from pathlib import Path
 
 # Add src directory to Python path for imports
@@ -13,19 +15,30 @@ sys.path.insert(0, str(current_dir))
 
 import streamlit as st
 from datetime import datetime
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
 
-from config.settings import UIConfig, EmbeddingsConfig
+from config.settings import (
+    UIConfig, EmbeddingsConfig, ServerConfig, HistoryConfig, ConversationConfig, MetricsConfig, JobConfig,
+    DeadlineConfig
+)
 from config.settings import UIConfig, PersonaConfig
-from api.services import GroqAPIService, VectorDatabaseService
-from utils.helpers import AstrologyCalculator, combine_date_time
+from api.services import (
+    GroqAPIService, VectorDatabaseService, RaavanAPIClient,
+    create_embeddings, create_vectordb
+)
+from api.conversation import ConversationMemory, new_conversation_state
+from api.adaptive import adaptive_controller
+from api.deadline import Deadline, DeadlineExceeded
+from api.fallback import FallbackAnswer
+from utils.helpers import AstrologyCalculator, calculate_horoscope, calculate_vedic_horoscope, combine_date_time
+from utils.jobs import JobRejectedError, job_executor
+from utils.history_store import get_history_store
+from utils.metrics import metrics
 from ui.components import (
     HeaderComponent, WelcomeComponent, ChatHistoryComponent,
     SidebarComponent, ChatInterfaceComponent, AstrologyResultsComponent,
-    ErrorComponent
+    ErrorComponent, AdminPanelComponent
 )
-from styles.main import get_custom_css
+from styles.assets import get_stylesheet_tag
 
 
 class RaavanAIApp:
@@ -35,7 +48,8 @@ class RaavanAIApp:
         """Initialize the application"""
         self.setup_page_config()
         self.apply_styling()
-        self.initialize_services()
+        with metrics.span("initialization"):
+            self.initialize_services()
         self.initialize_session_state()
     
     def setup_page_config(self):
@@ -49,34 +63,44 @@ class RaavanAIApp:
     
     def apply_styling(self):
         """Apply custom CSS styling"""
-        st.markdown(get_custom_css(), unsafe_allow_html=True)
+        # A link to the built, cached stylesheet; fragment reruns skip this entirely
+        st.markdown(get_stylesheet_tag(), unsafe_allow_html=True)
     
     def initialize_services(self):
         """Initialize API services and database connections"""
+        self.api_client = None
+        if ServerConfig.API_BASE_URL:
+            # Thin-client mode: the HTTP API server owns the models and database
+            self.api_client = RaavanAPIClient()
+            self.embedding = None
+            self.vectordb = None
+            self.groq_service = None
+            self.vector_service = None
+            self.astrology_calculator = AstrologyCalculator()
+            self.conversation = None
+            return
+        
         try:
             # Initialize embeddings with better error handling
-            self.embedding = HuggingFaceEmbeddings(
-                model_name=EmbeddingsConfig.MODEL_NAME,
-                model_kwargs={'device': 'cpu'},  # Force CPU usage
-                encode_kwargs={'normalize_embeddings': True}  # Normalize embeddings
-            )
+            self.embedding = create_embeddings()
             
             # Initialize vector database
-            self.vectordb = Chroma(
-                persist_directory=EmbeddingsConfig.PERSIST_DIRECTORY,
-                embedding_function=self.embedding
-            )
+            self.vectordb = create_vectordb(self.embedding)
             
             # Initialize services
             self.groq_service = GroqAPIService()
             self.vector_service = VectorDatabaseService(self.vectordb)
             self.astrology_calculator = AstrologyCalculator()
+            self.conversation = ConversationMemory(self.groq_service)
             
         except Exception as e:
             st.error(f"Error initializing services: {str(e)}")
             # Try alternative embedding model
             try:
                 st.info("Trying alternative embedding model...")
+                from langchain_community.vectorstores import Chroma
+                from langchain_community.embeddings import HuggingFaceEmbeddings
+                
                 self.embedding = HuggingFaceEmbeddings(
                     model_name="all-MiniLM-L6-v2",  # Simpler model name
                     model_kwargs={'device': 'cpu'}
@@ -90,6 +114,7 @@ class RaavanAIApp:
                 self.groq_service = GroqAPIService()
                 self.vector_service = VectorDatabaseService(self.vectordb)
                 self.astrology_calculator = AstrologyCalculator()
+                self.conversation = ConversationMemory(self.groq_service)
                 
                 st.success("Services initialized with alternative model!")
                 
@@ -103,11 +128,36 @@ class RaavanAIApp:
                 self.groq_service = GroqAPIService()
                 self.vector_service = None
                 self.astrology_calculator = AstrologyCalculator()
+                self.conversation = ConversationMemory(self.groq_service)
     
     def initialize_session_state(self):
         """Initialize Streamlit session state"""
+        self.history_store = get_history_store()
+        
+        if "session_id" not in st.session_state:
+            st.session_state.session_id = uuid.uuid4().hex
         if "history" not in st.session_state:
-            st.session_state.history = []
+            # Only a bounded window lives in memory; the rest stays in SQLite
+            st.session_state.history = self.history_store.recent(
+                st.session_state.session_id, HistoryConfig.MEMORY_WINDOW
+            )
+            st.session_state.total_turns = self.history_store.count(st.session_state.session_id)
+        if "visible_turns" not in st.session_state:
+            st.session_state.visible_turns = HistoryConfig.RENDER_WINDOW
+        if "conversation" not in st.session_state:
+            st.session_state.conversation = new_conversation_state()
+    
+    def get_visible_history(self):
+        """
+        Get the turns to render, loading older ones from the store on demand.
+        
+        Returns:
+            list: Turns to render, oldest first
+        """
+        visible = st.session_state.visible_turns
+        if visible <= len(st.session_state.history):
+            return st.session_state.history[-visible:]
+        return self.history_store.recent(st.session_state.session_id, visible)
     
     def render_header(self):
         """Render application header"""
@@ -118,17 +168,18 @@ class RaavanAIApp:
         if len(st.session_state.history) == 0:
             WelcomeComponent.render()
     
+    @staticmethod
+    def toggle_sidebar():
+        """Flip the sidebar state before the rerun the click triggers"""
+        st.session_state.sidebar_open = not st.session_state.sidebar_open
+    
     def render_sidebar_toggle(self):
         """Render small sidebar toggle button with arrow in corner"""
         # Show appropriate arrow based on sidebar state
         if st.session_state.sidebar_open:
-            if st.button("◀", key="close_sidebar", help="Close sidebar"):
-                st.session_state.sidebar_open = False
-                st.rerun()
+            st.button("◀", key="close_sidebar", help="Close sidebar", on_click=self.toggle_sidebar)
         else:
-            if st.button("▶", key="open_sidebar", help="Open sidebar"):
-                st.session_state.sidebar_open = True
-                st.rerun()
+            st.button("▶", key="open_sidebar", help="Open sidebar", on_click=self.toggle_sidebar)
     
     def render_sidebar(self):
         """Render sidebar with settings and astrology calculator"""
@@ -136,17 +187,73 @@ class RaavanAIApp:
             # Settings section
             SidebarComponent.render_settings()
             
-            # Astrology section
-            name, birth_datetime, location, is_valid = SidebarComponent.render_astrology_section()
-            
-            # Handle horoscope generation
-            if st.button("✨ Generate Horoscope"):
-                self.handle_horoscope_generation(name, birth_datetime, location, is_valid)
+            # Astrology section, rerun on its own when the form is submitted
+            self.render_astrology()
             
             # About section
             SidebarComponent.render_about_section()
     
-    def handle_horoscope_generation(self, name: str, birth_datetime: datetime, location: str, is_valid: bool):
+            # Latency panel for operators
+            if MetricsConfig.ADMIN_PANEL:
+                AdminPanelComponent.render(metrics)
+    
+    def render_astrology(self):
+        """Render the astrology fragment, polling while a horoscope job runs"""
+        job = self.get_horoscope_job()
+        # The refresh timer is registered by full runs only and cleared by the next one
+        st.session_state.horoscope_polling = job is not None and not job.done
+        interval = JobConfig.POLL_INTERVAL if st.session_state.horoscope_polling else None
+        st.fragment(self.render_astrology_form, run_every=interval)()
+    
+    def render_astrology_form(self):
+        """
+        Render the astrology form and the current horoscope job.
+        
+        The inputs live in a form, so typing does not rerun anything and
+        submitting reruns only this fragment, not the chat or the styling.
+        The calculation itself runs in the background job executor.
+        """
+        with st.form("horoscope_form", border=False):
+            name, birth_datetime, location, zodiac, is_valid = SidebarComponent.render_astrology_section()
+            submitted = st.form_submit_button("✨ Generate Horoscope")
+            
+        if submitted and self.handle_horoscope_generation(name, birth_datetime, location, is_valid, zodiac):
+            st.rerun()  # A full run starts the refresh timer
+            
+        job = self.get_horoscope_job()
+        if job is None:
+            return
+        if not job.done:
+            st.progress(job.progress, text="🌟 Calculating planetary positions...")
+            return
+        if st.session_state.horoscope_polling:
+            st.rerun()  # A full run stops the refresh timer and shows the result
+            
+        request = st.session_state.horoscope
+        if job.error is not None:
+            st.error(f"Error calculating horoscope: {str(job.error)}")
+        elif request.get("zodiac") == "sidereal":
+            AstrologyResultsComponent.render(
+                request["name"], request["location"], request["birth_datetime"], job.result["planets"],
+                vedic=job.result
+            )
+        else:
+            AstrologyResultsComponent.render(
+                request["name"], request["location"], request["birth_datetime"], job.result
+            )
+    
+    def get_horoscope_job(self):
+        """
+        Get this session's latest horoscope job.
+        
+        Returns:
+            Optional[Job]: The job, or None if there is none or it expired
+        """
+        request = st.session_state.get("horoscope")
+        return job_executor.get(request["job_id"]) if request else None
+    
+    def handle_horoscope_generation(self, name: str, birth_datetime: datetime, location: str, is_valid: bool,
+                                    zodiac: str = "tropical") -> bool:
         """
         Handle horoscope generation logic.
         
@@ -155,31 +262,90 @@ class RaavanAIApp:
             birth_datetime (datetime): Birth date and time
             location (str): Birth location
             is_valid (bool): Whether inputs are valid
+            zodiac (str): "tropical", or "sidereal" for a Vedic chart with dashas
+            
+        Returns:
+            bool: True if a horoscope job was submitted
         """
-        if is_valid:
-            with st.spinner("🌟 Calculating planetary positions..."):
-                try:
-                    # Calculate Julian Day
-                    julian_day = self.astrology_calculator.calculate_julian_day(birth_datetime)
-                    
-                    # Get planetary positions
-                    planets = self.astrology_calculator.get_planetary_positions(julian_day)
+        if not is_valid:
+            ErrorComponent.render_validation_error()
+            return False
                     
-                    # Display results
-                    AstrologyResultsComponent.render(name, location, birth_datetime, planets)
+        try:
+            if self.api_client is not None:
+                job_id = job_executor.submit(
+                    self.api_client.horoscope, name, birth_datetime, location, zodiac,
+                    kind="io", label="horoscope", owner=st.session_state.session_id
+                )
+            else:
+                # Ephemeris work runs in a worker process
+                job_id = job_executor.submit(
+                    calculate_vedic_horoscope if zodiac == "sidereal" else calculate_horoscope, birth_datetime,
+                    kind="cpu", label="horoscope", owner=st.session_state.session_id
+                )
+        except JobRejectedError:
+            st.warning(PersonaConfig.JOBS_BUSY_MESSAGE)
+            return False
                     
-                except Exception as e:
-                    st.error(f"Error calculating horoscope: {str(e)}")
-        else:
-            ErrorComponent.render_validation_error()
+        st.session_state.horoscope = {
+            "job_id": job_id,
+            "name": name,
+            "location": location,
+            "birth_datetime": birth_datetime,
+            "zodiac": zodiac
+        }
+        return True
     
     def render_chat_interface(self):
         """Render main chat interface"""
         # Chat area header
         ChatInterfaceComponent.render_chat_area()
         
-        # Display chat history
-        ChatHistoryComponent.render(st.session_state.history)
+        # Display chat history (last N turns only)
+        with metrics.span("render_history"):
+            visible_history = self.get_visible_history()
+            ChatHistoryComponent.render(
+                visible_history,
+                hidden_count=st.session_state.total_turns - len(visible_history)
+            )
+        st.session_state.rendered_turns = st.session_state.total_turns
+        
+        job = self.get_chat_job()
+        # The refresh timer is registered by full runs only and cleared by the next one
+        st.session_state.chat_polling = job is not None and not job.done
+        interval = JobConfig.POLL_INTERVAL if st.session_state.chat_polling else None
+        st.fragment(self.render_chat, run_every=interval)()
+    
+    def get_chat_job(self):
+        """
+        Get the job generating this session's pending answer.
+        
+        Returns:
+            Optional[Job]: The job, or None if no answer is pending, it was turned away or it expired
+        """
+        pending = st.session_state.get("pending_chat")
+        if not pending or pending["job_id"] is None:
+            return None
+        return job_executor.get(pending["job_id"])
+    
+    def render_chat(self):
+        """
+        Render the turns added since the last full run and the input box.
+        
+        Sending a message reruns only this fragment, so the history above is
+        not re-rendered and the page styling is not re-sent for every turn.
+        While an answer is being generated the fragment polls its job.
+        """
+        live_turns = st.session_state.total_turns - st.session_state.rendered_turns
+        if live_turns > len(st.session_state.history):
+            # Older live turns have left the in-memory window; redraw everything
+            st.rerun()
+        if live_turns > 0:
+            ChatHistoryComponent.render(st.session_state.history[-live_turns:])
+            
+        # An answer submitted by an earlier run, still being generated or not yet shown
+        if st.session_state.get("pending_chat"):
+            self.render_pending_answer()
         
         # Handle user input
         user_question = ChatInterfaceComponent.handle_user_input()
@@ -189,45 +355,174 @@ class RaavanAIApp:
     
     def process_user_message(self, user_question: str):
         """
-        Process user message and generate response.
+        Submit the user message for an answer and display it.
         
         Args:
             user_question (str): User's question
         """
+        if self.api_client is None and self.vector_service is None:
+            st.info("Vector database not available. Using base model without context.")
+            
+        # Clearing the chat cancels it; the clock also covers time queued on the executor
+        deadline = Deadline(DeadlineConfig.CHAT_SECONDS)
+        try:
+            if self.api_client is not None:
+                # Retrieval and generation both happen on the API server
+                job_id = job_executor.submit(
+                    self.api_client.chat, user_question,
+                    list(st.session_state.history), st.session_state.conversation, deadline=deadline,
+                    label="chat", owner=st.session_state.session_id
+                )
+            else:
+                job_id = job_executor.submit(
+                    self.generate_answer, user_question,
+                    st.session_state.conversation, list(st.session_state.history), deadline=deadline,
+                    label="chat", owner=st.session_state.session_id
+                )
+        except JobRejectedError:
+            job_id = None
+            
+        st.session_state.pending_chat = {
+            "job_id": job_id, "question": user_question, "deadline": deadline, "started": time.perf_counter()
+        }
+        self.render_pending_answer()
+    
+    def generate_answer(self, user_question: str, state: dict, turns: list,
+                        deadline: Deadline = None) -> str:
+        """
+        Retrieve context and generate an answer; runs on the job executor.
+        
+        Args:
+            user_question (str): User's question
+            state (dict): Conversation memory state of the session
+            turns (list): Recent turns, oldest first
+            deadline (Deadline): Request deadline, None for no limit
+            
+        Returns:
+            str: The answer, or an error, busy or timeout notice
+        """
+        try:
+            return self._generate_answer(user_question, state, turns, deadline)
+        except DeadlineExceeded:
+            return PersonaConfig.DEADLINE_MESSAGE
+    
+    def _generate_answer(self, user_question: str, state: dict, turns: list,
+                         deadline: Deadline = None) -> str:
+        index_version = self.vector_service.version if self.vector_service is not None else ""
+        if not turns and not state["summary"]:
+            cached = self.groq_service.cached_answer(user_question, index_version)
+            if cached is not None:
+                return cached
+                
+        started = time.perf_counter()
+        limits = adaptive_controller.limits(user_question)
+        history_messages = None
+        retrieval_question = user_question
+        if ConversationConfig.ENABLED and self.conversation is not None:
+            history_messages = self.conversation.build_history_messages(state, turns)
+            retrieval_question = self.conversation.condense_question(user_question, state, turns, deadline=deadline)
+        if deadline is not None:
+            deadline.check("condense")
+            limits = deadline.fit_limits(limits)
+            
+        # Retrieve context from vector database if available
+        context = ""
+        if self.vector_service is not None:
+            context = self.vector_service.retrieve_context(
+                retrieval_question, 
+                k=limits.k,
+                token_budget=limits.context_tokens,
+                deadline=deadline
+            )
+            
+        # Generate response using Groq API
+        answer = self.groq_service.query_llama(
+            user_question, context, history=history_messages,
+            max_tokens=limits.max_tokens, deadline=deadline, index_version=index_version
+        )
+        if not answer.startswith(("⚠", "⏳")) and not isinstance(answer, FallbackAnswer):
+            adaptive_controller.observe(time.perf_counter() - started)
+        return answer
+    
+    def render_pending_answer(self):
+        """
+        Show the pending answer job; once it has finished, store the turn and display it.
+        
+        Never waits on the job. While it runs, the chat fragment reruns every
+        POLL_INTERVAL, so the horoscope fragment keeps polling and a
+        clear-history click cancels the job right away.
+        """
+        pending = st.session_state.pending_chat
+        user_question = pending["question"]
+        
         # Display user message
         with st.chat_message("user"):
             st.markdown(user_question)
         
         # Generate and display assistant response
         with st.chat_message("assistant"):
-            with ChatInterfaceComponent.display_thinking():
-                try:
-                    # Retrieve context from vector database if available
-                    context = ""
-                    if self.vector_service is not None:
-                        context = self.vector_service.retrieve_context(
-                            user_question, 
-                            k=EmbeddingsConfig.DEFAULT_K
-                        )
-                    else:
-                        st.info("Vector database not available. Using base model without context.")
+            job = self.get_chat_job()
+            if job is not None and not job.done:
+                ChatInterfaceComponent.display_thinking()
+                if not st.session_state.chat_polling:
+                    st.rerun()  # A full run starts the refresh timer
+                return
+            if st.session_state.chat_polling:
+                st.rerun()  # A full run stops the refresh timer and shows the answer
+                    
+            try:
+                # Dropped before anything is drawn, so the turn is stored exactly once
+                del st.session_state.pending_chat
+                if pending["job_id"] is None:
+                    answer = PersonaConfig.JOBS_BUSY_MESSAGE
+                else:
+                    answer = job_executor.result(pending["job_id"], timeout=0)
+                    metrics.observe(MetricsConfig.STAGE_METRIC, time.perf_counter() - pending["started"],
+                                    stage="chat_total")
+                    
+                # Error strings, load-shedding notices and fallbacks are shown but not kept
+                if not answer.startswith(("⚠", "⏳")) and not isinstance(answer, FallbackAnswer):
+                    # Store in history, keeping only a bounded window in memory
+                    turn = self.history_store.append(
+                        st.session_state.session_id, user_question, answer
+                    )
+                    st.session_state.history.append(turn)
+                    del st.session_state.history[:-HistoryConfig.MEMORY_WINDOW]
+                    st.session_state.total_turns += 1
                     
-                    # Generate response using Groq API
-                    answer = self.groq_service.query_llama(user_question, context)
+                    if ConversationConfig.ENABLED:
+                        self.refresh_summary()
                     
-                    # Display response
+                # Display response
+                with metrics.span("render_answer"):
                     st.markdown(answer)
                     
-                    # Store in history
-                    st.session_state.history.append({
-                        "question": user_question, 
-                        "answer": answer
-                    })
+            except Exception as e:
+                error_message = f"Error generating response: {str(e)}"
+                st.error(error_message)
+                ErrorComponent.render_api_error(error_message)
                     
-                except Exception as e:
-                    error_message = f"Error generating response: {str(e)}"
-                    st.error(error_message)
-                    ErrorComponent.render_api_error(error_message)
+    def refresh_summary(self):
+        """
+        Fold turns that left the recent window into the rolling summary.
+        
+        The summary is a Groq call, so it runs on the job executor and
+        updates the session's conversation state in place when it returns.
+        In thin-client mode the server writes the summary.
+        """
+        running = st.session_state.get("summary_job")
+        job = job_executor.get(running) if running else None
+        if job is not None and not job.done:
+            return  # The next turn folds in whatever this refresh misses
+        try:
+            refresh = self.api_client.refresh_summary if self.api_client is not None \
+                else self.conversation.maybe_refresh_summary
+            st.session_state.summary_job = job_executor.submit(
+                refresh, st.session_state.conversation, list(st.session_state.history),
+                label="summary", owner=st.session_state.session_id
+            )
+        except JobRejectedError:
+            pass  # Retried after the next turn
     
     def run(self):
         """Main application entry point"""
@@ -24,6 +24,9 @@ class APIConfig:
     MAX_TOKENS = 700
     TEMPERATURE = 0.7
     
+    # Share one in-flight retrieval/LLM call among identical concurrent questions
+    COALESCE_REQUESTS = True
+    
     @classmethod
     def get_headers(cls):
         """Get API headers for Groq requests"""
@@ -32,6 +35,80 @@ class APIConfig:
             "Content-Type": "application/json"
         }
 
+# ========== RATE LIMIT CONFIGURATION ==========
+class RateLimitConfig:
+    """Shared admission control for Groq API quotas"""
+    
+    # Groq account limits (both are enforced per minute)
+    REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+    TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "30000"))
+    
+    # Waiting room
+    MAX_QUEUE_SIZE = 100
+    MAX_QUEUE_WAIT = 15  # Seconds a request may wait for quota
+    
+    # Bucket balances shared by every process on the host, as the quota is per account;
+    # empty keeps a separate budget per process
+    STATE_FILE = os.getenv("RAAVAN_RATE_LIMIT_FILE", str(DATA_DIR / "groq_quota.state"))
+    
+    # Lower values are admitted first
+    PRIORITY_INTERACTIVE = 0
+    PRIORITY_BACKGROUND = 10
+
+# ========== MODEL ROUTING CONFIGURATION ==========
+class RoutingConfig:
+    """Model tiers, latency-based routing and hedged requests"""
+    
+    ENABLED = os.getenv("RAAVAN_MODEL_ROUTING", "0") == "1"  # Opt-in: sends short questions to FAST_MODEL
+    
+    # Tiers: short factual lookups go to the fast model
+    FAST_MODEL = os.getenv("GROQ_FAST_MODEL", "llama-3.1-8b-instant")
+    QUALITY_MODEL = APIConfig.MODEL_NAME
+    SHORT_QUESTION_TOKENS = 20
+    
+    # Per-model first-token latency tracking
+    LATENCY_WINDOW = 256  # Recent samples per model
+    MIN_SAMPLES = 20  # Samples needed before latency drives decisions
+    SLOW_FIRST_TOKEN = 4.0  # p95 seconds beyond which a tier is avoided
+    
+    # Hedging: duplicate a request that has not produced a token in time
+    HEDGE_ENABLED = os.getenv("RAAVAN_HEDGE_REQUESTS", "0") == "1"  # Opt-in: hedges spend extra Groq quota
+    HEDGE_QUANTILE = 0.95
+    HEDGE_DEFAULT_DELAY = 2.0  # Seconds, until MIN_SAMPLES are collected
+    HEDGE_MIN_DELAY = 0.5
+    HEDGE_MAX_DELAY = 8.0
+    HEDGE_API_URL = os.getenv("GROQ_HEDGE_API_URL")  # Alternate endpoint; defaults to GROQ_API_URL
+
+# ========== CIRCUIT BREAKER CONFIGURATION ==========
+class CircuitBreakerConfig:
+    """Fail fast with local answers while Groq is degraded"""
+    
+    # Trip once enough recent calls fail or are slow
+    WINDOW = 20  # Most recent calls considered
+    MIN_CALLS = 5  # Calls needed in the window before tripping
+    FAILURE_RATE = 0.5
+    SLOW_CALL_SECONDS = 10.0
+    SLOW_CALL_RATE = 0.5
+    
+    # While open, one probe call is let through every OPEN_SECONDS
+    OPEN_SECONDS = 30
+    PROBE_TIMEOUT = 35  # A probe that never reports back is given up after this
+    
+    # Fallback answers
+    CACHE_SIZE = 512  # Successful answers kept for outages
+    CACHE_TTL = 24 * 3600
+    FALLBACK_SENTENCES = 4  # Sentences in an extractive answer
+
+# ========== GROQ RECORDING CONFIGURATION ==========
+class CassetteConfig:
+    """Groq traffic captured for offline replay by benchmarks/groq_stub.py"""
+    
+    RECORD_DIR = os.getenv("RAAVAN_GROQ_RECORD")  # Directory for cassettes; unset disables recording
+    
+    # Replay
+    LATENCY_SCALE = 1.0  # Multiplier on recorded latencies
+    MIN_MATCH_SCORE = 0.0  # Question similarity below which the stub answers synthetically
+
 # ========== EMBEDDINGS CONFIGURATION ==========
 class EmbeddingsConfig:
     """Configuration for embeddings and vector database"""
@@ -39,6 +116,183 @@ class EmbeddingsConfig:
     MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
     PERSIST_DIRECTORY = str(CHROMA_DB_DIR)
     DEFAULT_K = 7  # Number of documents to retrieve
+    
+    # Character splitter of prepare_data, kept for comparison and --chunker chars
+    CHUNK_SIZE = 1000
+    CHUNK_OVERLAP = 200
+    
+    # Structure-aware chunker used by the ingestion tools (estimated LLM tokens)
+    CHUNK_TOKENS = 200  # Target size
+    CHUNK_MAX_TOKENS = 250  # Hard limit when the embedding tokenizer cannot be loaded
+    CHUNK_MIN_TOKENS = 50  # Shorter section tails are merged into the chunk before
+    # Hard limit counted with the embedding tokenizer: MiniLM reads 256 word pieces
+    # including [CLS] and [SEP], and truncates the rest
+    CHUNK_MAX_WORD_PIECES = 254
+    
+    # Read-only serving mode: workers memory-map an index exported from chroma_db
+    READ_ONLY_INDEX = os.getenv("RAAVAN_READ_ONLY_INDEX", "").lower() in ("1", "true", "yes")
+    SHARED_INDEX_DIR = os.getenv("RAAVAN_SHARED_INDEX", str(PROJECT_ROOT / "shared_index"))
+    
+    # HNSW defaults; benchmarks/tune_hnsw.py writes tuned values to HNSW_PARAMS_FILE
+    HNSW_PARAMS_FILE = os.getenv("RAAVAN_HNSW_PARAMS", str(PROJECT_ROOT / "src" / "config" / "hnsw_params.json"))
+    HNSW_SPACE = "l2"
+    HNSW_M = 16
+    HNSW_CONSTRUCTION_EF = 100
+    HNSW_SEARCH_EF = 10
+    
+    # Serving snapshot (build_snapshot.py): model weights and index in one mapped file
+    SNAPSHOT_FILE = os.getenv("RAAVAN_SNAPSHOT")
+    DEFAULT_SNAPSHOT_FILE = str(PROJECT_ROOT / "raavan.snapshot")
+    
+    # Out-of-process embedding daemon; unset means each process loads its own model
+    SERVER_SOCKET = os.getenv("RAAVAN_EMBEDDING_SOCKET")
+    DEFAULT_SERVER_SOCKET = "/tmp/raavan-embeddings.sock"
+    BATCH_WINDOW_MS = 5  # Wait this long for more requests to join a batch
+    MAX_BATCH_SIZE = 64
+    CLIENT_TIMEOUT = 30
+
+# ========== ADAPTIVE LIMITS CONFIGURATION ==========
+class AdaptiveConfig:
+    """Retrieval depth and answer length traded against a latency target"""
+    
+    ENABLED = os.getenv("RAAVAN_ADAPTIVE_LIMITS", "0") == "1"  # Opt-in: off, every answer uses the defaults
+    TARGET_P95 = float(os.getenv("RAAVAN_TARGET_P95", "8.0"))  # End-to-end seconds per chat answer
+    
+    # Control loop
+    LATENCY_WINDOW = 200  # Recent end-to-end samples
+    MIN_SAMPLES = 20  # Samples under the current limits needed before adjusting
+    ADJUST_INTERVAL = 10  # Seconds between decisions
+    QUEUE_HIGH = 5  # Rate-limiter queue depth treated as overload
+    HEADROOM = 0.7  # Restore richer answers once p95 is below this share of the target
+    DECREASE_STEP = 0.25  # Back off quickly...
+    INCREASE_STEP = 0.1  # ...and restore slowly
+    HISTORY_SIZE = 50  # Adjustments kept for /stats
+    
+    # Bounds; the upper ones are the unadapted defaults
+    MIN_K = 3
+    MAX_K = EmbeddingsConfig.DEFAULT_K
+    MIN_CONTEXT_TOKENS = 600
+    MAX_CONTEXT_TOKENS = 2000
+    MIN_MAX_TOKENS = 250
+    MAX_MAX_TOKENS = APIConfig.MAX_TOKENS
+    SHORT_ANSWER_TOKENS = 350  # Cap for short factual questions
+
+# ========== DEADLINE CONFIGURATION ==========
+class DeadlineConfig:
+    """End-to-end time budget of a chat request"""
+    
+    CHAT_SECONDS = float(os.getenv("RAAVAN_CHAT_DEADLINE", "20"))  # Clients may ask for less, never more
+    MIN_CLIENT_SECONDS = 1.0
+    
+    # With less time left than this, retrieval drops to the adaptive lower bounds
+    LOW_BUDGET_SECONDS = 8.0
+    
+    # Groq speed assumed when fitting max_tokens to the time left
+    FIRST_TOKEN_SECONDS = 1.0
+    TOKENS_PER_SECOND = 150
+    MIN_ANSWER_TOKENS = 64
+    
+    POLL_INTERVAL = 0.1  # Seconds between checks while waiting on a coalesced call
+
+# ========== SHARD CONFIGURATION ==========
+class ShardConfig:
+    """Multi-collection corpus searched in parallel"""
+    
+    # JSON manifest listing the shards; without it the single chroma_db collection is used
+    MANIFEST_FILE = os.getenv("RAAVAN_SHARDS", str(PROJECT_ROOT / "shards" / "shards.json"))
+    
+    SEARCH_WORKERS = int(os.getenv("RAAVAN_SHARD_WORKERS", "8"))
+    SHARD_TIMEOUT = float(os.getenv("RAAVAN_SHARD_TIMEOUT", "1.5"))  # Slower shards are left out
+    RELOAD_INTERVAL = 5  # Seconds between manifest checks
+
+# ========== INDEX VERSION CONFIGURATION ==========
+class IndexVersionConfig:
+    """Blue/green index versions behind an atomic CURRENT pointer"""
+    
+    # publish_index.py writes versions here; without a CURRENT file chroma_db is used
+    VERSIONS_DIR = os.getenv("RAAVAN_INDEX_VERSIONS", str(PROJECT_ROOT / "indexes"))
+    POINTER_FILE = "CURRENT"
+    
+    POLL_INTERVAL = 5  # Seconds between pointer checks in serving processes
+    KEEP_VERSIONS = 3  # Newest versions kept by garbage collection, besides the current one
+    
+    # Searched on a new version before traffic is switched to it
+    WARMUP_QUERIES = [
+        "Who is Raavan?",
+        "Why did Raavan abduct Sita?",
+        "What happened in Lanka?"
+    ]
+
+# ========== SERVER CONFIGURATION ==========
+class ServerConfig:
+    """Headless HTTP API server settings"""
+    
+    HOST = os.getenv("RAAVAN_HOST", "0.0.0.0")
+    PORT = int(os.getenv("RAAVAN_PORT", "8080"))
+    PROCESSES = int(os.getenv("RAAVAN_PROCESSES", "1"))
+    
+    # Bounded executor for CPU-bound embedding and ephemeris work
+    MAX_WORKERS = int(os.getenv("RAAVAN_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+    MAX_PENDING = int(os.getenv("RAAVAN_MAX_PENDING", "64"))  # Queued jobs before 503
+    IO_WORKERS = int(os.getenv("RAAVAN_IO_WORKERS", "32"))  # Concurrent Groq calls
+    MAX_RETRIEVE_K = 50  # Larger "k" values on /retrieve are clamped to this
+    
+    # Streamlit thin-client mode: set to e.g. http://localhost:8080
+    API_BASE_URL = os.getenv("RAAVAN_API_URL")
+    CLIENT_TIMEOUT = 60
+
+# ========== CACHE WARM-UP CONFIGURATION ==========
+class WarmupConfig:
+    """Deploy-time warm-up of the answer, query and retrieval caches"""
+    
+    ENABLED = os.getenv("RAAVAN_WARMUP", "1") == "1"
+    # Text (one question per line), JSONL ({"question": ...}) or the chat history database
+    QUESTION_LOG = os.getenv("RAAVAN_WARMUP_LOG", str(DATA_DIR / "chat_history.sqlite3"))
+    LOOKBACK_DAYS = 30  # Chat history older than this is ignored
+    TOP_N = int(os.getenv("RAAVAN_WARMUP_TOP_N", "50"))
+    MIN_COUNT = 2  # Questions asked once are not worth a Groq call
+    
+    # Warm-up Groq calls queue behind interactive ones and are paced on top of that
+    CONCURRENCY = 4
+    REQUESTS_PER_SECOND = 2.0
+    TIMEOUT = float(os.getenv("RAAVAN_WARMUP_TIMEOUT", "120"))  # The server reports ready after this regardless
+    
+    # Answers shared by server processes and reused by restarts
+    ANSWERS_FILE = os.getenv("RAAVAN_WARMUP_FILE", str(DATA_DIR / "warm_answers.json"))
+    
+    # Cached answers younger than this are served without retrieval or Groq
+    SERVE_CACHED_ANSWERS = os.getenv("RAAVAN_SERVE_CACHED_ANSWERS", "1") == "1"
+    ANSWER_MAX_AGE = 6 * 3600
+    
+    QUERY_CACHE_SIZE = 2048  # Query embeddings
+    QUERY_CACHE_TTL = 24 * 3600
+    RETRIEVAL_CACHE_SIZE = 1024  # Assembled contexts, keyed by index version
+    RETRIEVAL_CACHE_TTL = 900
+
+# ========== BACKGROUND JOB CONFIGURATION ==========
+class JobConfig:
+    """Shared executor for horoscope and chat work in the Streamlit app"""
+    
+    IO_WORKERS = int(os.getenv("RAAVAN_JOB_IO_WORKERS", "16"))  # Groq and thin-client calls
+    CPU_WORKERS = int(os.getenv("RAAVAN_JOB_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))  # Ephemeris processes
+    MAX_PENDING = int(os.getenv("RAAVAN_JOB_MAX_PENDING", "64"))  # Queued jobs per pool before rejecting
+    MAX_STORED = 256  # Finished jobs kept for polling
+    RESULT_TTL = 600  # Seconds a finished job stays available
+    BATCH_CHUNK_SIZE = 32  # Items per pool task in batch jobs
+    POLL_INTERVAL = 0.5  # Seconds between progress refreshes in the UI
+    START_METHOD = "spawn"  # Forking the threaded Streamlit process is unsafe
+
+# ========== METRICS CONFIGURATION ==========
+class MetricsConfig:
+    """Latency tracing and metrics export"""
+    
+    STAGE_METRIC = "raavan_stage_duration_seconds"
+    ERRORS_METRIC = "raavan_stage_errors_total"
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    QUANTILE_WINDOW = 2048  # Recent samples per series used for p50/p95/p99
+    
+    # Sidebar panel with per-stage percentiles
+    ADMIN_PANEL = os.getenv("RAAVAN_ADMIN_PANEL", "").lower() in ("1", "true", "yes")
 
 # ========== UI CONFIGURATION ==========
 class UIConfig:
@@ -55,6 +309,43 @@ class UIConfig:
     DEFAULT_BIRTH_DAY = 1
     DEFAULT_BIRTH_TIME = "12:00"
 
+# ========== STATIC ASSET CONFIGURATION ==========
+class AssetConfig:
+    """Build output of build_assets.py: minified CSS and local fonts"""
+    
+    STATIC_DIR = str(PROJECT_ROOT / "static")  # Served by Streamlit under app/static
+    STATIC_URL = "app/static"
+    MANIFEST_FILE = str(PROJECT_ROOT / "static" / "assets.json")  # Written by build_assets.py
+    
+    # Fetched at build time only; a local CSS file with relative font URLs works too
+    FONT_CSS = "https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap"
+
+# ========== CHAT HISTORY CONFIGURATION ==========
+class HistoryConfig:
+    """Chat history persistence and rendering limits"""
+    
+    DB_PATH = os.getenv("RAAVAN_HISTORY_DB", str(DATA_DIR / "chat_history.sqlite3"))
+    MEMORY_WINDOW = 20  # Turns kept in session state
+    RENDER_WINDOW = 10  # Turns rendered by default
+    PAGE_SIZE = 10  # Older turns loaded per click
+
+# ========== CONVERSATION MEMORY CONFIGURATION ==========
+class ConversationConfig:
+    """Multi-turn memory kept within a fixed prompt budget"""
+    
+    ENABLED = True
+    RECENT_TURNS = 3  # Verbatim turns sent with each question
+    HISTORY_TOKEN_BUDGET = 800  # Summary plus recent turns
+    MAX_ANSWER_TOKENS = 150  # Older answers are truncated to this
+    
+    # Rolling summary refreshed once this many turns leave the recent window;
+    # they are sent verbatim until then, so keep it small
+    SUMMARY_EVERY = 2
+    SUMMARY_MAX_TOKENS = 200
+    
+    # Standalone-question rewrite used for retrieval
+    CONDENSE_MAX_TOKENS = 64
+
 # ========== ASTROLOGY CONFIGURATION ==========
 class AstrologyConfig:
     """Astrology calculation settings"""
@@ -67,8 +358,29 @@ class AstrologyConfig:
     PLANET_EMOJIS = {
         "Sun": "☀️", "Moon": "🌙", "Mars": "♂️", "Mercury": "☿️",
         "Jupiter": "♃", "Venus": "♀️", "Saturn": "♄", 
-        "Uranus": "♅", "Neptune": "♆", "Pluto": "♇"
+        "Uranus": "♅", "Neptune": "♆", "Pluto": "♇",
+        "Rahu": "☊", "Ketu": "☋"
     }
+    
+    # Vedic output: Lahiri-sidereal signs, nakshatras and Vimshottari dashas
+    ZODIAC = os.getenv("RAAVAN_ZODIAC", "tropical")  # Preselected in the form: "tropical" or "sidereal"
+    AYANAMSA = "LAHIRI"  # Name of a swisseph SIDM_* mode
+    
+    NAKSHATRAS = [
+        'Ashwini', 'Bharani', 'Krittika', 'Rohini', 'Mrigashira', 'Ardra', 'Punarvasu',
+        'Pushya', 'Ashlesha', 'Magha', 'Purva Phalguni', 'Uttara Phalguni', 'Hasta', 'Chitra',
+        'Swati', 'Vishakha', 'Anuradha', 'Jyeshtha', 'Mula', 'Purva Ashadha', 'Uttara Ashadha',
+        'Shravana', 'Dhanishta', 'Shatabhisha', 'Purva Bhadrapada', 'Uttara Bhadrapada', 'Revati'
+    ]
+    
+    # Vimshottari order from Ashwini's lord, and years of each mahadasha (120 in all)
+    DASHA_LORDS = ['Ketu', 'Venus', 'Sun', 'Moon', 'Mars', 'Rahu', 'Jupiter', 'Saturn', 'Mercury']
+    DASHA_YEARS = [7, 20, 6, 10, 7, 18, 16, 19, 17]
+    DASHA_YEAR_DAYS = 365.25
+    
+    # Timelines are cached per natal Moon longitude, rounded to this many degrees
+    DASHA_LONGITUDE_STEP = 1e-4  # Shifts period boundaries by under two hours
+    DASHA_CACHE_SIZE = 4096
 
 # ========== RAAVAN PERSONA CONFIGURATION ==========
 class PersonaConfig:
@@ -98,6 +410,29 @@ class PersonaConfig:
     
     DEFAULT_CHAT_PLACEHOLDER = "Ask Raavan anything about the Ramayan... 🗡️"
     THINKING_MESSAGE = "Raavan is contemplating your question..."
+    CONDENSE_PROMPT = (
+        "Rewrite the user's follow-up question as a single standalone question about the Ramayan, "
+        "resolving pronouns and references using the conversation. "
+        "Keep the user's language. Reply with the question only."
+    )
+    
+    SUMMARY_PROMPT = (
+        "Update the running summary of a conversation between a user and Raavan about the Ramayan. "
+        "Merge the new turns into the current summary in at most five sentences, "
+        "keeping names, events and what the user is interested in. Reply with the summary only."
+    )
+    
+    BUSY_MESSAGE = (
+        "⏳ My court is crowded with petitioners. You are number {position} in line; "
+        "ask me again in about {wait} seconds."
+    )
+    
+    JOBS_BUSY_MESSAGE = "⏳ All my scribes are busy with other petitions. Ask me again in a moment."
+    DEADLINE_MESSAGE = "⏳ The scrolls took too long to consult. Ask me again in a moment."
+    
+    FALLBACK_PREFIX = (
+        "The messengers of the heavens are slow today, so hear what the sacred texts themselves say:"
+    )
 
 # ========== ENVIRONMENT SETTINGS ==========
 def load_environment():
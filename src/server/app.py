@@ -0,0 +1,614 @@
+"""
+Headless HTTP API for Raavan AI.
+Serves chat, retrieval and horoscope endpoints over asyncio so that the
+Streamlit UI, the mobile app and load balancers can share one backend.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+from aiohttp import web
+
+from config.settings import EmbeddingsConfig, ServerConfig, ConversationConfig, WarmupConfig, DeadlineConfig
+from api.services import GroqAPIService, VectorDatabaseService, create_embeddings, create_vectordb
+from api.coalescing import get_coalescing_stats
+from api.deadline import Deadline, DeadlineExceeded
+from api.rate_limiter import groq_rate_limiter
+from api.routing import model_router
+from api.circuit_breaker import groq_breaker
+from api.cache import answer_cache, query_cache, retrieval_cache
+from api.warmup import run_warmup
+from api.adaptive import adaptive_controller
+from api.conversation import ConversationMemory
+from api.fallback import FallbackAnswer
+from utils.metrics import metrics
+from utils.helpers import AstrologyCalculator, calculate_vedic_horoscope
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+
+class ServerBusyError(Exception):
+    """Raised when a worker pool has no room for more work"""
+
+
+class BoundedExecutor:
+    """Thread pool that rejects work once its queue is full"""
+    
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        """
+        Initialize the pool.
+        
+        Args:
+            name (str): Thread name prefix
+            max_workers (int): Number of worker threads
+            max_pending (int): Jobs allowed to wait for a free worker
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.capacity = max_workers + max_pending
+        self.in_flight = 0  # Only touched from the event loop thread
+    
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in the pool.
+        
+        Args:
+            fn (Callable): Function to run
+            
+        Returns:
+            Any: The function's return value
+            
+        Raises:
+            ServerBusyError: If the pool is saturated
+        """
+        if self.in_flight >= self.capacity:
+            raise ServerBusyError("Server is busy, please retry shortly")
+            
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+    
+    def shutdown(self):
+        """Stop accepting work and release the threads"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RaavanAPIServer:
+    """asyncio HTTP server wrapping the Raavan AI services"""
+    
+    def __init__(self):
+        """Initialize executors; services load in the background on startup"""
+        # CPU-bound embedding and ephemeris work
+        self.cpu_pool = BoundedExecutor(
+            "raavan-cpu", ServerConfig.MAX_WORKERS, ServerConfig.MAX_PENDING
+        )
+        # Blocking Groq calls spend their time waiting on the network
+        self.io_pool = BoundedExecutor(
+            "raavan-io", ServerConfig.IO_WORKERS, ServerConfig.MAX_PENDING
+        )
+        
+        self.groq_service = None
+        self.conversation = None
+        self.vector_service = None
+        self.astrology_calculator = None
+        self.ready = False
+        self.init_error = None
+        self.warmup = None
+    
+    def initialize_services(self):
+        """Load the embedding model and open the vector database (blocking)"""
+        self.groq_service = GroqAPIService()
+        self.astrology_calculator = AstrologyCalculator()
+        self.conversation = ConversationMemory(self.groq_service)
+        
+        try:
+            embedding = create_embeddings()
+            self.vector_service = VectorDatabaseService(create_vectordb(embedding))
+        except Exception as e:
+            # Serve without context rather than not at all, like the Streamlit app
+            self.init_error = str(e)
+            self.vector_service = None
+    
+    async def on_startup(self, app: web.Application):
+        """Start loading services without blocking the liveness probe"""
+        app["init_task"] = asyncio.create_task(self._initialize())
+    
+    async def _initialize(self):
+        with metrics.span("initialization"):
+            await self.cpu_pool.run(self.initialize_services)
+        if WarmupConfig.ENABLED:
+            # The most common questions are answered before traffic is let in
+            self.warmup = {"status": "running"}
+            try:
+                self.warmup = await self.cpu_pool.run(run_warmup, self.vector_service, self.groq_service)
+            except Exception as e:
+                self.warmup = {"status": "failed", "error": str(e)}
+        self.ready = True
+    
+    async def on_cleanup(self, app: web.Application):
+        """Release worker pools"""
+        self.cpu_pool.shutdown()
+        self.io_pool.shutdown()
+        
+    # ========== HELPERS ==========
+    
+    @staticmethod
+    def error_response(message: str, status: int, **headers) -> web.Response:
+        """Build a JSON error response"""
+        return web.json_response({"error": message}, status=status, headers=headers or None)
+    
+    @staticmethod
+    async def read_json(request: web.Request) -> Dict[str, Any]:
+        """
+        Parse the request body as a JSON object.
+        
+        Raises:
+            web.HTTPBadRequest: If the body is not a JSON object
+        """
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "Body must be JSON"}),
+                                     content_type="application/json")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "Body must be a JSON object"}),
+                                     content_type="application/json")
+        return body
+    
+    @staticmethod
+    def require_question(body: Dict[str, Any]) -> str:
+        """Extract a non-empty question from the request body"""
+        question = body.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise web.HTTPBadRequest(text=json.dumps({"error": "'question' is required"}),
+                                     content_type="application/json")
+        return question.strip()
+    
+    @staticmethod
+    def request_deadline(body: Dict[str, Any]) -> Deadline:
+        """
+        Start the deadline of a chat request.
+        
+        The client may ask for a shorter budget with "timeout" in seconds;
+        it is clamped to [MIN_CLIENT_SECONDS, CHAT_SECONDS].
+        
+        Raises:
+            web.HTTPBadRequest: If timeout is not a number
+        """
+        timeout = body.get("timeout")
+        if timeout is None:
+            return Deadline(DeadlineConfig.CHAT_SECONDS)
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "'timeout' must be a number of seconds"}),
+                                     content_type="application/json")
+        return Deadline(min(max(float(timeout), DeadlineConfig.MIN_CLIENT_SECONDS), DeadlineConfig.CHAT_SECONDS))
+    
+    @staticmethod
+    def read_conversation(body: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Read the client's turns and rolling summary.
+        
+        Malformed turns are dropped. Turns without a usable id count as
+        summarized, so only the last RECENT_TURNS of them are kept.
+        
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, Any]]: Turns, oldest first, and conversation state
+        """
+        def turn_id(value: Any) -> int:
+            return value if isinstance(value, int) and not isinstance(value, bool) else 0
+            
+        turns = [
+            {"id": turn_id(turn.get("id")), "question": turn["question"], "answer": turn["answer"]}
+            for turn in body.get("history") or []
+            if isinstance(turn, dict) and isinstance(turn.get("question"), str)
+            and isinstance(turn.get("answer"), str)
+        ]
+        state = {"summary": str(body.get("summary") or ""), "summarized_id": turn_id(body.get("summarized_id"))}
+        return turns, state
+    
+    @staticmethod
+    def request_k(body: Dict[str, Any]) -> int:
+        """
+        Read the number of documents to retrieve.
+        
+        Defaults to DEFAULT_K and is clamped to MAX_RETRIEVE_K.
+        
+        Raises:
+            web.HTTPBadRequest: If k is not a positive integer
+        """
+        k = body.get("k", EmbeddingsConfig.DEFAULT_K)
+        if isinstance(k, bool) or not isinstance(k, int) or k <= 0:
+            raise web.HTTPBadRequest(text=json.dumps({"error": "'k' must be a positive integer"}),
+                                     content_type="application/json")
+        return min(k, ServerConfig.MAX_RETRIEVE_K)
+    
+    async def retrieve(self, question: str, k: int, filters: Dict[str, Any] = None,
+                       token_budget: int = None, deadline: Deadline = None) -> str:
+        """Retrieve context on the CPU pool, or nothing if the database is down"""
+        if self.vector_service is None:
+            return ""
+        return await self.cpu_pool.run(
+            self.vector_service.retrieve_context, question, k=k, filters=filters, token_budget=token_budget,
+            deadline=deadline
+        )
+    
+    async def stream_tokens(self, question: str, context: str,
+                            history: List[Dict[str, str]] = None,
+                            max_tokens: int = None, deadline: Deadline = None,
+                            index_version: str = "") -> AsyncIterator[str]:
+        """
+        Bridge the blocking Groq token stream onto the event loop.
+        
+        Stops the upstream request when the consumer goes away or the
+        deadline passes.
+        
+        Args:
+            question (str): User's question
+            context (str): Retrieved context
+            history (List[Dict[str, str]]): Prior conversation messages
+            max_tokens (int): Completion limit
+            deadline (Deadline): Request deadline, None for no limit
+            index_version (str): Version of the index the context came from
+            
+        Yields:
+            str: Content deltas
+            
+        Raises:
+            DeadlineExceeded: If the deadline passes before the stream ends
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+        
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                cancelled.set()  # Event loop already closed
+        
+        def produce():
+            tokens = self.groq_service.stream_llama(question, context, history=history, max_tokens=max_tokens,
+                                                    deadline=deadline, index_version=index_version)
+            try:
+                for token in tokens:
+                    if cancelled.is_set():
+                        break
+                    put(token)
+            except DeadlineExceeded as e:
+                put(e)
+            finally:
+                tokens.close()
+                put(done)
+                
+        producer = asyncio.ensure_future(self.io_pool.run(produce))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                finished, _ = await asyncio.wait(
+                    {getter, producer}, return_when=asyncio.FIRST_COMPLETED,
+                    timeout=deadline.remaining() if deadline is not None else None
+                )
+                if not finished:
+                    getter.cancel()
+                    raise deadline.exceeded("llm_stream")
+                if getter not in finished:
+                    getter.cancel()
+                    producer.result()  # Surface ServerBusyError and friends
+                    # Producer ended; drain whatever it queued before exiting
+                    item = await queue.get()
+                else:
+                    item = getter.result()
+                if item is done:
+                    break
+                if isinstance(item, DeadlineExceeded):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            if deadline is not None:
+                deadline.cancel()  # Closes the upstream connection if the producer is still reading
+                
+    # ========== PROBES ==========
+    
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """Liveness probe: the event loop is responsive"""
+        return web.json_response({"status": "ok"})
+    
+    async def handle_ready(self, request: web.Request) -> web.Response:
+        """Readiness probe: services are loaded and the pools have room"""
+        body = {
+            "status": "ready" if self.ready else "starting",
+            "vector_database": self.vector_service is not None,
+            "cpu_in_flight": self.cpu_pool.in_flight,
+            "io_in_flight": self.io_pool.in_flight
+        }
+        if self.warmup is not None:
+            body["warmup"] = self.warmup
+        if self.init_error:
+            body["init_error"] = self.init_error
+        return web.json_response(body, status=200 if self.ready else 503)
+    
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Prometheus exposition, or JSON with ?format=json"""
+        if request.query.get("format") == "json":
+            return web.Response(text=metrics.to_json(), content_type="application/json")
+        return web.Response(
+            body=metrics.to_prometheus().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
+    
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """Operational counters, including how many calls were coalesced"""
+        return web.json_response({
+            "coalescing": get_coalescing_stats(),
+            "rate_limiter": groq_rate_limiter.get_stats(),
+            "router": model_router.get_stats(),
+            "circuit_breaker": groq_breaker.get_stats(),
+            "answer_cache": answer_cache.get_stats(),
+            "query_cache": query_cache.get_stats(),
+            "retrieval_cache": retrieval_cache.get_stats(),
+            "adaptive": adaptive_controller.get_stats()
+        })
+        
+    # ========== ENDPOINTS ==========
+    
+    async def handle_retrieve(self, request: web.Request) -> web.Response:
+        """POST /retrieve {"question": str, "k": int, "filters": {...}}"""
+        body = await self.read_json(request)
+        question = self.require_question(body)
+        k = self.request_k(body)
+        filters = body.get("filters")
+        if filters is not None and not isinstance(filters, dict):
+            return self.error_response("'filters' must be an object", 400)
+            
+        if self.vector_service is None:
+            return self.error_response("Vector database not available", 503)
+            
+        try:
+            context = await self.retrieve(question, k, filters)
+        except ServerBusyError as e:
+            return self.error_response(str(e), 503, **{"Retry-After": "1"})
+        return web.json_response({"question": question, "k": k, "context": context})
+    
+    async def handle_chat(self, request: web.Request) -> web.StreamResponse:
+        """
+        POST /chat {"question": str, "stream": bool, "history": [...], "summary": str,
+        "summarized_id": int, "timeout": float}
+        
+        history holds earlier {"id", "question", "answer"} turns and summary
+        the client's rolling summary, covering turns up to summarized_id; all
+        are optional. Streams SSE when asked.
+        "fallback" (in the response, or the SSE done event) is true when Groq
+        was unavailable and the answer was made locally; clients should not
+        keep such answers as conversation turns.
+        timeout shortens the request's deadline; work stops once it passes
+        or the client disconnects.
+        """
+        body = await self.read_json(request)
+        question = self.require_question(body)
+        deadline = self.request_deadline(body)
+        stream = bool(body.get("stream")) or "text/event-stream" in request.headers.get("Accept", "")
+        turns, state = self.read_conversation(body)
+        started = time.perf_counter()
+        limits = adaptive_controller.limits(question)
+        index_version = self.vector_service.version if self.vector_service is not None else ""
+        
+        try:
+            history = None
+            retrieval_question = question
+            if ConversationConfig.ENABLED and (turns or state["summary"]):
+                history = self.conversation.build_history_messages(state, turns)
+                retrieval_question = await self.io_pool.run(
+                    self.conversation.condense_question, question, state, turns, deadline=deadline
+                )
+                deadline.check("condense")
+            else:
+                cached = self.groq_service.cached_answer(question, index_version)
+                if cached is not None:
+                    return await self.send_answer(request, question, cached, stream)
+                    
+            limits = deadline.fit_limits(limits)
+            context = await self.retrieve(retrieval_question, limits.k, token_budget=limits.context_tokens,
+                                          deadline=deadline)
+            if not stream:
+                answer = await self.io_pool.run(
+                    self.groq_service.query_llama, question, context, history=history,
+                    max_tokens=limits.max_tokens, deadline=deadline, index_version=index_version
+                )
+                if not answer.startswith(("⚠", "⏳")) and not isinstance(answer, FallbackAnswer):
+                    adaptive_controller.observe(time.perf_counter() - started)
+                return web.json_response(
+                    {"question": question, "answer": answer, "fallback": isinstance(answer, FallbackAnswer)}
+                )
+        except ServerBusyError as e:
+            return self.error_response(str(e), 503, **{"Retry-After": "1"})
+        except DeadlineExceeded as e:
+            return self.error_response(str(e), 504)
+        except asyncio.CancelledError:
+            deadline.cancel()  # Client went away; stop the work still running on the pools
+            raise
+            
+        response = web.StreamResponse(headers=SSE_HEADERS)
+        await response.prepare(request)
+        
+        tokens = self.stream_tokens(question, context, history, limits.max_tokens, deadline, index_version)
+        answered = None
+        fallback = False
+        try:
+            async for token in tokens:
+                if answered is None:
+                    fallback = isinstance(token, FallbackAnswer)
+                    answered = not token.startswith(("⚠", "⏳")) and not fallback
+                await response.write(f"data: {json.dumps({'token': token})}\n\n".encode("utf-8"))
+            await response.write(f"event: done\ndata: {json.dumps({'fallback': fallback})}\n\n".encode("utf-8"))
+            if answered:
+                adaptive_controller.observe(time.perf_counter() - started)
+        except (ServerBusyError, DeadlineExceeded) as e:
+            await response.write(f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n".encode("utf-8"))
+        finally:
+            # Stops the upstream Groq request if the client went away mid-stream
+            await tokens.aclose()
+            
+        await response.write_eof()
+        return response
+    
+    async def send_answer(self, request: web.Request, question: str, answer: str,
+                          stream: bool) -> web.StreamResponse:
+        """Send a finished answer as JSON, or as a one-token SSE stream"""
+        if not stream:
+            return web.json_response({"question": question, "answer": answer, "fallback": False})
+        response = web.StreamResponse(headers=SSE_HEADERS)
+        await response.prepare(request)
+        await response.write(f"data: {json.dumps({'token': answer})}\n\n".encode("utf-8"))
+        await response.write(b"event: done\ndata: {\"fallback\": false}\n\n")
+        await response.write_eof()
+        return response
+    
+    async def handle_summary(self, request: web.Request) -> web.Response:
+        """
+        POST /summary {"history": [...], "summary": str, "summarized_id": int}
+        
+        Folds turns that left the recent window into the rolling summary, as
+        /chat only reads the summary it is sent. Returns the summary and
+        summarized_id to send with the next /chat, changed only when enough
+        turns had accumulated.
+        """
+        body = await self.read_json(request)
+        turns, state = self.read_conversation(body)
+        refreshed = False
+        if ConversationConfig.ENABLED:
+            try:
+                refreshed = await self.io_pool.run(self.conversation.maybe_refresh_summary, state, turns)
+            except ServerBusyError as e:
+                return self.error_response(str(e), 503, **{"Retry-After": "1"})
+        return web.json_response({**state, "refreshed": refreshed})
+    
+    async def handle_horoscope(self, request: web.Request) -> web.Response:
+        """
+        POST /horoscope {"name": str, "birth_datetime": ISO-8601, "location": str,
+        "zodiac": "tropical" | "sidereal", "at": ISO-8601}
+        
+        A sidereal request adds a "vedic" key with the Moon's nakshatra and
+        the dasha timeline; "at" picks the date of its current period.
+        """
+        body = await self.read_json(request)
+        try:
+            birth_datetime = datetime.fromisoformat(body["birth_datetime"])
+            at = datetime.fromisoformat(body["at"]) if body.get("at") else None
+        except (KeyError, TypeError, ValueError):
+            return self.error_response("'birth_datetime' and 'at' must be ISO-8601 strings", 400)
+        zodiac = body.get("zodiac", "tropical")
+        if zodiac not in ("tropical", "sidereal"):
+            return self.error_response("'zodiac' must be 'tropical' or 'sidereal'", 400)
+        
+        def calculate():
+            if zodiac == "sidereal":
+                return calculate_vedic_horoscope(birth_datetime, at)
+            julian_day = self.astrology_calculator.calculate_julian_day(birth_datetime)
+            return {"planets": self.astrology_calculator.get_planetary_positions(julian_day)}
+            
+        try:
+            chart = await self.cpu_pool.run(calculate)
+        except ServerBusyError as e:
+            return self.error_response(str(e), 503, **{"Retry-After": "1"})
+        except Exception as e:
+            logger.exception("Horoscope calculation failed for %s", birth_datetime.isoformat())
+            return self.error_response(f"Error calculating planetary positions: {e}", 500)
+            
+        if not chart.get("planets"):
+            return self.error_response("Error calculating planetary positions", 500)
+            
+        result = {
+            "name": body.get("name", ""),
+            "location": body.get("location", ""),
+            "birth_datetime": birth_datetime.isoformat(),
+            "zodiac": zodiac,
+            "planets": chart.pop("planets")
+        }
+        if zodiac == "sidereal":
+            result["vedic"] = chart
+        return web.json_response(result)
+        
+    # ========== APPLICATION ==========
+    
+    @web.middleware
+    async def readiness_middleware(self, request: web.Request, handler):
+        """Reject work until services are loaded"""
+        if not self.ready and request.path not in ("/healthz", "/readyz", "/stats", "/metrics"):
+            return self.error_response("Service is starting", 503, **{"Retry-After": "5"})
+        return await handler(request)
+    
+    def build_app(self) -> web.Application:
+        """
+        Build the aiohttp application.
+        
+        Returns:
+            web.Application: Configured application
+        """
+        app = web.Application(middlewares=[self.readiness_middleware])
+        app.router.add_get("/healthz", self.handle_health)
+        app.router.add_get("/readyz", self.handle_ready)
+        app.router.add_get("/stats", self.handle_stats)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_post("/retrieve", self.handle_retrieve)
+        app.router.add_post("/chat", self.handle_chat)
+        app.router.add_post("/summary", self.handle_summary)
+        app.router.add_post("/horoscope", self.handle_horoscope)
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+
+def create_server_app() -> web.Application:
+    """
+    Factory function to create the HTTP application.
+    
+    Returns:
+        web.Application: Application instance
+    """
+    return RaavanAPIServer().build_app()
+
+
+def _serve(host: str, port: int, reuse_port: bool):
+    web.run_app(create_server_app(), host=host, port=port, reuse_port=reuse_port)
+
+
+def run_server(host: str = ServerConfig.HOST, port: int = ServerConfig.PORT,
+               processes: int = ServerConfig.PROCESSES):
+    """
+    Run the API server, optionally as several processes sharing one port.
+    
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind
+        processes (int): Number of server processes (SO_REUSEPORT)
+    """
+    if processes <= 1:
+        _serve(host, port, reuse_port=False)
+        return
+        
+    workers = [
+        multiprocessing.Process(target=_serve, args=(host, port, True), daemon=False)
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
@@ -0,0 +1,149 @@
+"""
+Static asset pipeline for the Streamlit app.
+Builds a minified, content-hashed stylesheet with locally bundled Inter
+fonts into the static directory that Streamlit serves, and gives the app
+the tag that loads the stylesheet.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from config.settings import AssetConfig
+from styles.main import get_custom_css
+
+# Google Fonts only serves woff2 to browsers it recognizes
+FONT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+
+def minify_css(css: str) -> str:
+    """
+    Minify CSS by removing comments and redundant whitespace.
+    
+    Args:
+        css (str): Stylesheet source
+        
+    Returns:
+        str: Equivalent stylesheet without comments, indentation or final semicolons
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def content_hash(data: bytes) -> str:
+    """Short hex digest used in file names so they can be cached forever"""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def stylesheet_source() -> str:
+    """The app stylesheet without its <style> wrapper"""
+    return re.sub(r"</?style>", "", get_custom_css())
+
+
+def _fetch(location: str) -> bytes:
+    """Read a URL or a local file"""
+    if location.startswith(("http://", "https://")):
+        import requests
+        response = requests.get(location, headers={"User-Agent": FONT_USER_AGENT}, timeout=30)
+        response.raise_for_status()
+        return response.content
+    return Path(location).read_bytes()
+
+
+def bundle_fonts(font_css: str, static_dir: Path) -> Tuple[str, List[str]]:
+    """
+    Download the fonts a @font-face stylesheet refers to.
+    
+    Args:
+        font_css (str): URL or path of a stylesheet with @font-face rules
+        static_dir (Path): Static directory; fonts go to its fonts/ folder
+        
+    Returns:
+        Tuple[str, List[str]]: @font-face rules pointing at the local copies, and the font paths
+    """
+    css = _fetch(font_css).decode("utf-8")
+    base = font_css if font_css.startswith(("http://", "https://")) else str(Path(font_css).resolve())
+    fonts_dir = static_dir / "fonts"
+    fonts_dir.mkdir(parents=True, exist_ok=True)
+    
+    written = {}
+    
+    def localize(match: re.Match) -> str:
+        url = match.group(1).strip("'\"")
+        if url.startswith("data:"):
+            return match.group(0)
+        source = urljoin(base, url) if "://" in base else str(Path(base).parent / url)
+        if source not in written:
+            data = _fetch(source)
+            suffix = Path(url.split("?")[0]).suffix or ".woff2"
+            name = f"fonts/{content_hash(data)}{suffix}"
+            (static_dir / name).write_bytes(data)
+            written[source] = name
+        # Relative to the stylesheet in css/
+        return f"url(../{written[source]})"
+        
+    return re.sub(r"url\(([^)]+)\)", localize, css), sorted(written.values())
+
+
+def build_assets(static_dir: str = AssetConfig.STATIC_DIR,
+                 font_css: Optional[str] = AssetConfig.FONT_CSS) -> Dict[str, Any]:
+    """
+    Build the stylesheet and fonts and write the asset manifest.
+    
+    Args:
+        static_dir (str): Output directory served by Streamlit
+        font_css (Optional[str]): @font-face stylesheet to bundle, None for system fonts
+        
+    Returns:
+        Dict[str, Any]: The manifest
+    """
+    static = Path(static_dir)
+    (static / "css").mkdir(parents=True, exist_ok=True)
+    
+    fonts_css, fonts = bundle_fonts(font_css, static) if font_css else ("", [])
+    stylesheet = minify_css(fonts_css + stylesheet_source()).encode("utf-8")
+    css_name = f"css/raavan.{content_hash(stylesheet)}.css"
+    (static / css_name).write_bytes(stylesheet)
+    
+    manifest = {
+        "css": css_name,
+        "css_bytes": len(stylesheet),
+        "source_css_bytes": len(get_custom_css().encode("utf-8")),
+        "fonts": fonts
+    }
+    
+    # Written last, so the app only switches once every file it names exists
+    staging = static / "assets.json.tmp"
+    staging.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    staging.replace(static / "assets.json")
+    return manifest
+
+
+@lru_cache(maxsize=1)
+def get_stylesheet_tag() -> str:
+    """
+    Get the markup that styles the app, built once per process.
+    
+    With a built manifest this is a <link> to the content-hashed stylesheet,
+    which the browser fetches once and keeps cached, so reruns only resend a
+    short tag. Without one the minified stylesheet is inlined.
+    
+    Returns:
+        str: HTML for st.markdown(..., unsafe_allow_html=True)
+    """
+    manifest_file = Path(AssetConfig.MANIFEST_FILE)
+    if manifest_file.exists():
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+        return f'<link rel="stylesheet" href="{AssetConfig.STATIC_URL}/{manifest["css"]}">'
+    return f"<style>{minify_css(stylesheet_source())}</style>"
@@ -12,12 +12,9 @@ def get_custom_css():
     """
     return """
     <style>
-        /* Import Google Fonts */
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-        
-        /* Global styling */
+        /* Global styling; Inter is bundled by build_assets.py */
         * {
-            font-family: 'Inter', sans-serif;
+            font-family: 'Inter', system-ui, -apple-system, 'Segoe UI', sans-serif;
         }
         
         /* Main app background - Dark to Teal Vertical Gradient */
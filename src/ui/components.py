@@ -6,13 +6,16 @@ Contains reusable UI components and layouts.
 import streamlit as st
 from datetime import datetime
 from typing import Optional, Tuple, Any, Dict
-from config.settings import UIConfig, PersonaConfig
+from config.settings import UIConfig, PersonaConfig, HistoryConfig, AstrologyConfig
 from utils.helpers import (
     get_default_birth_time, 
     validate_name, 
     validate_location,
     format_datetime_display
 )
+from utils.history_store import get_history_store
+from api.conversation import new_conversation_state
+from utils.jobs import job_executor
 
 
 class HeaderComponent:
@@ -43,13 +46,21 @@ class ChatHistoryComponent:
     """Component for displaying chat history"""
     
     @staticmethod
-    def render(history):
+    def render(history, hidden_count: int = 0):
         """
         Render chat history.
         
         Args:
             history: List of chat messages
+            hidden_count (int): Older turns not rendered yet
         """
+        if hidden_count > 0:
+            st.button(
+                f"⬆️ Load older messages ({hidden_count} more)",
+                key="load_older_history",
+                on_click=ChatHistoryComponent.load_older
+            )
+        
         for qa in history:
             with st.chat_message("user"):
                 st.markdown(qa["question"])
@@ -57,16 +68,22 @@ class ChatHistoryComponent:
                 st.markdown(qa["answer"])
 
 
+    @staticmethod
+    def load_older():
+        """Show another page of older turns in the rerun the click triggers"""
+        st.session_state.visible_turns += HistoryConfig.PAGE_SIZE
+
+
 class AstrologyInputComponent:
     """Component for astrology input form"""
     
     @staticmethod
-    def render() -> Tuple[str, datetime, str, bool]:
+    def render() -> Tuple[str, datetime, str, str, bool]:
         """
         Render astrology input form.
         
         Returns:
-            Tuple[str, datetime, str, bool]: name, birth_datetime, location, is_valid
+            Tuple[str, datetime, str, str, bool]: name, birth_datetime, location, zodiac, is_valid
         """
         with st.container():
             name = st.text_input("✨ Full Name", placeholder="Enter your full name")
@@ -88,6 +105,12 @@ class AstrologyInputComponent:
                 )
             
             location = st.text_input("📍 Birth Place", placeholder="City, Country")
+            zodiac = st.selectbox(
+                "🌌 Zodiac",
+                ["tropical", "sidereal"],
+                index=1 if AstrologyConfig.ZODIAC == "sidereal" else 0,
+                format_func=lambda z: "Sidereal (Lahiri, Vedic)" if z == "sidereal" else "Tropical (Western)"
+            )
             
             # Combine date and time
             birth_datetime = datetime.combine(dob, tob)
@@ -95,14 +118,15 @@ class AstrologyInputComponent:
             # Validate inputs
             is_valid = validate_name(name) and validate_location(location)
             
-            return name, birth_datetime, location, is_valid
+            return name, birth_datetime, location, zodiac, is_valid
 
 
 class AstrologyResultsComponent:
     """Component for displaying astrology results"""
     
     @staticmethod
-    def render(name: str, location: str, birth_datetime: datetime, planets: Dict[str, Any]):
+    def render(name: str, location: str, birth_datetime: datetime, planets: Dict[str, Any],
+               vedic: Optional[Dict[str, Any]] = None):
         """
         Render astrology calculation results.
         
@@ -111,6 +135,7 @@ class AstrologyResultsComponent:
             location (str): Birth location
             birth_datetime (datetime): Birth date and time
             planets (Dict[str, Any]): Planetary positions
+            vedic (Optional[Dict[str, Any]]): Sidereal chart with nakshatra and dashas, if requested
         """
         st.success(f"🌟 Horoscope for **{name}**")
         st.info(f"📍 **Place:** {location}")
@@ -120,14 +145,48 @@ class AstrologyResultsComponent:
             st.markdown("### 🪐 Planetary Positions")
             for planet, details in planets.items():
                 emoji = details.get("emoji", "🪐")
+                nakshatra = ""
+                if "nakshatra" in details:
+                    nakshatra = f"🔸 Nakshatra: {details['nakshatra']} (pada {details['pada']})  "
                 st.markdown(f"""
                 **{emoji} {planet}:**  
                 🔸 Sign: {details['sign_name']}  
                 🔸 Position: {details['degrees']:.2f}°  
                 🔸 Degree in Sign: {details['degree_in_sign']:.2f}°  
+                {nakshatra}
                 """)
         else:
             st.error("❌ Error calculating planetary positions. Please try again.")
+            return
+            
+        if vedic:
+            AstrologyResultsComponent.render_dashas(vedic)
+    
+    @staticmethod
+    def render_dashas(vedic: Dict[str, Any]):
+        """
+        Render the Moon's nakshatra and the Vimshottari dasha timeline.
+        
+        Args:
+            vedic (Dict[str, Any]): Chart from AstrologyCalculator.get_vedic_chart
+        """
+        moon = vedic["moon"]
+        st.markdown("### 🌙 Vimshottari Dasha")
+        st.info(
+            f"**Janma Nakshatra:** {moon['nakshatra']} (pada {moon['pada']}, lord {moon['lord']})  \n"
+            f"**Ayanamsa (Lahiri):** {vedic['ayanamsa']:.4f}°"
+        )
+        current = vedic.get("current")
+        if current:
+            st.success(
+                f"**Current period:** {current['mahadasha']} / {current['antardasha']} "
+                f"until {current['ends']}"
+            )
+        for maha in vedic["mahadashas"]:
+            with st.expander(f"{maha['lord']} Mahadasha: {maha['start']} → {maha['end']}"):
+                st.markdown("  \n".join(
+                    f"🔸 {antar['lord']}: {antar['start']} → {antar['end']}" for antar in maha["antardashas"]
+                ))
 
 
 class SidebarComponent:
@@ -138,10 +197,24 @@ class SidebarComponent:
         """Render settings section in sidebar"""
         st.markdown("## ⚙️ Settings")
         
-        if st.button("🗑️ Clear Chat History"):
-            st.session_state.history = []
+        if st.button("🗑️ Clear Chat History", on_click=SidebarComponent.clear_history):
             st.success("Chat history cleared!")
-            st.rerun()
+    
+    @staticmethod
+    def clear_history():
+        """Clear the stored and in-memory history before the rerun the click triggers"""
+        # Abandon the answer still being generated, stopping its retrieval or Groq call
+        pending = st.session_state.pop("pending_chat", None)
+        if pending is not None:
+            if pending["job_id"] is not None:
+                job_executor.cancel(pending["job_id"])
+            if pending.get("deadline") is not None:
+                pending["deadline"].cancel()
+        get_history_store().clear(st.session_state.session_id)
+        st.session_state.history = []
+        st.session_state.total_turns = 0
+        st.session_state.visible_turns = HistoryConfig.RENDER_WINDOW
+        st.session_state.conversation = new_conversation_state()
     
     @staticmethod
     def render_astrology_section():
@@ -184,8 +257,44 @@ class ChatInterfaceComponent:
     
     @staticmethod
     def display_thinking():
-        """Display thinking message"""
-        return st.spinner(PersonaConfig.THINKING_MESSAGE)
+        """Display thinking message while the answer is generated"""
+        st.markdown(f"⏳ *{PersonaConfig.THINKING_MESSAGE}*")
+
+
+class AdminPanelComponent:
+    """Component for the operator latency panel"""
+    
+    @staticmethod
+    def render(registry):
+        """
+        Render per-stage latency percentiles and export buttons.
+        
+        Args:
+            registry (MetricsRegistry): Metrics to display
+        """
+        st.markdown("---")
+        with st.expander("📊 Latency (admin)"):
+            summary = registry.summary()
+            if not summary:
+                st.caption("No requests recorded yet.")
+                return
+            
+            st.table([
+                {
+                    "stage": stage,
+                    "count": values["count"],
+                    "p50 ms": round(values["p50"] * 1000, 1),
+                    "p95 ms": round(values["p95"] * 1000, 1),
+                    "p99 ms": round(values["p99"] * 1000, 1)
+                }
+                for stage, values in summary.items()
+            ])
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("Prometheus", registry.to_prometheus(), "metrics.prom", "text/plain")
+            with col2:
+                st.download_button("JSON", registry.to_json(), "metrics.json", "application/json")
 
 
 class ErrorComponent:
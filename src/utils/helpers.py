@@ -5,8 +5,9 @@ Contains helper functions for formatting, validation, and calculations.
 
 import swisseph as swe
 from datetime import datetime, time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from config.settings import AstrologyConfig
+from utils import vedic
 
 
 def format_datetime_display(dt: datetime) -> str:
@@ -61,9 +62,16 @@ def validate_location(location: str) -> bool:
 class AstrologyCalculator:
     """Utility class for astrology calculations using Swiss Ephemeris"""
     
-    def __init__(self):
+    def __init__(self, zodiac: str = "tropical"):
+        """
+        Initialize the calculator.
+        
+        Args:
+            zodiac (str): "tropical", or "sidereal" for Lahiri-sidereal positions with nakshatras
+        """
         self.zodiac_signs = AstrologyConfig.ZODIAC_SIGNS
         self.planet_emojis = AstrologyConfig.PLANET_EMOJIS
+        self.sidereal = zodiac == "sidereal"
     
     def calculate_julian_day(self, birth_datetime: datetime) -> float:
         """
@@ -92,6 +100,12 @@ class AstrologyCalculator:
         Returns:
             Dict[str, Dict[str, Any]]: Planetary positions data
         """
+        if self.sidereal:
+            try:
+                return self._sidereal_positions(vedic.sidereal_charts([julian_day]), 0)
+            except Exception:
+                return {}
+                
         planets = {}
         planet_names = [
             "Sun", "Moon", "Mars", "Mercury", "Jupiter",
@@ -119,9 +133,50 @@ class AstrologyCalculator:
         except Exception as e:
             # Return empty dict if calculation fails
             return {}
-        
+            
         return planets
     
+    def _sidereal_positions(self, charts: Dict[str, Any], row: int) -> Dict[str, Dict[str, Any]]:
+        """Planetary positions of one chart of a sidereal_charts batch"""
+        planets = {}
+        for column, name in enumerate(vedic.VEDIC_PLANETS):
+            degrees = float(charts["longitudes"][row, column])
+            nakshatra = int(charts["nakshatras"][row, column])
+            planets[name] = {
+                "degrees": degrees,
+                "sign": int(charts["signs"][row, column]),
+                "sign_name": self.zodiac_signs[charts["signs"][row, column]],
+                "degree_in_sign": degrees % 30,
+                "emoji": self.planet_emojis.get(name, "🪐"),
+                "nakshatra": AstrologyConfig.NAKSHATRAS[nakshatra],
+                "pada": int(charts["padas"][row, column]),
+                "nakshatra_lord": AstrologyConfig.DASHA_LORDS[nakshatra % 9]
+            }
+        return planets
+    
+    def get_vedic_chart(self, birth_datetime: datetime, at: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Calculate a Lahiri-sidereal chart with the Moon's nakshatra and Vimshottari dashas.
+        
+        Args:
+            birth_datetime (datetime): Birth date and time
+            at (Optional[datetime]): Date whose running dasha is reported, defaults to now
+            
+        Returns:
+            Dict[str, Any]: "planets" as get_planetary_positions, "ayanamsa", "moon" nakshatra,
+                pada and lord, plus the "mahadashas" and "current" period of vedic.describe_timeline
+        """
+        charts = vedic.sidereal_charts([self.calculate_julian_day(birth_datetime)])
+        planets = self._sidereal_positions(charts, 0)
+        moon = planets["Moon"]
+        timeline = vedic.dasha_timeline(moon["degrees"])
+        return {
+            "planets": planets,
+            "ayanamsa": float(charts["ayanamsa"][0]),
+            "moon": {"nakshatra": moon["nakshatra"], "pada": moon["pada"], "lord": moon["nakshatra_lord"]},
+            **vedic.describe_timeline(timeline, birth_datetime, at)
+        }
+    
     def format_planetary_display(self, planets: Dict[str, Dict[str, Any]]) -> List[str]:
         """
         Format planetary positions for display.
@@ -143,10 +198,42 @@ class AstrologyCalculator:
             🔸 Degree in Sign: {details['degree_in_sign']:.2f}°  
             """
             formatted_results.append(formatted_text)
-        
+            
         return formatted_results
 
 
+def calculate_horoscope(birth_datetime: datetime) -> Dict[str, Dict[str, Any]]:
+    """
+    Calculate planetary positions for a birth time.
+    
+    A module-level function so it can run in a worker process.
+    
+    Args:
+        birth_datetime (datetime): Birth date and time
+        
+    Returns:
+        Dict[str, Dict[str, Any]]: Planetary positions data
+    """
+    calculator = AstrologyCalculator()
+    return calculator.get_planetary_positions(calculator.calculate_julian_day(birth_datetime))
+
+
+def calculate_vedic_horoscope(birth_datetime: datetime, at: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Calculate a sidereal chart with nakshatras and dashas for a birth time.
+    
+    A module-level function so it can run in a worker process.
+    
+    Args:
+        birth_datetime (datetime): Birth date and time
+        at (Optional[datetime]): Date whose running dasha is reported, defaults to now
+        
+    Returns:
+        Dict[str, Any]: Chart from AstrologyCalculator.get_vedic_chart
+    """
+    return AstrologyCalculator("sidereal").get_vedic_chart(birth_datetime, at)
+
+
 def combine_date_time(date_obj, time_obj) -> datetime:
     """
     Combine date and time objects into datetime.
@@ -161,6 +248,32 @@ def combine_date_time(date_obj, time_obj) -> datetime:
     return datetime.combine(date_obj, time_obj)
 
 
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question for use as a cache or coalescing key.
+    
+    Args:
+        question (str): Raw user question
+        
+    Returns:
+        str: Lower-cased question with collapsed whitespace and no trailing punctuation
+    """
+    return " ".join(question.lower().split()).rstrip("?!.। ")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the LLM token count of a text without a tokenizer.
+    
+    Args:
+        text (str): Text to measure
+        
+    Returns:
+        int: Approximate token count (about four characters per token)
+    """
+    return len(text) // 4 + 1
+
+
 def truncate_text(text: str, max_length: int = 100) -> str:
     """
     Truncate text to maximum length with ellipsis.
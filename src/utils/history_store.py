@@ -0,0 +1,135 @@
+"""
+Server-side chat history storage.
+Persists every Q&A turn in a local SQLite database keyed by session id, so
+sessions only keep a bounded window of recent turns in memory.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from config.settings import HistoryConfig
+
+
+class ChatHistoryStore:
+    """SQLite-backed chat history shared by all sessions in a process"""
+    
+    def __init__(self, db_path: str = HistoryConfig.DB_PATH):
+        """
+        Open (and create if needed) the history database.
+        
+        Args:
+            db_path (str): Path to the SQLite file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chat_history_session "
+                "ON chat_history (session_id, id)"
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; Streamlit runs each session in its own thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def append(self, session_id: str, question: str, answer: str) -> Dict[str, Any]:
+        """
+        Store a new turn.
+        
+        Args:
+            session_id (str): Session identifier
+            question (str): User's question
+            answer (str): Assistant's answer
+            
+        Returns:
+            Dict[str, Any]: The stored turn
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO chat_history (session_id, question, answer, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, question, answer, time.time())
+            )
+        return {"id": cursor.lastrowid, "question": question, "answer": answer}
+    
+    def recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Get the most recent turns of a session.
+        
+        Args:
+            session_id (str): Session identifier
+            limit (int): Maximum number of turns
+            
+        Returns:
+            List[Dict[str, Any]]: Turns, oldest first
+        """
+        rows = self._connect().execute(
+            "SELECT id, question, answer FROM chat_history "
+            "WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+            (session_id, limit)
+        ).fetchall()
+        return [dict(row) for row in reversed(rows)]
+    
+    def count(self, session_id: str) -> int:
+        """
+        Count the turns stored for a session.
+        
+        Args:
+            session_id (str): Session identifier
+            
+        Returns:
+            int: Number of turns
+        """
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM chat_history WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()[0]
+    
+    def clear(self, session_id: str):
+        """
+        Delete all turns of a session.
+        
+        Args:
+            session_id (str): Session identifier
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM chat_history WHERE session_id = ?", (session_id,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> ChatHistoryStore:
+    """
+    Get the process-wide history store.
+    
+    Returns:
+        ChatHistoryStore: Shared store instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ChatHistoryStore()
+        return _store
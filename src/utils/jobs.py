@@ -0,0 +1,364 @@
+"""
+Shared background job executor for the Streamlit app.
+Runs Groq calls on a thread pool and ephemeris and batch work on a process
+pool, so a script run only submits work and polls for it. Jobs get ids,
+progress and a result kept in a bounded store until they are collected.
+"""
+
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config.settings import JobConfig
+from utils.metrics import metrics
+
+
+class JobRejectedError(Exception):
+    """Raised when a pool already has as much work as it may queue"""
+
+
+class Job:
+    """State of one submitted job"""
+    
+    def __init__(self, kind: str, label: str, owner: Optional[str], chunks: int = 1):
+        """
+        Initialize a queued job.
+        
+        Args:
+            kind (str): "io" or "cpu"
+            label (str): Short description, e.g. "horoscope"
+            owner (Optional[str]): Session that submitted it
+            chunks (int): Number of pool tasks the job is split into
+        """
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.label = label
+        self.owner = owner
+        self.progress = 0.0
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.futures: List[Future] = []
+        self._parts: List[Any] = [None] * chunks
+        self._remaining = chunks
+        self._done = threading.Event()
+    
+    @property
+    def done(self) -> bool:
+        """Whether the job finished, failed or was cancelled"""
+        return self._done.is_set()
+    
+    @property
+    def status(self) -> str:
+        """queued, running, done, failed or cancelled"""
+        if not self.done:
+            running = self.started_at is not None or any(f.running() for f in self.futures)
+            return "running" if running else "queued"
+        if self.cancelled:
+            return "cancelled"
+        return "failed" if self.error is not None else "done"
+    
+    def report(self, fraction: float, message: Optional[str] = None):
+        """
+        Report progress from inside a thread-pool job.
+        
+        Args:
+            fraction (float): Completed share between 0 and 1
+            message (Optional[str]): What the job is doing now
+        """
+        self.progress = min(1.0, max(0.0, fraction))
+        if message is not None:
+            self.message = message
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job is done; returns False on timeout"""
+        return self._done.wait(timeout)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary without the result, for status displays"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "error": str(self.error) if self.error is not None else None,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobExecutor:
+    """Thread pool for I/O, process pool for CPU work, and a bounded job store"""
+    
+    def __init__(self, io_workers: int = JobConfig.IO_WORKERS,
+                 cpu_workers: int = JobConfig.CPU_WORKERS,
+                 max_pending: int = JobConfig.MAX_PENDING,
+                 max_stored: int = JobConfig.MAX_STORED,
+                 result_ttl: float = JobConfig.RESULT_TTL,
+                 start_method: str = JobConfig.START_METHOD):
+        """
+        Initialize the executor; the process pool starts on first use.
+        
+        Args:
+            io_workers (int): Threads for network-bound jobs
+            cpu_workers (int): Processes for CPU-bound jobs
+            max_pending (int): Jobs per pool allowed to wait for a free worker
+            max_stored (int): Finished jobs kept for polling
+            result_ttl (float): Seconds a finished job is kept
+            start_method (str): multiprocessing start method for the process pool
+        """
+        self.workers = {"io": io_workers, "cpu": cpu_workers}
+        self.capacity = {kind: workers + max_pending for kind, workers in self.workers.items()}
+        self.max_stored = max_stored
+        self.result_ttl = result_ttl
+        self.start_method = start_method
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="raavan-job")
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self.active = {"io": 0, "cpu": 0}
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+    
+    def _pool(self, kind: str):
+        if kind == "io":
+            return self._io_pool
+        with self._lock:
+            if self._cpu_pool is None:
+                self._cpu_pool = ProcessPoolExecutor(
+                    max_workers=self.workers["cpu"],
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+            return self._cpu_pool
+    
+    def _admit(self, kind: str, label: str, owner: Optional[str], chunks: int) -> Job:
+        if kind not in self.workers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        with self._lock:
+            if self.active[kind] >= self.capacity[kind]:
+                self.rejected += 1
+                metrics.increment("raavan_jobs_rejected_total", kind=kind)
+                raise JobRejectedError(f"The {kind} pool is saturated ({self.active[kind]} jobs)")
+            job = Job(kind, label, owner, chunks)
+            self.active[kind] += 1
+            self.submitted += 1
+            self._jobs[job.id] = job
+            self._evict()
+        return job
+    
+    def _evict(self):
+        """Drop expired and excess finished jobs; unfinished ones always stay"""
+        expired_before = time.time() - self.result_ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.finished_at < expired_before:
+                del self._jobs[job_id]
+        if len(self._jobs) > self.max_stored:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job.done]:
+                del self._jobs[job_id]
+                if len(self._jobs) <= self.max_stored:
+                    break
+    
+    @staticmethod
+    def _run_in_thread(job: Job, fn: Callable, args, kwargs):
+        job.started_at = time.time()
+        metrics.observe("raavan_job_wait_seconds", job.started_at - job.submitted_at, kind=job.kind)
+        return fn(*args, **kwargs)
+    
+    def _chunk_done(self, job: Job, index: int, future: Future):
+        with self._lock:
+            if job.done:
+                return
+            self._record_chunk(job, index, future)
+        if job.error is not None:
+            # Outside the lock: cancelling runs this callback for the other chunks
+            for other in job.futures:
+                other.cancel()
+    
+    def _record_chunk(self, job: Job, index: int, future: Future):
+        """Store one finished chunk; called with the lock held"""
+        if future.cancelled():
+            job.cancelled = True
+            self._finish(job, error=RuntimeError("Job was cancelled"))
+        elif future.exception() is not None:
+            self._finish(job, error=future.exception())
+        else:
+            job._parts[index] = future.result()
+            job._remaining -= 1
+            job.progress = 1.0 - job._remaining / len(job._parts)
+            if job._remaining == 0:
+                if len(job._parts) == 1:
+                    job.result = job._parts[0]
+                else:
+                    job.result = [item for part in job._parts for item in part]
+                self._finish(job)
+    
+    def _finish(self, job: Job, error: Optional[BaseException] = None):
+        """Record the outcome; called with the lock held"""
+        job.error = error
+        job.finished_at = time.time()
+        job._parts = []
+        self.active[job.kind] -= 1
+        if error is None:
+            self.completed += 1
+        else:
+            self.failed += 1
+        metrics.observe("raavan_job_seconds", job.finished_at - job.submitted_at,
+                        kind=job.kind, status=job.status)
+        job._done.set()
+    
+    def submit(self, fn: Callable, *args, kind: str = "io", label: str = "",
+               owner: Optional[str] = None, with_progress: bool = False, **kwargs) -> str:
+        """
+        Submit one call.
+        
+        Args:
+            fn (Callable): Function to run; must be picklable for "cpu" jobs
+            kind (str): "io" for the thread pool, "cpu" for the process pool
+            label (str): Short description
+            owner (Optional[str]): Session that submitted it
+            with_progress (bool): Pass the job's report() as `report` ("io" only)
+            
+        Returns:
+            str: Job id
+            
+        Raises:
+            JobRejectedError: If the pool is saturated
+        """
+        job = self._admit(kind, label, owner, 1)
+        if with_progress:
+            if kind != "io":
+                raise ValueError("Progress callbacks only work for thread-pool jobs")
+            kwargs["report"] = job.report
+        if kind == "io":
+            future = self._io_pool.submit(self._run_in_thread, job, fn, args, kwargs)
+        else:
+            future = self._pool(kind).submit(fn, *args, **kwargs)
+        job.futures.append(future)
+        future.add_done_callback(lambda f: self._chunk_done(job, 0, f))
+        return job.id
+    
+    def submit_batch(self, fn: Callable[[List[Any]], List[Any]], items: Sequence[Any], kind: str = "cpu",
+                     chunk_size: int = JobConfig.BATCH_CHUNK_SIZE, label: str = "",
+                     owner: Optional[str] = None) -> str:
+        """
+        Submit work over many items, split into chunks that run in parallel.
+        
+        Progress is the share of finished chunks; the result is the
+        concatenation of fn(chunk) in the order of `items`.
+        
+        Args:
+            fn (Callable[[List[Any]], List[Any]]): Maps a chunk of items to a list of results
+            items (Sequence[Any]): Items to process
+            kind (str): "cpu" or "io"
+            chunk_size (int): Items per pool task
+            label (str): Short description
+            owner (Optional[str]): Session that submitted it
+            
+        Returns:
+            str: Job id
+            
+        Raises:
+            JobRejectedError: If the pool is saturated
+        """
+        chunks = [list(items[start:start + chunk_size]) for start in range(0, len(items), chunk_size)] or [[]]
+        job = self._admit(kind, label, owner, len(chunks))
+        if kind == "io":
+            job.started_at = time.time()
+        pool = self._pool(kind)
+        for index, chunk in enumerate(chunks):
+            future = pool.submit(fn, chunk)
+            job.futures.append(future)
+            future.add_done_callback(lambda f, index=index: self._chunk_done(job, index, f))
+        return job.id
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job; None once it has been evicted"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for a job and return its result.
+        
+        Args:
+            job_id (str): Job id
+            timeout (Optional[float]): Seconds to wait, forever if None
+            
+        Returns:
+            Any: The job's return value
+            
+        Raises:
+            KeyError: If the job is unknown or was evicted
+            TimeoutError: If the job did not finish in time
+            Exception: Whatever the job raised
+        """
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job '{job_id}'")
+        if not job.wait(timeout):
+            raise TimeoutError(f"Job '{job_id}' is still {job.status}")
+        if job.error is not None:
+            raise job.error
+        return job.result
+    
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job's tasks that have not started; returns True if it ended"""
+        job = self.get(job_id)
+        if job is None:
+            return False
+        for future in job.futures:
+            future.cancel()
+        return job.done
+    
+    def jobs_for(self, owner: str) -> List[Job]:
+        """Jobs submitted by one session, oldest first"""
+        with self._lock:
+            return [job for job in self._jobs.values() if job.owner == owner]
+    
+    def shutdown(self):
+        """Stop both pools without waiting for running work"""
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get saturation statistics.
+        
+        Returns:
+            Dict[str, Any]: Workers, active jobs and utilization per pool plus counters
+        """
+        with self._lock:
+            stats = {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "stored": len(self._jobs)
+            }
+            for kind, workers in self.workers.items():
+                stats[f"{kind}_workers"] = workers
+                stats[f"{kind}_active"] = self.active[kind]
+                stats[f"{kind}_queued"] = max(0, self.active[kind] - workers)
+                # Above 1.0 means jobs are waiting for a worker
+                stats[f"{kind}_utilization"] = self.active[kind] / workers
+        return stats
+
+
+# Process-wide executor shared by every Streamlit session
+job_executor = JobExecutor()
+metrics.register_collector("raavan_jobs", job_executor.get_stats)
@@ -0,0 +1,254 @@
+"""
+Lightweight in-process metrics and span tracing.
+Records per-stage latencies of the chat pipeline into histograms that can be
+exported as Prometheus text or JSON and summarized as p50/p95/p99.
+"""
+
+import bisect
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from config.settings import MetricsConfig
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Dict[str, str] = None) -> str:
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """Cumulative bucket histogram plus a window of recent samples for quantiles"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = MetricsConfig.BUCKETS,
+                 window: int = MetricsConfig.QUANTILE_WINDOW):
+        """
+        Initialize an empty histogram.
+        
+        Args:
+            buckets (Tuple[float, ...]): Upper bounds in seconds, ascending
+            window (int): Recent samples kept for quantile estimates
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        """Record one sample"""
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+            self.recent.append(value)
+    
+    def quantiles(self, qs: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        """
+        Estimate quantiles from the recent window.
+        
+        Args:
+            qs (Tuple[float, ...]): Quantiles between 0 and 1
+            
+        Returns:
+            Dict[str, float]: e.g. {"p50": 0.12, "p95": 0.8, "p99": 1.4}
+        """
+        with self._lock:
+            samples = sorted(self.recent)
+        if not samples:
+            return {f"p{int(q * 100)}": 0.0 for q in qs}
+        return {
+            f"p{int(q * 100)}": samples[min(len(samples) - 1, int(q * len(samples)))]
+            for q in qs
+        }
+
+
+class MetricsRegistry:
+    """Named histograms, counters and on-demand gauges"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+    
+    def observe(self, name: str, value: float, **labels):
+        """
+        Record a sample in a histogram.
+        
+        Args:
+            name (str): Metric name
+            value (float): Sample value (seconds for latencies)
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+        histogram.observe(value)
+    
+    def increment(self, name: str, amount: float = 1.0, **labels):
+        """
+        Increase a counter.
+        
+        Args:
+            name (str): Metric name
+            amount (float): Increment
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+    
+    def register_collector(self, prefix: str, collect: Callable[[], Dict[str, float]]):
+        """
+        Register a callable whose numeric values are exported as gauges.
+        
+        Args:
+            prefix (str): Gauge name prefix
+            collect (Callable[[], Dict[str, float]]): Returns current values
+        """
+        with self._lock:
+            self._collectors[prefix] = collect
+    
+    @contextmanager
+    def span(self, stage: str) -> Iterator[Dict[str, float]]:
+        """
+        Time a pipeline stage.
+        
+        Exceptions count as stage errors. A closed generator, a cancelled
+        task or a deadline abort is the caller giving up, not a failure,
+        and is only timed.
+        
+        Args:
+            stage (str): Stage name, e.g. "vector_search"
+            
+        Yields:
+            Dict[str, float]: Holds "start"; callers may read it for sub-timings
+        """
+        timing = {"start": time.perf_counter()}
+        try:
+            yield timing
+        except Exception as e:
+            if getattr(e, "stage_error", True):
+                self.increment(MetricsConfig.ERRORS_METRIC, stage=stage)
+            raise
+        finally:
+            self.observe(MetricsConfig.STAGE_METRIC, time.perf_counter() - timing["start"], stage=stage)
+    
+    def _gauges(self) -> Dict[str, float]:
+        with self._lock:
+            collectors = dict(self._collectors)
+        gauges = {}
+        for prefix, collect in collectors.items():
+            try:
+                values = collect()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"{prefix}_{key}"] = float(value)
+        return gauges
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize every stage histogram.
+        
+        Returns:
+            Dict[str, Dict[str, float]]: count, mean and p50/p95/p99 per stage
+        """
+        with self._lock:
+            series = dict(self._histograms.get(MetricsConfig.STAGE_METRIC, {}))
+        result = {}
+        for key, histogram in sorted(series.items()):
+            stage = dict(key).get("stage", "")
+            result[stage] = {
+                "count": histogram.count,
+                "mean": histogram.total / histogram.count if histogram.count else 0.0,
+                **histogram.quantiles()
+            }
+        return result
+    
+    def to_json(self) -> str:
+        """
+        Export all metrics as JSON.
+        
+        Returns:
+            str: JSON document with histograms, counters and gauges
+        """
+        with self._lock:
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            
+        document = {"histograms": {}, "counters": {}, "gauges": self._gauges()}
+        for name, series in histograms.items():
+            document["histograms"][name] = [
+                {
+                    "labels": dict(key),
+                    "count": h.count,
+                    "sum": h.total,
+                    "buckets": dict(zip([str(b) for b in h.buckets] + ["+Inf"], h.counts)),
+                    **h.quantiles()
+                }
+                for key, h in series.items()
+            ]
+        for name, series in counters.items():
+            document["counters"][name] = [
+                {"labels": dict(key), "value": value} for key, value in series.items()
+            ]
+        return json.dumps(document, indent=2)
+    
+    def to_prometheus(self) -> str:
+        """
+        Export all metrics in the Prometheus text exposition format.
+        
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            
+        lines: List[str] = []
+        for name, series in sorted(histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for key, h in sorted(series.items()):
+                with h._lock:
+                    counts, total, count = list(h.counts), h.total, h.count
+                cumulative = 0
+                for bound, bucket_count in zip(list(h.buckets) + ["+Inf"], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(key, {'le': str(bound)})} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+        for name, series in sorted(counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {value}")
+        for name, value in sorted(self._gauges().items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by every session and worker thread
+metrics = MetricsRegistry()
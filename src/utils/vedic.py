@@ -0,0 +1,261 @@
+"""
+Vedic astrology: Lahiri-sidereal positions, nakshatras and Vimshottari dashas.
+Sidereal longitudes are the tropical ones minus the ayanamsa, derived for a
+whole batch of charts at once with NumPy. A dasha timeline depends only on
+the natal Moon's longitude, so it is kept as two small arrays of day offsets
+from birth, cached per longitude and searched by bisection.
+"""
+
+import functools
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from config.settings import AstrologyConfig
+
+NAKSHATRA_SPAN = 360.0 / 27
+PADA_SPAN = NAKSHATRA_SPAN / 4
+DASHA_CYCLE_YEARS = sum(AstrologyConfig.DASHA_YEARS)
+
+# Grahas computed by swisseph; Ketu is always opposite Rahu
+PLANET_IDS = {
+    "Sun": swe.SUN, "Moon": swe.MOON, "Mars": swe.MARS, "Mercury": swe.MERCURY, "Jupiter": swe.JUPITER,
+    "Venus": swe.VENUS, "Saturn": swe.SATURN, "Uranus": swe.URANUS, "Neptune": swe.NEPTUNE,
+    "Pluto": swe.PLUTO, "Rahu": swe.MEAN_NODE
+}
+VEDIC_PLANETS = [*PLANET_IDS, "Ketu"]
+MOON = VEDIC_PLANETS.index("Moon")
+
+_YEARS = np.asarray(AstrologyConfig.DASHA_YEARS, dtype=np.float64)
+
+
+def _cycle_templates() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lay out a full 120-year cycle of antardashas for each starting mahadasha.
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (9, 82) period boundaries in years from the
+            cycle start, and (9, 81) antardasha lords
+    """
+    order = np.arange(9)
+    starts = np.zeros((9, 82))
+    lords = np.empty((9, 81), dtype=np.int8)
+    for first in range(9):
+        mahas = (first + order) % 9
+        antars = (mahas[:, None] + order) % 9  # Each mahadasha starts with its own antardasha
+        lengths = _YEARS[mahas][:, None] * _YEARS[antars] / DASHA_CYCLE_YEARS
+        starts[first, 1:] = np.cumsum(lengths.ravel())
+        lords[first] = antars.ravel()
+    return starts, lords
+
+
+_CYCLE_STARTS, _CYCLE_LORDS = _cycle_templates()
+
+
+class DashaTimeline(NamedTuple):
+    """Vimshottari periods of one natal Moon, as day offsets from birth"""
+    lords: np.ndarray  # (81,) antardasha lords; mahadasha i holds antardashas 9i to 9i + 8
+    starts: np.ndarray  # (82,) period boundaries; starts[0] <= 0 is when the birth mahadasha began
+    
+    @property
+    def maha_lords(self) -> np.ndarray:
+        """(9,) mahadasha lords"""
+        return self.lords[::9]
+    
+    @property
+    def maha_starts(self) -> np.ndarray:
+        """(10,) mahadasha boundaries"""
+        return self.starts[::9]
+
+
+def moon_balance(moon_longitudes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Locate natal Moons within their nakshatras.
+    
+    Args:
+        moon_longitudes: Sidereal Moon longitude in degrees, or an array of them
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Nakshatra indexes, and the share of each nakshatra already crossed
+    """
+    longitudes = np.mod(np.asarray(moon_longitudes, dtype=np.float64), 360.0)
+    nakshatras = np.minimum((longitudes // NAKSHATRA_SPAN).astype(np.int64), 26)
+    crossed = np.clip((longitudes - nakshatras * NAKSHATRA_SPAN) / NAKSHATRA_SPAN, 0.0, 1.0)
+    return nakshatras, crossed
+
+
+def _timeline_arrays(nakshatras: np.ndarray, crossed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    first = nakshatras % 9
+    elapsed = crossed * _YEARS[first]
+    starts = (_CYCLE_STARTS[first] - elapsed[..., None]) * AstrologyConfig.DASHA_YEAR_DAYS
+    return starts, _CYCLE_LORDS[first]
+
+
+def dasha_offsets(moon_longitudes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build dasha timelines for one or many natal Moons at once.
+    
+    The Moon's nakshatra gives the mahadasha running at birth, and the
+    part of the nakshatra already crossed gives how much of it had passed.
+    
+    Args:
+        moon_longitudes: Sidereal Moon longitude in degrees, or an array of them
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Boundaries in days from birth, shape (..., 82),
+            and antardasha lords, shape (..., 81)
+    """
+    return _timeline_arrays(*moon_balance(moon_longitudes))
+
+
+_BALANCE_STEP = AstrologyConfig.DASHA_LONGITUDE_STEP / NAKSHATRA_SPAN  # As a share of a nakshatra
+
+
+@functools.lru_cache(maxsize=AstrologyConfig.DASHA_CACHE_SIZE)
+def _cached_timeline(nakshatra: int, steps: int) -> DashaTimeline:
+    starts, lords = _timeline_arrays(np.int64(nakshatra), np.float64(min(1.0, steps * _BALANCE_STEP)))
+    # Shared by every caller of the cache
+    starts.setflags(write=False)
+    lords.setflags(write=False)
+    return DashaTimeline(lords, starts)
+
+
+def dasha_timeline(moon_longitude: float) -> DashaTimeline:
+    """
+    Get the dasha timeline of a natal Moon, from the cache when possible.
+    
+    The position within the nakshatra is rounded to DASHA_LONGITUDE_STEP;
+    the nakshatra itself, and so the birth mahadasha, never changes.
+    
+    Args:
+        moon_longitude (float): Sidereal Moon longitude in degrees
+        
+    Returns:
+        DashaTimeline: Read-only timeline arrays
+    """
+    nakshatra, crossed = moon_balance(moon_longitude)
+    return _cached_timeline(int(nakshatra), int(round(float(crossed) / _BALANCE_STEP)))
+
+
+def current_period(timeline: DashaTimeline, days_since_birth: float) -> Optional[int]:
+    """
+    Find the antardasha running at a date by binary search.
+    
+    Args:
+        timeline (DashaTimeline): Natal timeline
+        days_since_birth (float): Date as days after birth
+        
+    Returns:
+        Optional[int]: Antardasha index (its mahadasha is index // 9), or None outside the 120-year cycle
+    """
+    index = int(np.searchsorted(timeline.starts, days_since_birth, side="right")) - 1
+    return index if 0 <= index < len(timeline.lords) else None
+
+
+def current_periods(starts: np.ndarray, days_since_birth: np.ndarray) -> np.ndarray:
+    """
+    Find the running antardasha of many charts at once.
+    
+    Args:
+        starts (np.ndarray): (n, 82) boundaries from dasha_offsets
+        days_since_birth (np.ndarray): (n,) dates as days after each birth
+        
+    Returns:
+        np.ndarray: (n,) antardasha indexes, -1 outside the cycle
+    """
+    index = np.count_nonzero(starts <= np.asarray(days_since_birth)[:, None], axis=1) - 1
+    index[index >= starts.shape[1] - 1] = -1
+    return index
+
+
+def ayanamsa(julian_days: Sequence[float]) -> np.ndarray:
+    """
+    Get the configured ayanamsa for a batch of times.
+    
+    Args:
+        julian_days (Sequence[float]): Julian Days (UT)
+        
+    Returns:
+        np.ndarray: Ayanamsa in degrees
+    """
+    swe.set_sid_mode(getattr(swe, f"SIDM_{AstrologyConfig.AYANAMSA}"))
+    return np.fromiter((swe.get_ayanamsa_ut(jd) for jd in julian_days), dtype=np.float64, count=len(julian_days))
+
+
+def sidereal_charts(julian_days: Sequence[float]) -> Dict[str, np.ndarray]:
+    """
+    Compute Vedic charts for a batch of birth times.
+    
+    Only the ephemeris lookups run per chart; signs, nakshatras, padas and
+    dasha timelines are derived for the whole batch with array operations.
+    
+    Args:
+        julian_days (Sequence[float]): Birth times as Julian Days (UT)
+        
+    Returns:
+        Dict[str, np.ndarray]: "longitudes", "signs", "nakshatras" and "padas" of shape
+            (n, len(VEDIC_PLANETS)), "ayanamsa" (n,), "dasha_starts" (n, 82) in days
+            from birth and "dasha_lords" (n, 81)
+    """
+    julian_days = list(julian_days)
+    tropical = np.empty((len(julian_days), len(VEDIC_PLANETS)))
+    for row, julian_day in enumerate(julian_days):
+        for column, planet in enumerate(PLANET_IDS.values()):
+            tropical[row, column] = swe.calc_ut(julian_day, planet)[0][0]
+    tropical[:, -1] = tropical[:, -2] + 180.0  # Ketu
+    
+    offsets = ayanamsa(julian_days)
+    longitudes = np.mod(tropical - offsets[:, None], 360.0)
+    dasha_starts, dasha_lords = dasha_offsets(longitudes[:, MOON])
+    return {
+        "longitudes": longitudes,
+        "signs": (longitudes // 30).astype(np.int8),
+        "nakshatras": np.minimum(longitudes // NAKSHATRA_SPAN, 26).astype(np.int8),
+        "padas": ((longitudes % NAKSHATRA_SPAN) // PADA_SPAN).astype(np.int8) + 1,
+        "ayanamsa": offsets,
+        "dasha_starts": dasha_starts,
+        "dasha_lords": dasha_lords
+    }
+
+
+def describe_timeline(timeline: DashaTimeline, birth_datetime: datetime,
+                      at: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Turn a timeline into dated periods for display.
+    
+    Args:
+        timeline (DashaTimeline): Natal timeline
+        birth_datetime (datetime): Birth date and time
+        at (Optional[datetime]): Date whose running periods are reported, defaults to now
+        
+    Returns:
+        Dict[str, Any]: "mahadashas" with their "antardashas", each with lord, start and
+            end dates, and "current" mahadasha and antardasha lords at `at` (None outside the cycle)
+    """
+    lords = AstrologyConfig.DASHA_LORDS
+    dates = [(birth_datetime + timedelta(days=float(offset))).date().isoformat() for offset in timeline.starts]
+    mahadashas: List[Dict[str, Any]] = []
+    for maha in range(9):
+        mahadashas.append({
+            "lord": lords[timeline.lords[9 * maha]],
+            "start": dates[9 * maha],
+            "end": dates[9 * maha + 9],
+            "antardashas": [
+                {"lord": lords[timeline.lords[i]], "start": dates[i], "end": dates[i + 1]}
+                for i in range(9 * maha, 9 * maha + 9)
+            ]
+        })
+        
+    at = at or datetime.now()
+    index = current_period(timeline, (at - birth_datetime).total_seconds() / 86400)
+    current = None
+    if index is not None:
+        current = {
+            "date": at.date().isoformat(),
+            "mahadasha": lords[timeline.lords[index - index % 9]],
+            "antardasha": lords[timeline.lords[index]],
+            "ends": dates[index + 1]
+        }
+    return {"mahadashas": mahadashas, "current": current}
@@ -0,0 +1,9 @@
+"""
+Shared pytest setup.
+Puts src/ on the import path the way the app entry points do.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
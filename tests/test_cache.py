@@ -0,0 +1,40 @@
+"""
+Tests for the answer cache scoping in api/cache.py and api/warmup.py.
+"""
+
+import json
+
+from api import warmup
+from api.cache import AnswerCache, answer_scope
+from config.settings import APIConfig, PersonaConfig
+
+
+def test_answers_are_kept_per_index_version():
+    cache = AnswerCache()
+    cache.put("Who is Raavan?", "King of Lanka", index_version="v1")
+    assert cache.get("who is raavan", index_version="v1") == "King of Lanka"
+    assert cache.get("Who is Raavan?", index_version="v2") is None
+    assert cache.get("Who is Raavan?") is None
+
+
+def test_model_or_prompt_change_starts_a_new_scope(monkeypatch):
+    cache = AnswerCache()
+    cache.put("Who is Raavan?", "King of Lanka")
+    monkeypatch.setattr(APIConfig, "MODEL_NAME", "another-model")
+    assert cache.get("Who is Raavan?") is None
+    monkeypatch.undo()
+    monkeypatch.setattr(PersonaConfig, "SYSTEM_PROMPT", "Another persona")
+    assert cache.get("Who is Raavan?") is None
+
+
+def test_saved_answers_from_another_scope_are_ignored(tmp_path):
+    path = tmp_path / "warm_answers.json"
+    answers = {
+        "who is raavan": {"question": "Who is Raavan?", "answer": "old", "created_at": 0,
+                          "scope": answer_scope("v1")},
+        "who is sita": {"question": "Who is Sita?", "answer": "new", "created_at": 0,
+                        "scope": answer_scope("v2")},
+        "who is ram": {"question": "Who is Ram?", "answer": "unscoped", "created_at": 0},
+    }
+    path.write_text(json.dumps({"answers": answers}), encoding="utf-8")
+    assert list(warmup.load_warm_answers(str(path), "v2")) == ["who is sita"]
@@ -0,0 +1,29 @@
+"""
+Tests for the hard chunk limit of api/chunking.py.
+"""
+
+from api.chunking import chunk_text
+
+NAMES = "Daśagrīva Vibhīṣaṇa Kumbhakarṇa Indrajit Mandodarī Śūrpaṇakhā "
+
+
+def dense(text: str) -> int:
+    """Stand-in for a tokenizer that splits Sanskrit names into many word pieces"""
+    return len(text) // 2 + 1
+
+
+def corpus() -> str:
+    paragraphs = [f"Sarga {n}. " + NAMES * 6 + "went to Lanka." for n in range(20)]
+    return "Yuddha Kanda\n\n" + "\n\n".join(paragraphs)
+
+
+def test_limit_is_counted_with_the_given_measure():
+    chunks = chunk_text(corpus(), max_tokens=120, measure=dense)
+    assert max(dense(chunk.text) for chunk in chunks) <= 120
+    # Nothing is dropped but the heading
+    assert "".join("".join(chunk.text.split()) for chunk in chunks) == "".join(corpus().split("\n", 1)[1].split())
+
+
+def test_estimated_tokens_are_the_default_measure():
+    assert [c.text for c in chunk_text(corpus())] == [c.text for c in chunk_text(corpus(), measure=None)]
+    assert any(dense(chunk.text) > 120 for chunk in chunk_text(corpus()))
@@ -0,0 +1,132 @@
+"""
+Tests for the window and summary bookkeeping in api/conversation.py.
+A scripted stand-in replaces GroqAPIService, so no Groq calls are made.
+"""
+
+import pytest
+
+from api.conversation import ConversationMemory, new_conversation_state
+from api.deadline import Deadline
+from config.settings import ConversationConfig, PersonaConfig
+
+
+class ScriptedGroq:
+    """Records complete() calls and answers with a fixed reply"""
+
+    def __init__(self, reply: str = "summary"):
+        self.reply = reply
+        self.calls = []
+
+    def complete(self, messages, **kwargs):
+        self.calls.append({"messages": messages, **kwargs})
+        return self.reply
+
+    def route(self, question):
+        return f"route:{question}"
+
+
+def turn(turn_id: int, answer: str = None):
+    return {"id": turn_id, "question": f"question {turn_id}", "answer": answer or f"answer {turn_id}"}
+
+
+def verbatim_ids(messages):
+    return [int(m["content"].split()[-1]) for m in messages if m["role"] == "user"]
+
+
+def test_every_turn_is_summarized_or_verbatim():
+    """No turn falls between the rolling summary and the recent turns"""
+    memory = ConversationMemory(ScriptedGroq())
+    state = new_conversation_state()
+    turns = []
+    for turn_id in range(1, 15):
+        turns.append(turn(turn_id))
+        verbatim = verbatim_ids(memory.build_history_messages(state, turns))
+        summarized = list(range(1, state["summarized_id"] + 1))
+        assert sorted(set(summarized) | set(verbatim)) == list(range(1, turn_id + 1))
+        assert verbatim[-ConversationConfig.RECENT_TURNS:] == list(
+            range(max(1, turn_id - ConversationConfig.RECENT_TURNS + 1), turn_id + 1)
+        )
+        memory.maybe_refresh_summary(state, turns)
+
+
+def test_summary_waits_for_summary_every_turns():
+    groq = ScriptedGroq("they spoke of Lanka")
+    memory = ConversationMemory(groq)
+    state = new_conversation_state()
+    window = ConversationConfig.RECENT_TURNS + ConversationConfig.SUMMARY_EVERY
+
+    assert not memory.maybe_refresh_summary(state, [turn(i) for i in range(1, window)])
+    assert groq.calls == []
+
+    assert memory.maybe_refresh_summary(state, [turn(i) for i in range(1, window + 1)])
+    assert state == {"summary": "they spoke of Lanka", "summarized_id": ConversationConfig.SUMMARY_EVERY}
+    assert "route" not in groq.calls[0]  # Summaries stay on the configured model
+
+    messages = memory.build_history_messages(state, [turn(i) for i in range(1, window + 1)])
+    assert messages[0] == {
+        "role": "system", "content": "Summary of the conversation so far:\nthey spoke of Lanka"
+    }
+
+
+def test_failed_summary_leaves_state_unchanged():
+    memory = ConversationMemory(ScriptedGroq("⚠ Network error: timed out"))
+    state = new_conversation_state()
+    turns = [turn(i) for i in range(1, 10)]
+    assert not memory.maybe_refresh_summary(state, turns)
+    assert state == new_conversation_state()
+
+
+def test_error_turns_are_left_out():
+    memory = ConversationMemory(ScriptedGroq())
+    turns = [turn(1), turn(2, "⚠ API error: 500"), turn(3, "⏳ Busy"), turn(4)]
+    assert verbatim_ids(memory.build_history_messages(new_conversation_state(), turns)) == [1, 4]
+
+
+def test_long_answers_are_truncated():
+    memory = ConversationMemory(ScriptedGroq())
+    limit = ConversationConfig.MAX_ANSWER_TOKENS * 4
+    messages = memory.build_history_messages(new_conversation_state(), [turn(1, "x" * (limit * 3))])
+    assert messages[1]["content"] == "x" * limit + "..."
+
+
+def test_history_stays_within_budget():
+    memory = ConversationMemory(ScriptedGroq())
+    turns = [turn(i, f"{'word ' * 400}{i}") for i in range(1, 8)]
+    messages = memory.build_history_messages(new_conversation_state(), turns)
+    assert sum(len(m["content"]) for m in messages) / 4 <= ConversationConfig.HISTORY_TOKEN_BUDGET
+    assert verbatim_ids(messages)[-1] == 7
+
+
+def test_turns_without_ids_keep_the_last_recent_turns():
+    """Clients that send no turn ids get the plain last-N window"""
+    memory = ConversationMemory(ScriptedGroq())
+    turns = [{"question": f"question {i}", "answer": f"answer {i}"} for i in range(1, 8)]
+    verbatim = verbatim_ids(memory.build_history_messages(new_conversation_state(), turns))
+    assert verbatim == list(range(8 - ConversationConfig.RECENT_TURNS, 8))
+
+
+def test_standalone_question_is_not_rewritten():
+    groq = ScriptedGroq()
+    memory = ConversationMemory(groq)
+    assert memory.condense_question("Who is Vibhishan?", new_conversation_state(), [turn(1)]) == "Who is Vibhishan?"
+    assert memory.condense_question("What did he do?", new_conversation_state(), []) == "What did he do?"
+    assert groq.calls == []
+
+
+def test_follow_up_is_rewritten_with_route_and_deadline():
+    groq = ScriptedGroq("What did Raavan do after the abduction?")
+    memory = ConversationMemory(groq)
+    deadline = Deadline(5)
+    rewritten = memory.condense_question("What did he do then?", new_conversation_state(), [turn(1)], deadline)
+
+    assert rewritten == "What did Raavan do after the abduction?"
+    call = groq.calls[0]
+    assert call["messages"][0]["content"] == PersonaConfig.CONDENSE_PROMPT
+    assert call["route"] == "route:What did he do then?"
+    assert call["deadline"] is deadline
+
+
+@pytest.mark.parametrize("reply", ["", "⚠ Network error: timed out", "⏳ Busy"])
+def test_failed_rewrite_falls_back_to_the_question(reply):
+    memory = ConversationMemory(ScriptedGroq(reply))
+    assert memory.condense_question("And then?", new_conversation_state(), [turn(1)]) == "And then?"
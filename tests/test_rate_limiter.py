@@ -0,0 +1,66 @@
+"""
+Tests for the Groq quota shared between processes in api/rate_limiter.py.
+Limiters with their own state file descriptor stand in for processes.
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from api.rate_limiter import GroqRateLimiter, RateLimitExceeded, fcntl
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="needs flock")
+
+
+def limiter(path, requests_per_minute=2):
+    return GroqRateLimiter(requests_per_minute, 100000, state_file=str(path))
+
+
+def test_processes_share_the_request_budget(tmp_path):
+    first, second = limiter(tmp_path / "quota"), limiter(tmp_path / "quota")
+    first.acquire(10, timeout=0)
+    second.acquire(10, timeout=0)
+    with pytest.raises(RateLimitExceeded):
+        first.acquire(10, timeout=0)
+    with pytest.raises(RateLimitExceeded):
+        second.acquire(10, timeout=0)
+
+
+def test_a_pause_holds_every_process(tmp_path):
+    first, second = limiter(tmp_path / "quota", 600), limiter(tmp_path / "quota", 600)
+    first.pause(0.3)
+    started = time.monotonic()
+    second.acquire(10, timeout=2)
+    assert time.monotonic() - started >= 0.25
+
+
+def test_without_a_state_file_each_limiter_has_its_own_budget():
+    first, second = GroqRateLimiter(1, 100000, state_file=None), GroqRateLimiter(1, 100000, state_file=None)
+    first.acquire(10, timeout=0)
+    second.acquire(10, timeout=0)
+
+
+def _admitted(shared, results):
+    count = 0
+    for _ in range(5):
+        try:
+            shared.acquire(10, timeout=0)
+            count += 1
+        except RateLimitExceeded:
+            pass
+    results.put(count)
+
+
+def test_forked_workers_share_the_budget(tmp_path):
+    """Workers forked from a process that already used the limiter, as server.py --processes does"""
+    shared = limiter(tmp_path / "quota", 6)
+    shared.acquire(10, timeout=0)
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=_admitted, args=(shared, results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+    assert sum(results.get(timeout=1) for _ in workers) == 5
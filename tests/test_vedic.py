@@ -0,0 +1,99 @@
+"""
+Tests for the Vimshottari dasha timelines in utils/vedic.py.
+These need no ephemeris: a timeline depends only on the Moon's longitude.
+"""
+
+import numpy as np
+import pytest
+
+from config.settings import AstrologyConfig
+from utils import vedic
+
+YEAR = AstrologyConfig.DASHA_YEAR_DAYS
+LORDS = AstrologyConfig.DASHA_LORDS
+YEARS = AstrologyConfig.DASHA_YEARS
+# Half of the cache's rounding step, as days of the longest mahadasha
+CACHE_TOLERANCE = AstrologyConfig.DASHA_LONGITUDE_STEP / vedic.NAKSHATRA_SPAN * max(YEARS) * YEAR
+
+LONGITUDES = [0.0, 13.0, 45.5, 100.0, 181.25, 266.7, 333.3, 359.99]
+
+
+@pytest.mark.parametrize("nakshatra", range(27))
+def test_mahadasha_starts_at_birth_at_nakshatra_start(nakshatra):
+    """A Moon at the start of a nakshatra is born at the start of its lord's mahadasha"""
+    starts, lords = vedic.dasha_offsets(nakshatra * vedic.NAKSHATRA_SPAN + 1e-9)
+    assert LORDS[lords[0]] == LORDS[nakshatra % 9]
+    assert starts[0] == pytest.approx(0.0, abs=1e-3)
+
+
+def test_balance_is_share_of_nakshatra_crossed():
+    """Halfway through Rohini, half of the Moon's 10-year mahadasha has passed"""
+    rohini = AstrologyConfig.NAKSHATRAS.index("Rohini")
+    starts, lords = vedic.dasha_offsets((rohini + 0.5) * vedic.NAKSHATRA_SPAN)
+    assert LORDS[lords[0]] == "Moon"
+    assert starts[0] == pytest.approx(-5 * YEAR)
+    assert starts[9] == pytest.approx(5 * YEAR)
+
+
+@pytest.mark.parametrize("longitude", LONGITUDES)
+def test_cycle_lasts_120_years_in_vimshottari_order(longitude):
+    timeline = vedic.dasha_timeline(longitude)
+    assert timeline.starts[-1] - timeline.starts[0] == pytest.approx(120 * YEAR)
+    assert np.all(np.diff(timeline.starts) > 0)
+
+    first = int(timeline.maha_lords[0])
+    assert [int(lord) for lord in timeline.maha_lords] == [(first + i) % 9 for i in range(9)]
+    assert np.diff(timeline.maha_starts) == pytest.approx(
+        [YEARS[(first + i) % 9] * YEAR for i in range(9)]
+    )
+
+
+@pytest.mark.parametrize("longitude", LONGITUDES)
+def test_antardashas_split_each_mahadasha_in_proportion(longitude):
+    """Antardasha length is maha years x antar years / 120, starting with the maha lord"""
+    timeline = vedic.dasha_timeline(longitude)
+    lengths = np.diff(timeline.starts)
+    for maha in range(9):
+        maha_lord = int(timeline.lords[9 * maha])
+        antars = [int(lord) for lord in timeline.lords[9 * maha:9 * maha + 9]]
+        assert antars == [(maha_lord + i) % 9 for i in range(9)]
+        expected = [YEARS[maha_lord] * YEARS[antar] / 120 * YEAR for antar in antars]
+        assert lengths[9 * maha:9 * maha + 9] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("offset", [-5e-6, 5e-6])
+def test_cache_rounding_never_crosses_a_nakshatra(offset):
+    """Rounding the cache key moves boundaries by minutes, never to another mahadasha"""
+    longitude = 5 * vedic.NAKSHATRA_SPAN + offset
+    cached = vedic.dasha_timeline(longitude)
+    starts, lords = vedic.dasha_offsets(longitude)
+    assert np.array_equal(cached.lords, lords)
+    assert cached.starts == pytest.approx(starts, abs=CACHE_TOLERANCE)
+
+
+def test_cached_timelines_are_shared_and_read_only():
+    assert vedic.dasha_timeline(123.45) is vedic.dasha_timeline(123.45 + 360.0)
+    with pytest.raises(ValueError):
+        vedic.dasha_timeline(123.45).starts[0] = 0.0
+
+
+def test_current_period_bisects_boundaries():
+    """A boundary belongs to the period it starts; outside the cycle there is none"""
+    timeline = vedic.dasha_timeline(77.7)
+    for index in range(81):
+        assert vedic.current_period(timeline, timeline.starts[index]) == index
+        assert vedic.current_period(timeline, timeline.starts[index + 1] - 1e-6) == index
+    assert vedic.current_period(timeline, timeline.starts[0] - 1e-6) is None
+    assert vedic.current_period(timeline, timeline.starts[-1]) is None
+
+
+def test_batch_lookup_matches_single_lookup():
+    rng = np.random.default_rng(7)
+    longitudes = rng.uniform(0, 360, 200)
+    days = rng.uniform(-10 * YEAR, 130 * YEAR, 200)
+    starts, lords = vedic.dasha_offsets(longitudes)
+
+    batch = vedic.current_periods(starts, days)
+    for row in range(200):
+        single = vedic.current_period(vedic.DashaTimeline(lords[row], starts[row]), days[row])
+        assert batch[row] == (-1 if single is None else single)